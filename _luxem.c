@@ -1,9 +1,19 @@
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 
 #include "c/luxem_rawread.h"
 #include "c/luxem_rawwrite.h"
 
 #include <assert.h>
+#include <stddef.h>
+#include <stdint.h>
+#ifdef _WIN32
+#include <windows.h>
+#include <io.h>
+#else
+#include <time.h>
+#include <unistd.h>
+#endif
 
 #if PY_MAJOR_VERSION >= 3
 #define WRAP_STRING_FROM(pointer, size) PyUnicode_FromStringAndSize(pointer, size)
@@ -13,10 +23,18 @@
 #define WRAP_BYTES_TO(o, pointer, size) PyBytes_AsStringAndSize(o, pointer, (Py_ssize_t *)size)
 #define WRAP_BYTES_CHECK(o) PyBytes_Check(o)
 #define WRAP_INT_FROM_SIZET(o) PyLong_FromSize_t(o)
+#define WRAP_INT_FROM_LONG(o) PyLong_FromLong(o)
+#define WRAP_INT_FROM_STRING(o) PyLong_FromString(o, NULL, 10)
+#define WRAP_INT_TYPE PyLong_Type
+#define WRAP_ASCII_NEW(size) PyUnicode_New(size, 127)
+#define WRAP_ASCII_DATA(o) ((char *)PyUnicode_1BYTE_DATA(o))
+#define WRAP_HASH_T Py_hash_t
 #define WRAP_FILE_CHECK(o) compat_file_check(o)
 #define WRAP_FILE_INC(o) do {} while (0)
 #define WRAP_FILE_DEC(o) do {} while (0)
 #define WRAP_FILE_TO(o, mode) compat_file_file(o, mode)
+#define WRAP_FILE_OPEN(o, mode) compat_file_open(o, mode)
+#define WRAP_FILE_CLOSE(file) fclose(file)
 
 static luxem_bool_t compat_file_check(PyObject *o)
 {
@@ -34,6 +52,28 @@ static FILE* compat_file_file(PyObject *o, char const *mode)
 	return out;
 }
 
+/* Opens a FILE on a duplicate of the descriptor, so it can be closed when
+ * done without closing the Python file */
+static FILE* compat_file_open(PyObject *o, char const *mode)
+{
+	FILE *out;
+	int fd = PyObject_AsFileDescriptor(o);
+	if (fd == -1) return NULL;
+	fd = dup(fd);
+	if (fd == -1)
+	{
+		PyErr_SetFromErrno(PyExc_OSError);
+		return NULL;
+	}
+	out = fdopen(fd, mode);
+	if (out == NULL)
+	{
+		close(fd);
+		PyErr_SetString(PyExc_TypeError, "Could not access file.");
+	}
+	return out;
+}
+
 #else
 #define WRAP_STRING_FROM(pointer, size) PyString_FromStringAndSize(pointer, size)
 #define WRAP_STRING_TO(o, pointer, size) PyString_AsStringAndSize(o, pointer, size)
@@ -42,19 +82,524 @@ static FILE* compat_file_file(PyObject *o, char const *mode)
 #define WRAP_BYTES_TO(o, pointer, size) PyString_AsStringAndSize(o, pointer, size)
 #define WRAP_BYTES_CHECK(o) PyString_Check(o)
 #define WRAP_INT_FROM_SIZET(o) PyInt_FromSize_t(o)
+#define WRAP_INT_FROM_LONG(o) PyInt_FromLong(o)
+#define WRAP_INT_FROM_STRING(o) PyInt_FromString(o, NULL, 10)
+#define WRAP_INT_TYPE PyInt_Type
+#define WRAP_ASCII_NEW(size) PyString_FromStringAndSize(NULL, size)
+#define WRAP_ASCII_DATA(o) PyString_AS_STRING(o)
+#define WRAP_HASH_T long
 #define WRAP_FILE_CHECK(o) PyFile_Check(o)
 #define WRAP_FILE_INC(o) PyFile_IncUseCount((PyFileObject *)o)
 #define WRAP_FILE_DEC(o) PyFile_DecUseCount((PyFileObject *)o)
 #define WRAP_FILE_TO(o, mode) PyFile_AsFile(o)
+#define WRAP_FILE_OPEN(o, mode) PyFile_AsFile(o)
+#define WRAP_FILE_CLOSE(file) fflush(file)
 #endif
 
 /* ************************************************************************** */
 
 static char const exception_marker;
 
+static luxem_bool_t rawread_python_error(struct luxem_rawread_context_t *context)
+{
+	luxem_rawread_get_error(context)->pointer = &exception_marker;
+	luxem_rawread_get_error(context)->length = 0;
+	return luxem_false;
+}
+
+static PyObject *wrap_string(struct luxem_string_t const *string)
+{
+	return WRAP_STRING_FROM(string->pointer == 0 ? (char *) 1 : string->pointer, string->length);
+}
+
+/* Typed */
+/*********/
+
+typedef struct {
+	PyObject_HEAD
+	PyObject *name;
+	PyObject *value;
+} Typed;
+
+static PyTypeObject TypedType = {PyObject_HEAD_INIT(NULL) 0};
+
+/* Steals nothing */
+static PyObject *typed_create(PyObject *name, PyObject *value)
+{
+	Typed *self = (Typed *)TypedType.tp_alloc(&TypedType, 0);
+	if (self != NULL)
+	{
+		Py_INCREF(name);
+		Py_INCREF(value);
+		self->name = name;
+		self->value = value;
+	}
+	return (PyObject *)self;
+}
+
+static PyObject *Typed_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
+{
+	Typed *self = (Typed *)type->tp_alloc(type, 0);
+	if (self != NULL)
+	{
+		Py_INCREF(Py_None);
+		Py_INCREF(Py_None);
+		self->name = Py_None;
+		self->value = Py_None;
+	}
+	return (PyObject *)self;
+}
+
+static int Typed_init(Typed *self, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *name, *value = Py_None;
+
+	static char *named_args_list[] =
+	{
+		"name",
+		"value",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|O",
+		named_args_list,
+		&name,
+		&value))
+		return -1;
+
+	Py_INCREF(name);
+	Py_INCREF(value);
+	Py_XDECREF(self->name);
+	Py_XDECREF(self->value);
+	self->name = name;
+	self->value = value;
+
+	return 0;
+}
+
+static int Typed_traverse(Typed *self, visitproc visit, void *arg)
+{
+	Py_VISIT(self->name);
+	Py_VISIT(self->value);
+	return 0;
+}
+
+static int Typed_clear(Typed *self)
+{
+	Py_CLEAR(self->name);
+	Py_CLEAR(self->value);
+	return 0;
+}
+
+static void Typed_dealloc(Typed *self)
+{
+	PyObject_GC_UnTrack(self);
+	Typed_clear(self);
+	Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+static PyObject *Typed_richcompare(PyObject *self, PyObject *other, int op)
+{
+	int equal;
+
+	if ((op != Py_EQ && op != Py_NE) || !PyObject_TypeCheck(self, &TypedType) || !PyObject_TypeCheck(other, &TypedType))
+	{
+		Py_INCREF(Py_NotImplemented);
+		return Py_NotImplemented;
+	}
+
+	equal = PyObject_RichCompareBool(((Typed *)self)->name, ((Typed *)other)->name, Py_EQ);
+	if (equal == 1)
+		equal = PyObject_RichCompareBool(((Typed *)self)->value, ((Typed *)other)->value, Py_EQ);
+	if (equal < 0) return NULL;
+
+	if ((op == Py_EQ) == (equal == 1))
+	{
+		Py_INCREF(Py_True);
+		return Py_True;
+	}
+	Py_INCREF(Py_False);
+	return Py_False;
+}
+
+static WRAP_HASH_T Typed_hash(Typed *self)
+{
+	WRAP_HASH_T name_hash, value_hash, out;
+	name_hash = PyObject_Hash(self->name);
+	if (name_hash == -1) return -1;
+	value_hash = PyObject_Hash(self->value);
+	if (value_hash == -1) return -1;
+	out = (name_hash * 1000003) ^ value_hash;
+	if (out == -1) out = -2;
+	return out;
+}
+
+static PyObject *Typed_repr(Typed *self)
+{
+#if PY_MAJOR_VERSION >= 3
+	return PyUnicode_FromFormat("%s(%R, %R)", Py_TYPE(self)->tp_name, self->name, self->value);
+#else
+	PyObject *out = NULL;
+	PyObject *name = PyObject_Repr(self->name);
+	PyObject *value = name ? PyObject_Repr(self->value) : NULL;
+	if (value)
+		out = PyString_FromFormat("%s(%s, %s)", Py_TYPE(self)->tp_name, PyString_AsString(name), PyString_AsString(value));
+	Py_XDECREF(name);
+	Py_XDECREF(value);
+	return out;
+#endif
+}
+
+static PyObject *Typed_reduce(Typed *self)
+{
+	return Py_BuildValue("(O(OO))", Py_TYPE(self), self->name, self->value);
+}
+
+static PyMethodDef Typed_methods[] =
+{
+	{"__reduce__", (PyCFunction)Typed_reduce, METH_NOARGS, "Pickle support."},
+	{NULL}
+};
+
+static PyObject *Typed_get_field(Typed *self, void *closure)
+{
+	PyObject *out = *(PyObject **)((char *)self + (size_t)closure);
+	Py_INCREF(out);
+	return out;
+}
+
+/* Fields can be replaced but never deleted, so they are never NULL */
+static int Typed_set_field(Typed *self, PyObject *value, void *closure)
+{
+	PyObject **field = (PyObject **)((char *)self + (size_t)closure);
+	if (!value)
+	{
+		PyErr_SetString(PyExc_AttributeError, "luxem.Typed fields can't be deleted.");
+		return -1;
+	}
+	Py_INCREF(value);
+	Py_DECREF(*field);
+	*field = value;
+	return 0;
+}
+
+static PyGetSetDef Typed_getset[] =
+{
+	{"name", (getter)Typed_get_field, (setter)Typed_set_field, "The type name.", (void *)offsetof(Typed, name)},
+	{"value", (getter)Typed_get_field, (setter)Typed_set_field, "The typed value.", (void *)offsetof(Typed, value)},
+	{NULL}
+};
+
+static luxem_bool_t TypedType_init(void)
+{
+	TypedType.tp_name = "luxem.Typed";
+	TypedType.tp_basicsize = sizeof(Typed);
+	TypedType.tp_dealloc = (destructor)Typed_dealloc;
+	TypedType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC;
+	TypedType.tp_doc = "An explicitly typed value";
+	TypedType.tp_traverse = (traverseproc)Typed_traverse;
+	TypedType.tp_clear = (inquiry)Typed_clear;
+	TypedType.tp_richcompare = Typed_richcompare;
+	TypedType.tp_hash = (hashfunc)Typed_hash;
+	TypedType.tp_repr = (reprfunc)Typed_repr;
+	TypedType.tp_methods = Typed_methods;
+	TypedType.tp_getset = Typed_getset;
+	TypedType.tp_init = (initproc)Typed_init;
+	TypedType.tp_new = Typed_new;
+	return PyType_Ready(&TypedType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* Stats */
+/*********/
+
+enum
+{
+	EVENT_OBJECT_BEGIN,
+	EVENT_OBJECT_END,
+	EVENT_ARRAY_BEGIN,
+	EVENT_ARRAY_END,
+	EVENT_KEY,
+	EVENT_TYPE,
+	EVENT_PRIMITIVE,
+	EVENT_COUNT
+};
+
+static char const *event_names[EVENT_COUNT] =
+{
+	"OBJECT_BEGIN",
+	"OBJECT_END",
+	"ARRAY_BEGIN",
+	"ARRAY_END",
+	"KEY",
+	"TYPE",
+	"PRIMITIVE",
+};
+
+static char const *stats_event_names[EVENT_COUNT] =
+{
+	"object_begin",
+	"object_end",
+	"array_begin",
+	"array_end",
+	"key",
+	"type",
+	"primitive",
+};
+
+#ifdef _WIN32
+static double stats_clock(void)
+{
+	LARGE_INTEGER frequency, counter;
+	QueryPerformanceFrequency(&frequency);
+	QueryPerformanceCounter(&counter);
+	return (double)counter.QuadPart / frequency.QuadPart;
+}
+#else
+static double stats_clock(void)
+{
+	struct timespec now;
+	clock_gettime(CLOCK_MONOTONIC, &now);
+	return now.tv_sec + now.tv_nsec * 1e-9;
+}
+#endif
+
+struct stats_counts_t
+{
+	size_t bytes;
+	size_t events[EVENT_COUNT];
+	size_t max_depth;
+	size_t carried;
+	size_t callbacks;
+	double callback_seconds;
+	double total_seconds;
+};
+
+/* Counters are only collected for the document in progress and added to the
+ * totals when the document is done.  Readers and writers only allocate this
+ * when stats are enabled. */
+struct stats_t
+{
+	struct stats_counts_t total;
+	struct stats_counts_t document;
+	size_t documents;
+	size_t depth;
+	/* Readers count a document's bytes from the parse position it started at */
+	size_t position;
+	luxem_bool_t timing;
+	PyObject *hook;
+};
+
+static struct stats_t *stats_create(PyObject *positional_args, PyObject *named_args)
+{
+	struct stats_t *stats;
+	luxem_bool_t timing = luxem_false;
+	PyObject *hook = Py_None;
+
+	static char *named_args_list[] =
+	{
+		"timing",
+		"hook",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"|bO",
+		named_args_list,
+		&timing,
+		&hook))
+		return NULL;
+
+	stats = calloc(1, sizeof(struct stats_t));
+	if (!stats)
+	{
+		PyErr_NoMemory();
+		return NULL;
+	}
+	stats->timing = timing;
+	if (hook != Py_None)
+	{
+		Py_INCREF(hook);
+		stats->hook = hook;
+	}
+	return stats;
+}
+
+static void stats_destroy(struct stats_t *stats)
+{
+	if (!stats) return;
+	Py_XDECREF(stats->hook);
+	free(stats);
+}
+
+static void stats_event(struct stats_t *stats, int code)
+{
+	stats->document.events[code] += 1;
+	switch (code)
+	{
+		case EVENT_OBJECT_BEGIN:
+		case EVENT_ARRAY_BEGIN:
+			stats->depth += 1;
+			if (stats->depth > stats->document.max_depth) stats->document.max_depth = stats->depth;
+			break;
+		case EVENT_OBJECT_END:
+		case EVENT_ARRAY_END:
+			if (stats->depth > 0) stats->depth -= 1;
+			break;
+		default:
+			break;
+	}
+}
+
+/* Returns a start time for stats_callback_end if timing */
+static double stats_callback_start(struct stats_t *stats)
+{
+	if (!stats) return 0;
+	stats->document.callbacks += 1;
+	return stats->timing ? stats_clock() : 0;
+}
+
+/* stats is reread by callers after the callback, since the callback may have
+ * disabled stats */
+static void stats_callback_end(struct stats_t *stats, double start)
+{
+	if (stats && start > 0) stats->document.callback_seconds += stats_clock() - start;
+}
+
+static double stats_total_start(struct stats_t *stats)
+{
+	return stats && stats->timing ? stats_clock() : 0;
+}
+
+static void stats_total_end(struct stats_t *stats, double start)
+{
+	if (stats && start > 0) stats->document.total_seconds += stats_clock() - start;
+}
+
+static void stats_merge(struct stats_counts_t *into, struct stats_counts_t const *from)
+{
+	int code;
+	into->bytes += from->bytes;
+	for (code = 0; code < EVENT_COUNT; ++code)
+		into->events[code] += from->events[code];
+	if (from->max_depth > into->max_depth) into->max_depth = from->max_depth;
+	into->carried += from->carried;
+	into->callbacks += from->callbacks;
+	into->callback_seconds += from->callback_seconds;
+	into->total_seconds += from->total_seconds;
+}
+
+static PyObject *stats_snapshot(struct stats_t const *stats, struct stats_counts_t const *counts)
+{
+	PyObject *events = PyDict_New();
+	int code;
+
+	if (!events) return NULL;
+	for (code = 0; code < EVENT_COUNT; ++code)
+	{
+		PyObject *count = WRAP_INT_FROM_SIZET(counts->events[code]);
+		if (!count || PyDict_SetItemString(events, stats_event_names[code], count) < 0)
+		{
+			Py_XDECREF(count);
+			Py_DECREF(events);
+			return NULL;
+		}
+		Py_DECREF(count);
+	}
+
+	if (stats->timing)
+		return Py_BuildValue(
+			"{s:n,s:N,s:n,s:n,s:n,s:d,s:d}",
+			"bytes", (Py_ssize_t)counts->bytes,
+			"events", events,
+			"max_depth", (Py_ssize_t)counts->max_depth,
+			"carried", (Py_ssize_t)counts->carried,
+			"callbacks", (Py_ssize_t)counts->callbacks,
+			"callback_seconds", counts->callback_seconds,
+			"native_seconds", counts->total_seconds - counts->callback_seconds);
+	return Py_BuildValue(
+		"{s:n,s:N,s:n,s:n,s:n,s:O,s:O}",
+		"bytes", (Py_ssize_t)counts->bytes,
+		"events", events,
+		"max_depth", (Py_ssize_t)counts->max_depth,
+		"carried", (Py_ssize_t)counts->carried,
+		"callbacks", (Py_ssize_t)counts->callbacks,
+		"callback_seconds", Py_None,
+		"native_seconds", Py_None);
+}
+
+/* Returns the totals so far, including the document in progress */
+static PyObject *stats_get(struct stats_t const *stats)
+{
+	struct stats_counts_t counts;
+	PyObject *out, *documents;
+
+	if (!stats)
+	{
+		Py_INCREF(Py_None);
+		return Py_None;
+	}
+
+	counts = stats->total;
+	stats_merge(&counts, &stats->document);
+	out = stats_snapshot(stats, &counts);
+	if (!out) return NULL;
+	documents = WRAP_INT_FROM_SIZET(stats->documents);
+	if (!documents || PyDict_SetItemString(out, "documents", documents) < 0)
+	{
+		Py_XDECREF(documents);
+		Py_DECREF(out);
+		return NULL;
+	}
+	Py_DECREF(documents);
+	return out;
+}
+
+/* Adds the finished document to the totals and passes its stats to the hook.
+ * stats may be freed by the hook, so it mustn't be used after this. */
+static luxem_bool_t stats_document_done(struct stats_t *stats)
+{
+	PyObject *snapshot = NULL, *hook = stats->hook, *result;
+
+	if (hook)
+	{
+		snapshot = stats_snapshot(stats, &stats->document);
+		if (!snapshot) return luxem_false;
+	}
+	stats_merge(&stats->total, &stats->document);
+	memset(&stats->document, 0, sizeof(stats->document));
+	stats->documents += 1;
+	stats->depth = 0;
+	if (!hook) return luxem_true;
+
+	Py_INCREF(hook);
+	result = PyObject_CallFunctionObjArgs(hook, snapshot, NULL);
+	Py_DECREF(hook);
+	Py_DECREF(snapshot);
+	if (!result) return luxem_false;
+	Py_DECREF(result);
+	return luxem_true;
+}
+
+/* ************************************************************************** */
+
 /* Reader */
 /**********/
 
+#define DEFAULT_INTERN_SIZE 256
+
+struct intern_entry_t
+{
+	size_t hash;
+	PyObject *value;
+};
+
 typedef struct {
 	PyObject_HEAD
 	struct luxem_rawread_context_t *context;
@@ -66,8 +611,95 @@ typedef struct {
 	PyObject *type;
 	PyObject *primitive;
 	PyThreadState *thread_state;
+	char *carry;
+	size_t carry_length;
+	size_t carry_capacity;
+	struct intern_entry_t *intern;
+	size_t intern_mask;
+	size_t intern_primitives;
+	struct stats_t *stats;
+	struct luxem_rawread_callbacks_t inner_callbacks;
+	/* Set by reader types whose callbacks never touch Python objects, so
+	 * in-memory data can be parsed with the GIL released */
+	luxem_bool_t release_gil;
+	luxem_bool_t feeding;
+	luxem_bool_t no_memory;
 } Reader;
 
+static void reader_clear_intern(Reader *self)
+{
+	if (self->intern)
+	{
+		size_t index;
+		for (index = 0; index <= self->intern_mask; ++index)
+			Py_XDECREF(self->intern[index].value);
+		free(self->intern);
+		self->intern = NULL;
+	}
+	self->intern_mask = 0;
+}
+
+static luxem_bool_t reader_set_intern(Reader *self, Py_ssize_t size, Py_ssize_t primitives)
+{
+	reader_clear_intern(self);
+	if (size > 0)
+	{
+		size_t slots = 1;
+		while (slots < (size_t)size) slots <<= 1;
+		self->intern = calloc(slots, sizeof(struct intern_entry_t));
+		if (!self->intern)
+		{
+			PyErr_NoMemory();
+			return luxem_false;
+		}
+		self->intern_mask = slots - 1;
+	}
+	self->intern_primitives = primitives > 0 ? primitives : 0;
+	return luxem_true;
+}
+
+/* Returns a shared string from a fixed size cache if possible, replacing any cached string in the same slot otherwise */
+static PyObject *reader_string(Reader *self, struct luxem_string_t const *string)
+{
+	struct intern_entry_t *entry;
+	size_t hash = 2166136261u;
+	size_t index;
+
+	if (!self->intern) return wrap_string(string);
+
+	for (index = 0; index < string->length; ++index)
+		hash = (hash ^ (unsigned char)string->pointer[index]) * 16777619u;
+	entry = &self->intern[hash & self->intern_mask];
+
+	if (entry->value && entry->hash == hash)
+	{
+		char const *pointer;
+		Py_ssize_t length;
+		WRAP_STRING_TO(entry->value, (char **)&pointer, &length);
+		if (pointer && (size_t)length == string->length && memcmp(pointer, string->pointer, length) == 0)
+		{
+			Py_INCREF(entry->value);
+			return entry->value;
+		}
+	}
+
+	{
+		PyObject *value = wrap_string(string);
+		if (!value) return NULL;
+		Py_XDECREF(entry->value);
+		Py_INCREF(value);
+		entry->hash = hash;
+		entry->value = value;
+		return value;
+	}
+}
+
+static PyObject *reader_primitive_string(Reader *self, struct luxem_string_t const *string)
+{
+	if (string->length > self->intern_primitives) return wrap_string(string);
+	return reader_string(self, string);
+}
+
 #define TRANSLATE_VOID_CALLBACK(name) \
 static luxem_bool_t translate_rawread_##name(struct luxem_rawread_context_t *context, Reader *user_data) \
 { \
@@ -92,11 +724,13 @@ TRANSLATE_VOID_CALLBACK(object_end)
 TRANSLATE_VOID_CALLBACK(array_begin)
 TRANSLATE_VOID_CALLBACK(array_end)
 
-#define TRANSLATE_STRING_CALLBACK(name) \
+#define TRANSLATE_STRING_CALLBACK(name, wrap) \
 static luxem_bool_t translate_rawread_##name(struct luxem_rawread_context_t *context, Reader *user_data, struct luxem_string_t const *string) \
 { \
-	PyObject *prearguments = WRAP_STRING_FROM(string->pointer == 0 ? (char *) 1 : string->pointer, string->length); \
-	PyObject *arguments = Py_BuildValue("(O)", prearguments); \
+	PyObject *prearguments = wrap(user_data, string); \
+	PyObject *arguments; \
+	if (!prearguments) return rawread_python_error(context); \
+	arguments = Py_BuildValue("(O)", prearguments); \
 	Py_DECREF(prearguments); \
 	if (!arguments) return luxem_false; \
 	{ \
@@ -113,9 +747,9 @@ static luxem_bool_t translate_rawread_##name(struct luxem_rawread_context_t *con
 	return luxem_true; \
 }
 
-TRANSLATE_STRING_CALLBACK(key)
-TRANSLATE_STRING_CALLBACK(type)
-TRANSLATE_STRING_CALLBACK(primitive)
+TRANSLATE_STRING_CALLBACK(key, reader_string)
+TRANSLATE_STRING_CALLBACK(type, reader_string)
+TRANSLATE_STRING_CALLBACK(primitive, reader_primitive_string)
 
 static PyObject *Reader_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
 {
@@ -150,13 +784,32 @@ static PyObject *Reader_new(PyTypeObject *type, PyObject *positional_args, PyObj
 		self->type = NULL;
 		self->primitive = NULL;
 		self->thread_state = NULL;
+		self->carry = NULL;
+		self->carry_length = 0;
+		self->carry_capacity = 0;
+		self->intern = NULL;
+		self->intern_mask = 0;
+		self->stats = NULL;
+		self->intern_primitives = 0;
+		self->release_gil = luxem_false;
+		self->feeding = luxem_false;
+		self->no_memory = luxem_false;
 	}
 
 	return (PyObject *)self;
 }
 
+static luxem_bool_t reader_check_idle(Reader *self)
+{
+	if (!self->feeding) return luxem_true;
+	PyErr_SetString(PyExc_RuntimeError, "luxem reader is being fed, by a callback or another thread.");
+	return luxem_false;
+}
+
 static int Reader_init(Reader *self, PyObject *positional_args, PyObject *named_args)
 {
+	Py_ssize_t intern_size = DEFAULT_INTERN_SIZE, intern_primitives = 0;
+
 	static char *named_args_list[] =
 	{
 		"object_begin",
@@ -166,13 +819,16 @@ static int Reader_init(Reader *self, PyObject *positional_args, PyObject *named_
 		"key",
 		"type",
 		"primitive",
+		"intern_size",
+		"intern_primitives",
 		NULL
 	};
 
+	if (!reader_check_idle(self)) return -1;
 	if (!PyArg_ParseTupleAndKeywords(
 		positional_args,
 		named_args,
-		"OOOOOOO",
+		"OOOOOOO|nn",
 		named_args_list,
 		&self->object_begin,
 		&self->object_end,
@@ -180,9 +836,13 @@ static int Reader_init(Reader *self, PyObject *positional_args, PyObject *named_
 		&self->array_end,
 		&self->key,
 		&self->type,
-		&self->primitive))
+		&self->primitive,
+		&intern_size,
+		&intern_primitives))
 		return -1;
 
+	if (!reader_set_intern(self, intern_size, intern_primitives)) return -1;
+
 	Py_INCREF(self->object_begin);
 	Py_INCREF(self->object_end);
 	Py_INCREF(self->array_begin);
@@ -197,6 +857,9 @@ static int Reader_init(Reader *self, PyObject *positional_args, PyObject *named_
 static void Reader_dealloc(Reader *self)
 {
 	luxem_rawread_destroy(self->context);
+	free(self->carry);
+	reader_clear_intern(self);
+	stats_destroy(self->stats);
 	Py_XDECREF(self->object_begin);
 	Py_XDECREF(self->object_end);
 	Py_XDECREF(self->array_begin);
@@ -207,39 +870,68 @@ static void Reader_dealloc(Reader *self)
 	Py_TYPE(self)->tp_free((PyObject*)self);
 }
 
-void format_context_error(struct luxem_rawread_context_t *context)
+/* Raises the parser's own error.  Returns false without raising anything if
+ * the parse was stopped by a callback instead. */
+static luxem_bool_t format_rawread_error(struct luxem_rawread_context_t *context)
 {
-	if (luxem_rawread_get_error(context)->pointer != &exception_marker)
+	if (luxem_rawread_get_error(context)->pointer == &exception_marker) return luxem_false;
+	assert(luxem_rawread_get_error(context)->length > 0);
 	{
-		assert(luxem_rawread_get_error(context)->length > 0);
+		struct luxem_string_t const *error = luxem_rawread_get_error(context);
+		char const *error_format = "%.*s [offset %lu]";
+		int formatted_error_size = snprintf(NULL, 0, error_format, error->length, error->pointer, luxem_rawread_get_position(context));
+		assert(formatted_error_size >= 0);
+		if (formatted_error_size < 0)
 		{
-			struct luxem_string_t const *error = luxem_rawread_get_error(context);
-			char const *error_format = "%.*s [offset %lu]";
-			int formatted_error_size = snprintf(NULL, 0, error_format, error->length, error->pointer, luxem_rawread_get_position(context));
-			assert(formatted_error_size >= 0);
-			if (formatted_error_size < 0)
-			{
-				PyErr_SetString(PyExc_ValueError, "Encountered an exception, then encountered an error while trying to format the exception.");
-			}
-			else
+			PyErr_SetString(PyExc_ValueError, "Encountered an exception, then encountered an error while trying to format the exception.");
+		}
+		else
+		{
+			formatted_error_size += 1; /* Was returning one too small */
 			{
-				formatted_error_size += 1; /* Was returning one too small */
-				{
-					char *formatted_error = malloc(formatted_error_size);
-					snprintf(formatted_error, formatted_error_size, error_format, error->length, error->pointer, luxem_rawread_get_position(context));
-					PyErr_SetString(PyExc_ValueError, formatted_error);
-					free(formatted_error);
-				}
+				char *formatted_error = malloc(formatted_error_size);
+				snprintf(formatted_error, formatted_error_size, error_format, error->length, error->pointer, luxem_rawread_get_position(context));
+				PyErr_SetString(PyExc_ValueError, formatted_error);
+				free(formatted_error);
 			}
 		}
 	}
-	else
+	return luxem_true;
+}
+
+void format_context_error(struct luxem_rawread_context_t *context)
+{
+	if (!format_rawread_error(context))
 	{
-		/* Pass through python exception */
+		/* Pass through python exception, or raise one deferred while the GIL was released */
+		Reader *self = luxem_rawread_callbacks(context)->user_data;
 		assert(luxem_rawread_get_error(context)->length == 0);
+		if (self->no_memory)
+		{
+			self->no_memory = luxem_false;
+			PyErr_NoMemory();
+		}
 	}
 }
 
+/* Feeds in-memory data, releasing the GIL for the whole parse if the callbacks
+ * allow it.  The reader is marked as feeding either way so callbacks can't
+ * reset it or feed it again while rawread is still using the context. */
+static luxem_bool_t reader_rawread_feed(Reader *self, struct luxem_string_t *string, size_t *eaten, luxem_bool_t finish)
+{
+	luxem_bool_t success;
+	self->feeding = luxem_true;
+	if (!self->release_gil) success = luxem_rawread_feed(self->context, string, eaten, finish);
+	else
+	{
+		Py_BEGIN_ALLOW_THREADS
+		success = luxem_rawread_feed(self->context, string, eaten, finish);
+		Py_END_ALLOW_THREADS
+	}
+	self->feeding = luxem_false;
+	return success;
+}
+
 void feed_unlock_gil(struct luxem_rawread_context_t *context, Reader *self)
 {
 	assert(!self->thread_state);
@@ -253,6 +945,23 @@ void feed_lock_gil(struct luxem_rawread_context_t *context, Reader *self)
 	self->thread_state = NULL;
 }
 
+/* Counts the bytes parsed since the last count towards the document in progress */
+static void reader_stats_position(struct stats_t *stats, struct luxem_rawread_context_t *context)
+{
+	size_t position = luxem_rawread_get_position(context);
+	if (position > stats->position) stats->document.bytes += position - stats->position;
+	stats->position = position;
+}
+
+/* Records the time and bytes of a feed.  Documents are finished by the event
+ * callbacks as each root value is read. */
+static void reader_stats_fed(Reader *self, double start)
+{
+	if (!self->stats) return;
+	reader_stats_position(self->stats, self->context);
+	stats_total_end(self->stats, start);
+}
+
 static PyObject *Reader_feed(Reader *self, PyObject *positional_args, PyObject *named_args)
 {
 	PyObject *data;
@@ -274,26 +983,42 @@ static PyObject *Reader_feed(Reader *self, PyObject *positional_args, PyObject *
 		&finish))
 		return NULL;
 
-	if (WRAP_BYTES_CHECK(data))
+	if (!reader_check_idle(self)) return NULL;
+
+	if (PyObject_CheckBuffer(data))
 	{
+		Py_buffer view;
 		struct luxem_string_t string;
 		size_t eaten = 0;
-		WRAP_BYTES_TO(data, (char **)&string.pointer, &string.length);
+		luxem_bool_t success;
+		double start;
+		if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) return NULL;
+		string.pointer = view.buf;
+		string.length = view.len;
 
-		if (!luxem_rawread_feed(self->context, &string, &eaten, finish))
+		start = stats_total_start(self->stats);
+		success = reader_rawread_feed(self, &string, &eaten, finish);
+		PyBuffer_Release(&view);
+		if (!success)
 		{
 			format_context_error(self->context);
 			return NULL;
 		}
+		reader_stats_fed(self, start);
 
 		return WRAP_INT_FROM_SIZET(eaten);
 	}
 	else if (WRAP_FILE_CHECK(data))
 	{
 		luxem_bool_t success;
+		double start;
 		FILE *file = WRAP_FILE_TO(data, "r");
 		WRAP_FILE_INC(data);
+		self->feeding = luxem_true;
+		start = stats_total_start(self->stats);
 		success = luxem_rawread_feed_file(self->context, file, feed_unlock_gil, feed_lock_gil);
+		self->feeding = luxem_false;
+		if (success) reader_stats_fed(self, start);
 		WRAP_FILE_DEC(data);
 		if (!success)
 		{
@@ -306,328 +1031,3364 @@ static PyObject *Reader_feed(Reader *self, PyObject *positional_args, PyObject *
 	}
 	else
 	{
-		PyErr_SetString(PyExc_TypeError, "luxem.RawReader.feed requires a single bytes or binary file argument.");
+		PyErr_SetString(PyExc_TypeError, "luxem.RawReader.feed requires a single bytes-like or binary file argument.");
 		return NULL;
 	}
 }
 
-static PyMethodDef Reader_methods[] =
-{
-	{
-		"feed",
-		(PyCFunction)Reader_feed,
-		METH_VARARGS | METH_KEYWORDS,
-		"Stream from bytes or binary file argument."
-	},
-	{NULL}
-};
-
-static PyTypeObject ReaderType = {PyObject_HEAD_INIT(NULL) 0};
-
-static luxem_bool_t ReaderType_init(void)
-{
-	ReaderType.tp_name = "luxem.RawReader";
-	ReaderType.tp_basicsize = sizeof(Reader);
-	ReaderType.tp_dealloc = (destructor)Reader_dealloc;
-	ReaderType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
-	ReaderType.tp_doc = "Decodes luxem data";
-	ReaderType.tp_methods = Reader_methods;
-	ReaderType.tp_init = (initproc)Reader_init;
-	ReaderType.tp_new = Reader_new;
-	return PyType_Ready(&ReaderType) >= 0;
-}
-
-/* ************************************************************************** */
-
-/* luxem writer */
-/****************/
-
-typedef struct {
-	PyObject_HEAD
-	struct luxem_rawwrite_context_t *context;
-	PyObject *target;
-	FILE *file;
-} Writer;
-
-static luxem_bool_t translate_rawwrite_write(struct luxem_rawwrite_context_t *context, Writer *user_data, struct luxem_string_t const *string)
+static luxem_bool_t reader_carry_append(Reader *self, char const *pointer, size_t length)
 {
-#if PY_MAJOR_VERSION >= 3
-	PyObject *arguments = Py_BuildValue("(y#)", string->pointer, string->length);
-#else
-	PyObject *arguments = Py_BuildValue("(s#)", string->pointer, string->length);
-#endif
-	if (!arguments) return luxem_false;
+	if (self->carry_length + length > self->carry_capacity)
 	{
-		PyObject *result = PyEval_CallObject(user_data->target, arguments);
-		Py_DECREF(arguments);
-		if (!result)
+		size_t capacity = self->carry_capacity ? self->carry_capacity : 256;
+		char *carry;
+		while (capacity < self->carry_length + length) capacity *= 2;
+		carry = realloc(self->carry, capacity);
+		if (!carry)
 		{
-			luxem_rawwrite_get_error(context)->pointer = &exception_marker;
-			luxem_rawwrite_get_error(context)->length = 0;
+			PyErr_NoMemory();
 			return luxem_false;
 		}
-		Py_DECREF(result);
+		self->carry = carry;
+		self->carry_capacity = capacity;
 	}
+	memcpy(self->carry + self->carry_length, pointer, length);
+	self->carry_length += length;
+	if (self->stats) self->stats->document.carried += length;
 	return luxem_true;
 }
 
-static PyObject *Writer_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
-{
-	Writer *self = (Writer *)type->tp_alloc(type, 0);
+/* Smallest amount of a pushed chunk joined to the carry at a time */
+#define READER_JOIN_STEP 256
 
-	if (self != NULL)
+/* Feeds the carry joined with just enough of data to finish its unfinished token,
+ * doubling the amount joined each time.  Returns the offset in data where
+ * parsing continues, or all of data if the carry still holds an unfinished token. */
+static luxem_bool_t reader_push_carry(Reader *self, char const *data, size_t length, size_t *position)
+{
+	size_t step = self->carry_length < READER_JOIN_STEP ? READER_JOIN_STEP : self->carry_length;
+	*position = 0;
+	while (*position < length)
 	{
-		self->context = luxem_rawwrite_construct();
-		if (!self->context)
+		struct luxem_string_t string;
+		size_t eaten = 0;
+		size_t pending = self->carry_length;
+		size_t join = length - *position < step ? length - *position : step;
+		if (!reader_carry_append(self, data + *position, join)) return luxem_false;
+		*position += join;
+		string.pointer = self->carry;
+		string.length = self->carry_length;
+		if (!reader_rawread_feed(self, &string, &eaten, luxem_false))
 		{
-			Py_DECREF(self);
-			return NULL;
+			format_context_error(self->context);
+			return luxem_false;
 		}
-
-		self->target = NULL;
-		self->file = NULL;
+		if (eaten >= pending)
+		{
+			/* Everything not yet parsed is in data */
+			*position -= self->carry_length - eaten;
+			self->carry_length = 0;
+			return luxem_true;
+		}
+		memmove(self->carry, self->carry + eaten, self->carry_length - eaten);
+		self->carry_length -= eaten;
+		step *= 2;
 	}
-
-	return (PyObject *)self;
+	return luxem_true;
 }
 
-static int Writer_init(Writer *self, PyObject *positional_args, PyObject *named_args)
+static PyObject *Reader_push(Reader *self, PyObject *positional_args, PyObject *named_args)
 {
-	luxem_bool_t pretty = luxem_false, use_spaces = luxem_false;
-	int indent_multiple = 1;
+	PyObject *data;
+	luxem_bool_t finish = luxem_false;
+	Py_buffer view;
+	struct luxem_string_t string;
+	size_t eaten = 0;
+	size_t position = 0;
+	size_t length;
+	double start;
 
 	static char *named_args_list[] =
 	{
-		"target",
-		"pretty",
-		"use_spaces",
-		"indent_multiple",
+		"data",
+		"finish",
 		NULL
 	};
 
 	if (!PyArg_ParseTupleAndKeywords(
 		positional_args,
 		named_args,
-		"|Obbi",
+		"O|b",
 		named_args_list,
-		&self->target,
-		&pretty,
-		&use_spaces,
-		&indent_multiple))
-		return -1;
-
-	if (self->target)
-	{
-		Py_INCREF(self->target);
-		if (WRAP_FILE_CHECK(self->target))
-		{
-			self->file = WRAP_FILE_TO(self->target, "w");
-			if (self->file == NULL) return -1;
-			WRAP_FILE_INC(self->file);
-			luxem_rawwrite_set_file_out(self->context, self->file);
-		}
-		else
-			luxem_rawwrite_set_write_callback(self->context, (luxem_rawwrite_write_callback_t)translate_rawwrite_write, self);
-	}
-	else luxem_rawwrite_set_buffer_out(self->context);
-
-	if (pretty)
-		luxem_rawwrite_set_pretty(self->context, use_spaces ? ' ' : '\t', indent_multiple);
-
-	return 0;
-}
+		&data,
+		&finish))
+		return NULL;
 
-static void Writer_dealloc(Writer *self)
-{
-	luxem_rawwrite_destroy(self->context);
-	if (self->file != NULL)
-	{
-		fflush(self->file);
-		WRAP_FILE_DEC(self->file);
-	}
-	Py_XDECREF(self->target);
-	Py_TYPE(self)->tp_free((PyObject*)self);
-}
+	if (!reader_check_idle(self)) return NULL;
 
-static PyObject *translate_void_method(Writer *self, luxem_bool_t (*method)(struct luxem_rawwrite_context_t *))
-{
-	if (!method(self->context))
+	if (!PyObject_CheckBuffer(data))
 	{
-		if (luxem_rawwrite_get_error(self->context)->pointer != &exception_marker)
-		{
-			struct luxem_string_t const *error = luxem_rawwrite_get_error(self->context);
-			assert(error->length > 0);
-			PyErr_SetObject(PyExc_ValueError, WRAP_STRING_FROM(error->pointer, error->length));
-		}
-		else
-		{
-			/* Pass through python exception */
-			assert(luxem_rawwrite_get_error(self->context)->length == 0);
-		}
+		PyErr_SetString(PyExc_TypeError, "luxem.RawReader.push requires a single bytes-like argument.");
 		return NULL;
 	}
 
-	Py_INCREF((PyObject *)self);
-	return (PyObject *)self;
-}
-
-static PyObject *Writer_object_begin(Writer *self) { return translate_void_method(self, luxem_rawwrite_object_begin); }
-static PyObject *Writer_object_end(Writer *self) { return translate_void_method(self, luxem_rawwrite_object_end); }
-static PyObject *Writer_array_begin(Writer *self) { return translate_void_method(self, luxem_rawwrite_array_begin); }
-static PyObject *Writer_array_end(Writer *self) { return translate_void_method(self, luxem_rawwrite_array_end); }
-
-static PyObject *translate_string_method(Writer *self, PyObject *positional_args, luxem_bool_t (*method)(struct luxem_rawwrite_context_t *, struct luxem_string_t const *), char const *badargs)
-{
-	PyObject *argument;
+	if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) return NULL;
+	length = view.len;
+	start = stats_total_start(self->stats);
 
-	if (!PyArg_ParseTuple(
-		positional_args,
-		"O",
-		&argument))
+	/* Only the unfinished token left by the last push is joined with the new data */
+	if (self->carry_length > 0 && !reader_push_carry(self, view.buf, length, &position))
+	{
+		PyBuffer_Release(&view);
+		self->carry_length = 0;
 		return NULL;
+	}
 
-	if (WRAP_STRING_CHECK(argument))
+	if (self->carry_length > 0)
 	{
-		struct luxem_string_t string;
-		WRAP_STRING_TO(argument, (char **)&string.pointer, &string.length);
-
-		if (!method(self->context, &string))
+		/* All of the data joined the unfinished token */
+		if (finish)
 		{
-			if (luxem_rawwrite_get_error(self->context)->pointer != &exception_marker)
-			{
-				struct luxem_string_t const *error = luxem_rawwrite_get_error(self->context);
-				assert(error->length > 0);
-				PyErr_SetObject(PyExc_ValueError, WRAP_STRING_FROM(error->pointer, error->length));
-			}
-			else
+			string.pointer = self->carry;
+			string.length = self->carry_length;
+			self->carry_length = 0;
+			if (!reader_rawread_feed(self, &string, &eaten, luxem_true))
 			{
-				/* Pass through python exception */
-				assert(luxem_rawwrite_get_error(self->context)->length == 0);
+				PyBuffer_Release(&view);
+				format_context_error(self->context);
+				return NULL;
 			}
-			return NULL;
 		}
 	}
 	else
 	{
-		PyErr_SetString(PyExc_TypeError, badargs);
-		return NULL;
+		string.pointer = (char const *)view.buf + position;
+		string.length = length - position;
+		if (!reader_rawread_feed(self, &string, &eaten, finish))
+		{
+			PyBuffer_Release(&view);
+			format_context_error(self->context);
+			return NULL;
+		}
+		if (!finish && !reader_carry_append(self, string.pointer + eaten, string.length - eaten))
+		{
+			PyBuffer_Release(&view);
+			return NULL;
+		}
 	}
 
-	Py_INCREF((PyObject *)self);
-	return (PyObject *)self;
+	PyBuffer_Release(&view);
+	reader_stats_fed(self, start);
+	Py_INCREF(Py_None);
+	return Py_None;
 }
 
-static PyObject *Writer_key(Writer *self, PyObject *positional_args)
-	{ return translate_string_method(self, positional_args, luxem_rawwrite_key, "luxem.RawWriter.key requires a single string argument."); }
-static PyObject *Writer_type(Writer *self, PyObject *positional_args)
-	{ return translate_string_method(self, positional_args, luxem_rawwrite_type, "luxem.RawWriter.type requires a single string argument."); }
-static PyObject *Writer_primitive(Writer *self, PyObject *positional_args)
-	{ return translate_string_method(self, positional_args, luxem_rawwrite_primitive, "luxem.RawWriter.primitive requires a single string argument."); }
-
-static PyObject *Writer_dump(Writer *self)
+/* Finishes the document if the event just handled completed a root value */
+static luxem_bool_t reader_stats_root(struct luxem_rawread_context_t *context, Reader *self, int code)
 {
-	if (self->target)
-	{
-		PyErr_SetString(PyExc_TypeError, "luxem.RawWriter.dump can only be used if not using a custom serialize callback for serializing to file.");
-		return NULL;
-	}
+	struct stats_t *stats = self->stats;
+	luxem_bool_t success;
+	if (!stats || stats->depth > 0 || code == EVENT_TYPE) return luxem_true;
+	reader_stats_position(stats, context);
+	if (!stats->hook) success = stats_document_done(stats);
 	else
 	{
-		struct luxem_string_t *rendered = luxem_rawwrite_buffer_render(self->context);
-		if (!rendered)
-		{
-				struct luxem_string_t const *error = luxem_rawwrite_get_error(self->context);
-				assert(error->length > 0);
-				PyErr_SetObject(PyExc_ValueError, WRAP_STRING_FROM(error->pointer, error->length));
-				return NULL;
-		}
-
-		PyObject *out = WRAP_BYTES_FROM(rendered->pointer, rendered->length);
-		free(rendered);
-		return out;
+		/* The parse may be running with the GIL released */
+		PyGILState_STATE gil = PyGILState_Ensure();
+		success = stats_document_done(stats);
+		PyGILState_Release(gil);
 	}
+	return success || rawread_python_error(context);
 }
 
-static PyMethodDef Writer_methods[] =
+static luxem_bool_t stats_handle_void(struct luxem_rawread_context_t *context, Reader *self, int code, luxem_rawread_void_callback_t handler)
 {
-	{"object_begin", (PyCFunction)Writer_object_begin, METH_NOARGS, "Start a new object."},
-	{"object_end", (PyCFunction)Writer_object_end, METH_NOARGS, "End current object."},
-	{"array_begin", (PyCFunction)Writer_array_begin, METH_NOARGS, "Start a new array."},
-	{"array_end", (PyCFunction)Writer_array_end, METH_NOARGS, "End current array."},
-	{"key", (PyCFunction)Writer_key, METH_VARARGS, "Write a key."},
-	{"type", (PyCFunction)Writer_type, METH_VARARGS, "Write a type."},
-	{"primitive", (PyCFunction)Writer_primitive, METH_VARARGS, "Write a primitive."},
-	{"dump", (PyCFunction)Writer_dump, METH_NOARGS, "If serializing to a buffer, returns all rendered data so far."},
-	{NULL}
-};
-
-static PyTypeObject WriterType = {PyObject_HEAD_INIT(NULL) 0};
+	double start;
+	luxem_bool_t result;
+	stats_event(self->stats, code);
+	start = stats_callback_start(self->stats);
+	result = handler(context, self);
+	stats_callback_end(self->stats, start);
+	return result && reader_stats_root(context, self, code);
+}
 
-static luxem_bool_t WriterType_init(void)
+static luxem_bool_t stats_handle_string(struct luxem_rawread_context_t *context, Reader *self, int code, luxem_rawread_string_callback_t handler, struct luxem_string_t const *string)
 {
-	WriterType.tp_name = "luxem.RawWriter";
-	WriterType.tp_basicsize = sizeof(Writer);
-	WriterType.tp_dealloc = (destructor)Writer_dealloc;
-	WriterType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
-	WriterType.tp_doc = "Encodes luxem data";
-	WriterType.tp_methods = Writer_methods;
-	WriterType.tp_init = (initproc)Writer_init;
-	WriterType.tp_new = Writer_new;
-	return PyType_Ready(&WriterType) >= 0;
+	double start;
+	luxem_bool_t result;
+	stats_event(self->stats, code);
+	start = stats_callback_start(self->stats);
+	result = handler(context, self, string);
+	stats_callback_end(self->stats, start);
+	return result && reader_stats_root(context, self, code);
 }
 
-/* ************************************************************************** */
+/* Only installed while stats are enabled, wrapping whatever callbacks the
+ * reader type uses */
+#define STATS_VOID_CALLBACK(name, code) \
+static luxem_bool_t stats_rawread_##name(struct luxem_rawread_context_t *context, Reader *self) \
+	{ return stats_handle_void(context, self, code, self->inner_callbacks.name); }
 
-/* luxem module + module entry point */
-/*************************************/
+#define STATS_STRING_CALLBACK(name, code) \
+static luxem_bool_t stats_rawread_##name(struct luxem_rawread_context_t *context, Reader *self, struct luxem_string_t const *string) \
+	{ return stats_handle_string(context, self, code, self->inner_callbacks.name, string); }
 
-static PyObject *translate_to_from_ascii16(PyObject *self, PyObject *positional_args, struct luxem_string_t const *(*function)(struct luxem_string_t const *, struct luxem_string_t *))
+STATS_VOID_CALLBACK(object_begin, EVENT_OBJECT_BEGIN)
+STATS_VOID_CALLBACK(object_end, EVENT_OBJECT_END)
+STATS_VOID_CALLBACK(array_begin, EVENT_ARRAY_BEGIN)
+STATS_VOID_CALLBACK(array_end, EVENT_ARRAY_END)
+STATS_STRING_CALLBACK(key, EVENT_KEY)
+STATS_STRING_CALLBACK(type, EVENT_TYPE)
+STATS_STRING_CALLBACK(primitive, EVENT_PRIMITIVE)
+
+static PyObject *Reader_enable_stats(Reader *self, PyObject *positional_args, PyObject *named_args)
 {
-	PyObject *argument;
-	if (!PyArg_ParseTuple(
-		positional_args,
-		"O",
-		&argument))
-		return NULL;
+	struct stats_t *stats;
+	if (!reader_check_idle(self)) return NULL;
+	stats = stats_create(positional_args, named_args);
+	if (!stats) return NULL;
+	stats->position = luxem_rawread_get_position(self->context);
 
-	if (WRAP_STRING_CHECK(argument))
-	{
-		struct luxem_string_t string;
-		struct luxem_string_t error;
-		struct luxem_string_t const *out;
-		PyObject *out_string;
-		WRAP_STRING_TO(argument, (char **)&string.pointer, &string.length);
-		out = function(&string, &error);
-		if (!out)
-		{
-			PyErr_SetObject(PyExc_ValueError, WRAP_STRING_FROM(error.pointer, error.length));
-			return NULL;
-		}
-		out_string = WRAP_STRING_FROM(out->pointer, out->length);
-		free((void *)out);
-		return out_string;
-	}
+	if (self->stats) stats_destroy(self->stats);
 	else
 	{
-		PyErr_SetString(PyExc_TypeError, "A single string argument is required.");
-		return NULL;
+		struct luxem_rawread_callbacks_t *callbacks = luxem_rawread_callbacks(self->context);
+		self->inner_callbacks = *callbacks;
+		callbacks->object_begin = (luxem_rawread_void_callback_t)stats_rawread_object_begin;
+		callbacks->object_end = (luxem_rawread_void_callback_t)stats_rawread_object_end;
+		callbacks->array_begin = (luxem_rawread_void_callback_t)stats_rawread_array_begin;
+		callbacks->array_end = (luxem_rawread_void_callback_t)stats_rawread_array_end;
+		callbacks->key = (luxem_rawread_string_callback_t)stats_rawread_key;
+		callbacks->type = (luxem_rawread_string_callback_t)stats_rawread_type;
+		callbacks->primitive = (luxem_rawread_string_callback_t)stats_rawread_primitive;
 	}
+	self->stats = stats;
+
+	Py_INCREF(Py_None);
+	return Py_None;
 }
 
-static PyObject *translate_to_ascii16(PyObject *self, PyObject *positional_args)
-	{ return translate_to_from_ascii16(self, positional_args, luxem_to_ascii16); }
+static PyObject *Reader_disable_stats(Reader *self)
+{
+	if (!reader_check_idle(self)) return NULL;
+	if (self->stats)
+	{
+		struct stats_t *stats = self->stats;
+		*luxem_rawread_callbacks(self->context) = self->inner_callbacks;
+		self->stats = NULL;
+		stats_destroy(stats);
+	}
+
+	Py_INCREF(Py_None);
+	return Py_None;
+}
 
-static PyObject *translate_from_ascii16(PyObject *self, PyObject *positional_args)
-	{ return translate_to_from_ascii16(self, positional_args, luxem_from_ascii16); }
+static PyObject *Reader_stats(Reader *self)
+	{ return stats_get(self->stats); }
 
-static PyMethodDef luxem_methods[] =
+/* Discards any partially parsed document, keeping the callbacks, intern
+ * cache and stats totals.  rawread has no reset, but a fresh context is far
+ * cheaper than a new reader. */
+static luxem_bool_t reader_reset(Reader *self)
 {
-	{"to_ascii16", (PyCFunction)translate_to_ascii16, METH_VARARGS, "Encode ascii16."},
-	{"from_ascii16", (PyCFunction)translate_from_ascii16, METH_VARARGS, "Decode ascii16."},
-	{NULL}
-};
+	struct luxem_rawread_context_t *context;
 
-#if PY_MAJOR_VERSION >= 3
+	if (!reader_check_idle(self)) return luxem_false;
+	context = luxem_rawread_construct();
+	if (!context)
+	{
+		PyErr_NoMemory();
+		return luxem_false;
+	}
+	*luxem_rawread_callbacks(context) = *luxem_rawread_callbacks(self->context);
+	luxem_rawread_destroy(self->context);
+	self->context = context;
+	self->carry_length = 0;
+	self->no_memory = luxem_false;
+	if (self->stats)
+	{
+		memset(&self->stats->document, 0, sizeof(self->stats->document));
+		self->stats->depth = 0;
+		self->stats->position = 0;
+	}
+	return luxem_true;
+}
+
+static PyObject *Reader_reset(Reader *self)
+{
+	if (!reader_reset(self)) return NULL;
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static PyMethodDef Reader_methods[] =
+{
+	{
+		"feed",
+		(PyCFunction)Reader_feed,
+		METH_VARARGS | METH_KEYWORDS,
+		"Stream from bytes-like or binary file argument."
+	},
+	{
+		"push",
+		(PyCFunction)Reader_push,
+		METH_VARARGS | METH_KEYWORDS,
+		"Stream from a chunk of bytes, keeping any unconsumed data for the next push."
+	},
+	{
+		"enable_stats",
+		(PyCFunction)Reader_enable_stats,
+		METH_VARARGS | METH_KEYWORDS,
+		"Start collecting stats, resetting any collected so far."
+	},
+	{
+		"disable_stats",
+		(PyCFunction)Reader_disable_stats,
+		METH_NOARGS,
+		"Stop collecting stats."
+	},
+	{
+		"stats",
+		(PyCFunction)Reader_stats,
+		METH_NOARGS,
+		"Returns a dict of the stats collected so far, or None if stats aren't enabled."
+	},
+	{
+		"reset",
+		(PyCFunction)Reader_reset,
+		METH_NOARGS,
+		"Discards any partially read data so the reader can be reused for a new document."
+	},
+	{NULL}
+};
+
+static PyTypeObject ReaderType = {PyObject_HEAD_INIT(NULL) 0};
+
+static luxem_bool_t ReaderType_init(void)
+{
+	ReaderType.tp_name = "luxem.RawReader";
+	ReaderType.tp_basicsize = sizeof(Reader);
+	ReaderType.tp_dealloc = (destructor)Reader_dealloc;
+	ReaderType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+	ReaderType.tp_doc = "Decodes luxem data";
+	ReaderType.tp_methods = Reader_methods;
+	ReaderType.tp_init = (initproc)Reader_init;
+	ReaderType.tp_new = Reader_new;
+	return PyType_Ready(&ReaderType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* ascii16 */
+/***********/
+
+/* ascii16 maps each byte to exactly two characters, the letters a to p for
+ * its high then low nibble, so data is converted directly into the final output
+ * rather than through the library's allocated strings.  These don't touch any
+ * Python objects, so may be called without the GIL. */
+
+static void ascii16_encode(struct luxem_string_t const *data, char *out)
+{
+	unsigned char const *in = (unsigned char const *)data->pointer;
+	size_t index;
+	for (index = 0; index < data->length; ++index)
+	{
+		*(out++) = 'a' + (in[index] >> 4);
+		*(out++) = 'a' + (in[index] & 0x0F);
+	}
+}
+
+static luxem_bool_t ascii16_decode_into(struct luxem_string_t const *data, char *out, struct luxem_string_t *error)
+{
+	unsigned char const *in = (unsigned char const *)data->pointer;
+	size_t index;
+	if (data->length % 2 != 0)
+	{
+		error->pointer = "Bad ascii16 data - length must be a multiple of 2.";
+		error->length = strlen(error->pointer);
+		return luxem_false;
+	}
+	for (index = 0; index < data->length; index += 2)
+	{
+		unsigned char const high = in[index] - (unsigned char)'a';
+		unsigned char const low = in[index + 1] - (unsigned char)'a';
+		if (high >= 16 || low >= 16)
+		{
+			error->pointer = "Bad ascii16 data - encountered character outside set [abcdefghijklmnop].";
+			error->length = strlen(error->pointer);
+			return luxem_false;
+		}
+		*(out++) = (char)((high << 4) | low);
+	}
+	return luxem_true;
+}
+
+static void ascii16_error(struct luxem_string_t const *error)
+{
+	PyObject *message = WRAP_STRING_FROM(error->pointer, error->length);
+	if (!message) return;
+	PyErr_SetObject(PyExc_ValueError, message);
+	Py_DECREF(message);
+}
+
+/* Gets the data of a string or buffer argument.  If view->obj is set afterwards
+ * it must be released. */
+static luxem_bool_t ascii16_input(PyObject *argument, Py_buffer *view, struct luxem_string_t *data)
+{
+	view->obj = NULL;
+	if (WRAP_STRING_CHECK(argument))
+	{
+		WRAP_STRING_TO(argument, (char **)&data->pointer, &data->length);
+		return data->pointer != NULL;
+	}
+	if (PyObject_GetBuffer(argument, view, PyBUF_SIMPLE) < 0) return luxem_false;
+	data->pointer = view->buf;
+	data->length = view->len;
+	return luxem_true;
+}
+
+static PyObject *ascii16_decode(struct luxem_string_t const *data, luxem_bool_t release_gil)
+{
+	struct luxem_string_t error;
+	luxem_bool_t success;
+	PyObject *out = PyBytes_FromStringAndSize(NULL, data->length / 2);
+	if (!out) return NULL;
+
+	if (release_gil)
+	{
+		Py_BEGIN_ALLOW_THREADS
+		success = ascii16_decode_into(data, PyBytes_AS_STRING(out), &error);
+		Py_END_ALLOW_THREADS
+	}
+	else success = ascii16_decode_into(data, PyBytes_AS_STRING(out), &error);
+
+	if (!success)
+	{
+		Py_DECREF(out);
+		ascii16_error(&error);
+		return NULL;
+	}
+	return out;
+}
+
+/* ************************************************************************** */
+
+/* Decoders */
+/************/
+
+/* These return NULL without setting an error if the string isn't in the
+ * format they handle, so the caller can fall back to the Python decoder */
+
+static PyObject *decode_integer(struct luxem_string_t const *string)
+{
+	char const *pointer = string->pointer;
+	char const *end = pointer + string->length;
+	char const *digits;
+	long long value = 0;
+
+	if (pointer < end && (*pointer == '-' || *pointer == '+')) ++pointer;
+	if (pointer == end) return NULL;
+	for (digits = pointer; pointer < end; ++pointer)
+		if (*pointer < '0' || *pointer > '9') return NULL;
+
+	if (end - digits > 18)
+	{
+		PyObject *out;
+		char *copy = malloc(string->length + 1);
+		if (!copy) return PyErr_NoMemory();
+		memcpy(copy, string->pointer, string->length);
+		copy[string->length] = 0;
+		out = WRAP_INT_FROM_STRING(copy);
+		free(copy);
+		return out;
+	}
+
+	for (pointer = digits; pointer < end; ++pointer)
+		value = value * 10 + (*pointer - '0');
+	if (string->pointer[0] == '-') value = -value;
+	if (value >= LONG_MIN && value <= LONG_MAX) return WRAP_INT_FROM_LONG((long)value);
+	return PyLong_FromLongLong(value);
+}
+
+static PyObject *decode_float(struct luxem_string_t const *string)
+{
+	char buffer[128];
+	char *end;
+	double value;
+	size_t index;
+
+	if (string->length == 0 || string->length >= sizeof(buffer)) return NULL;
+	for (index = 0; index < string->length; ++index)
+	{
+		char const next = string->pointer[index];
+		if ((next < '0' || next > '9') && next != '.' && next != 'e' && next != 'E' && next != '-' && next != '+')
+			return NULL;
+		buffer[index] = next;
+	}
+	buffer[string->length] = 0;
+
+	value = PyOS_string_to_double(buffer, &end, NULL);
+	if (value == -1.0 && PyErr_Occurred())
+	{
+		PyErr_Clear();
+		return NULL;
+	}
+	if (end != buffer + string->length) return NULL;
+	return PyFloat_FromDouble(value);
+}
+
+static PyObject *decode_number(struct luxem_string_t const *string)
+{
+	PyObject *out = decode_integer(string);
+	if (out || PyErr_Occurred()) return out;
+	return decode_float(string);
+}
+
+static PyObject *translate_from_ascii16(PyObject *self, PyObject *positional_args, PyObject *named_args);
+
+/* Decodes directly from the parser's string if decoder is one of the built in
+ * conversions */
+static PyObject *decode_builtin(PyObject *decoder, struct luxem_string_t const *string)
+{
+	if (decoder == (PyObject *)&WRAP_INT_TYPE) return decode_integer(string);
+	if (decoder == (PyObject *)&PyFloat_Type) return decode_float(string);
+	if (PyCFunction_Check(decoder) && PyCFunction_GET_FUNCTION(decoder) == (PyCFunction)translate_from_ascii16)
+		return ascii16_decode(string, luxem_false);
+	return NULL;
+}
+
+/* ************************************************************************** */
+
+/* Builder */
+/***********/
+
+#define MAX_SELECT_PATTERNS 64
+
+/* A segment with a null pointer matches any key or index */
+struct select_pattern_t
+{
+	struct luxem_string_t *segments;
+	size_t count;
+};
+
+/* A record type from a schema.  Fields are set directly on instances of cls,
+ * through descriptors for classes with __slots__ or as the items of a tuple
+ * subclass if descriptors is NULL. */
+struct builder_record_t
+{
+	PyObject *name;
+	PyObject *cls;
+	PyObject *fields;
+	PyObject *indexes;
+	PyObject *defaults;
+	PyObject *descriptors;
+};
+
+struct builder_frame_t
+{
+	PyObject *container;
+	PyObject *key;
+	PyObject *type;
+	uint64_t mask;
+	luxem_bool_t all;
+	size_t count;
+	struct builder_record_t *record;
+	PyObject **values;
+};
+
+typedef struct {
+	Reader reader;
+	PyObject *typed;
+	PyObject *decoders;
+	luxem_bool_t numbers;
+	struct builder_frame_t *frames;
+	size_t depth;
+	size_t capacity;
+	PyObject *key;
+	PyObject *type;
+	struct select_pattern_t *patterns;
+	size_t pattern_count;
+	uint64_t child_mask;
+	luxem_bool_t child_all;
+	luxem_bool_t decided;
+	luxem_bool_t skip_value;
+	size_t skip_depth;
+	struct builder_record_t *records;
+	size_t record_count;
+	PyObject *record_names;
+} Builder;
+
+static char const *string_pointer(PyObject *string)
+{
+	char const *pointer = NULL;
+	Py_ssize_t length;
+	if (WRAP_STRING_CHECK(string)) WRAP_STRING_TO(string, (char **)&pointer, &length);
+	if (!pointer)
+	{
+		PyErr_Clear();
+		return "?";
+	}
+	return pointer;
+}
+
+/* Stores a field value of the record being built, keyed by the pending key */
+static luxem_bool_t builder_record_set(Builder *self, struct builder_frame_t *frame, PyObject *value)
+{
+	PyObject *index = PyDict_GetItem(frame->record->indexes, self->key);
+	Py_ssize_t position;
+	PyObject *old;
+
+	if (!index)
+	{
+		PyErr_Format(
+			PyExc_ValueError,
+			"luxem record %.200s has no field %.200s.",
+			string_pointer(frame->record->name),
+			string_pointer(self->key));
+		return luxem_false;
+	}
+	position = PyNumber_AsSsize_t(index, NULL);
+	old = frame->values[position];
+	Py_INCREF(value);
+	frame->values[position] = value;
+	Py_XDECREF(old);
+	return luxem_true;
+}
+
+static void builder_free_values(struct builder_frame_t *frame)
+{
+	Py_ssize_t index;
+	if (!frame->values) return;
+	for (index = 0; index < PyTuple_GET_SIZE(frame->record->fields); ++index)
+		Py_XDECREF(frame->values[index]);
+	free(frame->values);
+	frame->values = NULL;
+}
+
+static PyObject *builder_record_build(struct builder_record_t *record, PyObject **values)
+{
+	Py_ssize_t count = PyTuple_GET_SIZE(record->fields), index;
+	PyObject *arguments = PyTuple_New(count), *out;
+	PyTypeObject *cls = (PyTypeObject *)record->cls;
+
+	if (!arguments) return NULL;
+	for (index = 0; index < count; ++index)
+	{
+		PyObject *value = values[index];
+		if (value) values[index] = NULL;
+		else
+		{
+			PyObject *field = PyTuple_GET_ITEM(record->fields, index);
+			value = PyDict_GetItem(record->defaults, field);
+			if (!value)
+			{
+				PyErr_Format(
+					PyExc_ValueError,
+					"luxem record %.200s is missing field %.200s.",
+					string_pointer(record->name),
+					string_pointer(field));
+				Py_DECREF(arguments);
+				return NULL;
+			}
+			Py_INCREF(value);
+		}
+		PyTuple_SET_ITEM(arguments, index, value);
+	}
+
+	if (!record->descriptors)
+	{
+		PyObject *wrapped = PyTuple_Pack(1, arguments);
+		out = wrapped ? PyTuple_Type.tp_new(cls, wrapped, NULL) : NULL;
+		Py_XDECREF(wrapped);
+	}
+	else
+	{
+		/* Like unpickling, slotted records are created without calling __init__ */
+		PyObject *empty = PyTuple_New(0);
+		out = empty ? cls->tp_new(cls, empty, NULL) : NULL;
+		Py_XDECREF(empty);
+		for (index = 0; out && index < count; ++index)
+		{
+			PyObject *descriptor = PyTuple_GET_ITEM(record->descriptors, index);
+			if (Py_TYPE(descriptor)->tp_descr_set(descriptor, out, PyTuple_GET_ITEM(arguments, index)) < 0)
+				Py_CLEAR(out);
+		}
+	}
+	Py_DECREF(arguments);
+	return out;
+}
+
+/* Steals value */
+static luxem_bool_t builder_finish(Builder *self, PyObject *value)
+{
+	PyObject *top;
+	int result;
+
+	if (!value) return luxem_false;
+	self->decided = luxem_false;
+	if (self->type)
+	{
+		PyObject *decoder = self->decoders ? PyDict_GetItem(self->decoders, self->type) : NULL;
+		PyObject *typed = decoder ?
+			PyObject_CallFunctionObjArgs(decoder, value, NULL) :
+			self->typed == (PyObject *)&TypedType ?
+			typed_create(self->type, value) :
+			PyObject_CallFunctionObjArgs(self->typed, self->type, value, NULL);
+		Py_DECREF(value);
+		Py_CLEAR(self->type);
+		if (!typed) return luxem_false;
+		value = typed;
+	}
+
+	assert(self->depth > 0);
+	top = self->frames[self->depth - 1].container;
+	if (self->frames[self->depth - 1].record)
+	{
+		assert(self->key);
+		result = builder_record_set(self, &self->frames[self->depth - 1], value) ? 0 : -1;
+		Py_CLEAR(self->key);
+	}
+	else if (PyList_CheckExact(top))
+		result = PyList_Append(top, value);
+	else
+	{
+		assert(self->key);
+		result = PyDict_SetItem(top, self->key, value);
+		Py_CLEAR(self->key);
+	}
+	Py_DECREF(value);
+	return result == 0;
+}
+
+/* Steals container */
+static luxem_bool_t builder_push(Builder *self, PyObject *container)
+{
+	struct builder_frame_t *frame;
+
+	if (!container) return luxem_false;
+	if (self->depth == self->capacity)
+	{
+		size_t capacity = self->capacity ? self->capacity * 2 : 16;
+		struct builder_frame_t *frames = realloc(self->frames, capacity * sizeof(struct builder_frame_t));
+		if (!frames)
+		{
+			Py_DECREF(container);
+			PyErr_NoMemory();
+			return luxem_false;
+		}
+		self->frames = frames;
+		self->capacity = capacity;
+	}
+
+	frame = &self->frames[self->depth++];
+	frame->container = container;
+	frame->key = self->key;
+	frame->type = self->type;
+	frame->mask = self->child_mask;
+	frame->all = self->child_all;
+	frame->count = 0;
+	frame->record = NULL;
+	frame->values = NULL;
+	self->key = NULL;
+	self->type = NULL;
+	self->decided = luxem_false;
+	return luxem_true;
+}
+
+static luxem_bool_t builder_pop(Builder *self)
+{
+	struct builder_frame_t *frame;
+
+	assert(self->depth > 1);
+	frame = &self->frames[--self->depth];
+	Py_XDECREF(self->key);
+	Py_XDECREF(self->type);
+	self->key = frame->key;
+	self->type = frame->type;
+	if (frame->record)
+	{
+		PyObject *record = builder_record_build(frame->record, frame->values);
+		builder_free_values(frame);
+		Py_DECREF(frame->container);
+		return builder_finish(self, record);
+	}
+	return builder_finish(self, frame->container);
+}
+
+/* Starts a typed object which will be built as a record instead of a dict */
+static luxem_bool_t builder_push_record(Builder *self, struct builder_record_t *record)
+{
+	struct builder_frame_t *frame;
+	PyObject **values = calloc(PyTuple_GET_SIZE(record->fields) + 1, sizeof(PyObject *));
+
+	if (!values)
+	{
+		PyErr_NoMemory();
+		return luxem_false;
+	}
+	Py_INCREF(Py_None);
+	if (!builder_push(self, Py_None))
+	{
+		free(values);
+		return luxem_false;
+	}
+	frame = &self->frames[self->depth - 1];
+	Py_CLEAR(frame->type);
+	frame->record = record;
+	frame->values = values;
+	return luxem_true;
+}
+
+static void builder_clear(Builder *self)
+{
+	while (self->depth > 0)
+	{
+		struct builder_frame_t *frame = &self->frames[--self->depth];
+		builder_free_values(frame);
+		Py_DECREF(frame->container);
+		Py_XDECREF(frame->key);
+		Py_XDECREF(frame->type);
+	}
+	Py_CLEAR(self->key);
+	Py_CLEAR(self->type);
+	self->decided = luxem_false;
+	self->skip_value = luxem_false;
+	self->skip_depth = 0;
+}
+
+static void builder_clear_select(Builder *self)
+{
+	size_t pattern, segment;
+	for (pattern = 0; pattern < self->pattern_count; ++pattern)
+	{
+		for (segment = 0; segment < self->patterns[pattern].count; ++segment)
+			free((char *)self->patterns[pattern].segments[segment].pointer);
+		free(self->patterns[pattern].segments);
+	}
+	free(self->patterns);
+	self->patterns = NULL;
+	self->pattern_count = 0;
+}
+
+static void builder_clear_schema(Builder *self)
+{
+	size_t index;
+	for (index = 0; index < self->record_count; ++index)
+	{
+		struct builder_record_t *record = &self->records[index];
+		Py_XDECREF(record->name);
+		Py_XDECREF(record->cls);
+		Py_XDECREF(record->fields);
+		Py_XDECREF(record->indexes);
+		Py_XDECREF(record->defaults);
+		Py_XDECREF(record->descriptors);
+	}
+	free(self->records);
+	self->records = NULL;
+	self->record_count = 0;
+	Py_CLEAR(self->record_names);
+}
+
+/* Loads a compiled schema, a sequence of (name, cls, fields, defaults, descriptors) tuples as made by luxem.Schema */
+static luxem_bool_t builder_set_schema(Builder *self, PyObject *schema)
+{
+	PyObject *entries;
+	Py_ssize_t count, index;
+
+	builder_clear_schema(self);
+	if (schema == Py_None) return luxem_true;
+
+	entries = PySequence_Fast(schema, "luxem schema must be a sequence of compiled records.");
+	if (!entries) return luxem_false;
+	count = PySequence_Fast_GET_SIZE(entries);
+	self->records = calloc(count + 1, sizeof(struct builder_record_t));
+	self->record_names = PyDict_New();
+	if (!self->records || !self->record_names)
+	{
+		if (!self->records) PyErr_NoMemory();
+		goto error;
+	}
+
+	for (index = 0; index < count; ++index)
+	{
+		struct builder_record_t *record = &self->records[index];
+		PyObject *number;
+		Py_ssize_t field;
+
+		if (!PyArg_ParseTuple(
+			PySequence_Fast_GET_ITEM(entries, index),
+			"OOO!O!O;luxem schema records must be (name, cls, fields, defaults, descriptors).",
+			&record->name,
+			&record->cls,
+			&PyTuple_Type,
+			&record->fields,
+			&PyDict_Type,
+			&record->defaults,
+			&record->descriptors))
+			goto error;
+		if (!PyType_Check(record->cls))
+		{
+			PyErr_SetString(PyExc_TypeError, "luxem schema records must be classes.");
+			goto error;
+		}
+		Py_INCREF(record->name);
+		Py_INCREF(record->cls);
+		Py_INCREF(record->fields);
+		Py_INCREF(record->defaults);
+		if (record->descriptors == Py_None) record->descriptors = NULL;
+		else Py_INCREF(record->descriptors);
+		self->record_count = index + 1;
+
+		if (record->descriptors &&
+			(!PyTuple_Check(record->descriptors) ||
+			PyTuple_GET_SIZE(record->descriptors) != PyTuple_GET_SIZE(record->fields)))
+		{
+			PyErr_SetString(PyExc_TypeError, "luxem schema descriptors must be a tuple matching the fields.");
+			goto error;
+		}
+		for (field = 0; record->descriptors && field < PyTuple_GET_SIZE(record->descriptors); ++field)
+		{
+			if (!Py_TYPE(PyTuple_GET_ITEM(record->descriptors, field))->tp_descr_set)
+			{
+				PyErr_SetString(PyExc_TypeError, "luxem schema descriptors must be settable.");
+				goto error;
+			}
+		}
+		if (!record->descriptors && !PyType_IsSubtype((PyTypeObject *)record->cls, &PyTuple_Type))
+		{
+			PyErr_SetString(PyExc_TypeError, "luxem schema records without descriptors must be tuple subclasses.");
+			goto error;
+		}
+
+		record->indexes = PyDict_New();
+		if (!record->indexes) goto error;
+		for (field = 0; field < PyTuple_GET_SIZE(record->fields); ++field)
+		{
+			int result;
+			number = WRAP_INT_FROM_SIZET(field);
+			if (!number) goto error;
+			result = PyDict_SetItem(record->indexes, PyTuple_GET_ITEM(record->fields, field), number);
+			Py_DECREF(number);
+			if (result < 0) goto error;
+		}
+
+		number = WRAP_INT_FROM_SIZET(index);
+		if (!number) goto error;
+		if (PyDict_SetItem(self->record_names, record->name, number) < 0)
+		{
+			Py_DECREF(number);
+			goto error;
+		}
+		Py_DECREF(number);
+	}
+	Py_DECREF(entries);
+	return luxem_true;
+
+error:
+	Py_DECREF(entries);
+	builder_clear_schema(self);
+	return luxem_false;
+}
+
+/* Compiles select patterns, either strings of segments separated by '.' or sequences of segment strings */
+static luxem_bool_t builder_set_select(Builder *self, PyObject *select)
+{
+	PyObject *patterns;
+	Py_ssize_t pattern_count, pattern;
+
+	builder_clear_select(self);
+	if (select == Py_None) return luxem_true;
+
+	patterns = PySequence_Fast(select, "luxem select must be a sequence of paths.");
+	if (!patterns) return luxem_false;
+	pattern_count = PySequence_Fast_GET_SIZE(patterns);
+	if (pattern_count > MAX_SELECT_PATTERNS)
+	{
+		Py_DECREF(patterns);
+		PyErr_Format(PyExc_ValueError, "luxem select supports at most %d paths.", MAX_SELECT_PATTERNS);
+		return luxem_false;
+	}
+
+	self->patterns = calloc(pattern_count ? pattern_count : 1, sizeof(struct select_pattern_t));
+	if (!self->patterns)
+	{
+		Py_DECREF(patterns);
+		PyErr_NoMemory();
+		return luxem_false;
+	}
+
+	for (pattern = 0; pattern < pattern_count; ++pattern)
+	{
+		PyObject *path = PySequence_Fast_GET_ITEM(patterns, pattern);
+		PyObject *split = WRAP_STRING_CHECK(path) ?
+			PyObject_CallMethod(path, "split", "s", ".") :
+			PySequence_Fast(path, "luxem select paths must be strings or sequences of strings.");
+		PyObject *segments = split ? PySequence_Fast(split, "") : NULL;
+		struct select_pattern_t *compiled = &self->patterns[pattern];
+		Py_ssize_t segment_count, segment;
+
+		Py_XDECREF(split);
+		self->pattern_count = pattern + 1;
+		if (!segments) goto error;
+
+		segment_count = PySequence_Fast_GET_SIZE(segments);
+		compiled->segments = calloc(segment_count ? segment_count : 1, sizeof(struct luxem_string_t));
+		if (!compiled->segments)
+		{
+			Py_DECREF(segments);
+			PyErr_NoMemory();
+			goto error;
+		}
+		compiled->count = segment_count;
+
+		for (segment = 0; segment < segment_count; ++segment)
+		{
+			PyObject *name = PySequence_Fast_GET_ITEM(segments, segment);
+			char const *pointer;
+			Py_ssize_t length;
+			char *copy;
+
+			if (!WRAP_STRING_CHECK(name))
+			{
+				Py_DECREF(segments);
+				PyErr_SetString(PyExc_TypeError, "luxem select path segments must be strings.");
+				goto error;
+			}
+			WRAP_STRING_TO(name, (char **)&pointer, &length);
+			if (!pointer)
+			{
+				Py_DECREF(segments);
+				goto error;
+			}
+			if (length == 1 && pointer[0] == '*') continue;
+
+			copy = malloc(length + 1);
+			if (!copy)
+			{
+				Py_DECREF(segments);
+				PyErr_NoMemory();
+				goto error;
+			}
+			memcpy(copy, pointer, length);
+			compiled->segments[segment].pointer = copy;
+			compiled->segments[segment].length = length;
+		}
+		Py_DECREF(segments);
+	}
+
+	Py_DECREF(patterns);
+	return luxem_true;
+
+error:
+	Py_DECREF(patterns);
+	builder_clear_select(self);
+	return luxem_false;
+}
+
+/* Decides whether the next value in the current container is on a selected path, given its key or index */
+static void builder_decide(Builder *self, char const *name, size_t length)
+{
+	struct builder_frame_t *top = &self->frames[self->depth - 1];
+	size_t position, pattern;
+
+	self->decided = luxem_true;
+	self->child_mask = 0;
+	self->child_all = top->all;
+
+	if (!top->all)
+	{
+		if (self->depth == 1)
+		{
+			/* Paths start inside each root value */
+			self->child_mask = top->mask;
+			for (pattern = 0; pattern < self->pattern_count; ++pattern)
+				if (self->patterns[pattern].count == 0) self->child_all = luxem_true;
+		}
+		else
+		{
+			position = self->depth - 2;
+			for (pattern = 0; pattern < self->pattern_count; ++pattern)
+			{
+				struct luxem_string_t const *segment;
+				if (!(top->mask & ((uint64_t)1 << pattern))) continue;
+				segment = &self->patterns[pattern].segments[position];
+				if (segment->pointer && (segment->length != length || memcmp(segment->pointer, name, length) != 0)) continue;
+				self->child_mask |= (uint64_t)1 << pattern;
+				if (self->patterns[pattern].count == position + 1) self->child_all = luxem_true;
+			}
+		}
+	}
+
+	self->skip_value = !self->child_all && !self->child_mask;
+}
+
+/* Returns whether the value starting now should be built */
+static luxem_bool_t builder_select_start(Builder *self)
+{
+	if (self->skip_depth > 0) return luxem_false;
+	if (!self->decided)
+	{
+		/* Array elements are matched by index */
+		char index[32];
+		int length = snprintf(index, sizeof(index), "%lu", (unsigned long)self->frames[self->depth - 1].count++);
+		builder_decide(self, index, length);
+	}
+	return !self->skip_value;
+}
+
+static void builder_skip_done(Builder *self)
+{
+	self->decided = luxem_false;
+	self->skip_value = luxem_false;
+	Py_CLEAR(self->key);
+	Py_CLEAR(self->type);
+}
+
+static luxem_bool_t builder_select_container(Builder *self)
+{
+	if (self->skip_depth > 0)
+	{
+		self->skip_depth += 1;
+		return luxem_false;
+	}
+	if (builder_select_start(self)) return luxem_true;
+	self->skip_depth = 1;
+	builder_skip_done(self);
+	return luxem_false;
+}
+
+static luxem_bool_t build_object_begin(struct luxem_rawread_context_t *context, Builder *self)
+{
+	if (self->patterns && !builder_select_container(self)) return luxem_true;
+	if (self->type && self->record_names)
+	{
+		PyObject *index = PyDict_GetItem(self->record_names, self->type);
+		if (index)
+			return builder_push_record(self, &self->records[PyNumber_AsSsize_t(index, NULL)]) || rawread_python_error(context);
+	}
+	return builder_push(self, PyDict_New()) || rawread_python_error(context);
+}
+
+static luxem_bool_t build_array_begin(struct luxem_rawread_context_t *context, Builder *self)
+{
+	if (self->patterns && !builder_select_container(self)) return luxem_true;
+	return builder_push(self, PyList_New(0)) || rawread_python_error(context);
+}
+
+static luxem_bool_t build_end(struct luxem_rawread_context_t *context, Builder *self)
+{
+	if (self->skip_depth > 0)
+	{
+		self->skip_depth -= 1;
+		return luxem_true;
+	}
+	return builder_pop(self) || rawread_python_error(context);
+}
+
+static luxem_bool_t build_key(struct luxem_rawread_context_t *context, Builder *self, struct luxem_string_t const *string)
+{
+	if (self->patterns)
+	{
+		if (self->skip_depth > 0) return luxem_true;
+		builder_decide(self, string->pointer, string->length);
+		if (self->skip_value) return luxem_true;
+	}
+	Py_XDECREF(self->key);
+	self->key = reader_string(&self->reader, string);
+	return self->key || rawread_python_error(context);
+}
+
+static luxem_bool_t build_type(struct luxem_rawread_context_t *context, Builder *self, struct luxem_string_t const *string)
+{
+	if (self->patterns && !builder_select_start(self)) return luxem_true;
+	Py_XDECREF(self->type);
+	self->type = reader_string(&self->reader, string);
+	return self->type || rawread_python_error(context);
+}
+
+/* Converts typed primitives with a built in decoder and untyped numbers
+ * without creating the intermediate string */
+static PyObject *builder_primitive(Builder *self, struct luxem_string_t const *string)
+{
+	PyObject *out = NULL;
+	if (self->type)
+	{
+		PyObject *decoder = self->decoders ? PyDict_GetItem(self->decoders, self->type) : NULL;
+		if (decoder) out = decode_builtin(decoder, string);
+		if (out) Py_CLEAR(self->type);
+	}
+	else if (self->numbers) out = decode_number(string);
+	if (out || PyErr_Occurred()) return out;
+	return reader_primitive_string(&self->reader, string);
+}
+
+static luxem_bool_t build_primitive(struct luxem_rawread_context_t *context, Builder *self, struct luxem_string_t const *string)
+{
+	if (self->patterns && (!builder_select_start(self) || !self->child_all))
+	{
+		/* Primitives are only kept at the end of a path */
+		if (self->skip_depth == 0) builder_skip_done(self);
+		return luxem_true;
+	}
+	return builder_finish(self, builder_primitive(self, string)) || rawread_python_error(context);
+}
+
+static PyObject *Builder_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
+{
+	Builder *self = (Builder *)Reader_new(type, positional_args, named_args);
+
+	if (self != NULL)
+	{
+		struct luxem_rawread_callbacks_t *callbacks = luxem_rawread_callbacks(self->reader.context);
+		callbacks->object_begin = (luxem_rawread_void_callback_t)build_object_begin;
+		callbacks->object_end = (luxem_rawread_void_callback_t)build_end;
+		callbacks->array_begin = (luxem_rawread_void_callback_t)build_array_begin;
+		callbacks->array_end = (luxem_rawread_void_callback_t)build_end;
+		callbacks->key = (luxem_rawread_string_callback_t)build_key;
+		callbacks->type = (luxem_rawread_string_callback_t)build_type;
+		callbacks->primitive = (luxem_rawread_string_callback_t)build_primitive;
+
+		self->typed = NULL;
+		self->decoders = NULL;
+		self->numbers = luxem_false;
+		self->frames = NULL;
+		self->depth = 0;
+		self->capacity = 0;
+		self->key = NULL;
+		self->type = NULL;
+		self->patterns = NULL;
+		self->pattern_count = 0;
+		self->child_mask = 0;
+		self->child_all = luxem_true;
+		self->decided = luxem_false;
+		self->skip_value = luxem_false;
+		self->skip_depth = 0;
+		self->records = NULL;
+		self->record_count = 0;
+		self->record_names = NULL;
+	}
+
+	return (PyObject *)self;
+}
+
+/* Starts a new root list, after builder_clear */
+static luxem_bool_t builder_start(Builder *self)
+{
+	self->child_all = !self->patterns;
+	self->child_mask = self->pattern_count == MAX_SELECT_PATTERNS ?
+		~(uint64_t)0 :
+		((uint64_t)1 << self->pattern_count) - 1;
+	return builder_push(self, PyList_New(0));
+}
+
+static int Builder_init(Builder *self, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *typed, *select = Py_None, *decoders = Py_None, *schema = Py_None;
+	Py_ssize_t intern_size = DEFAULT_INTERN_SIZE, intern_primitives = 0;
+	int numbers = 0;
+
+	static char *named_args_list[] =
+	{
+		"typed",
+		"intern_size",
+		"intern_primitives",
+		"select",
+		"decoders",
+		"numbers",
+		"schema",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|nnOOiO",
+		named_args_list,
+		&typed,
+		&intern_size,
+		&intern_primitives,
+		&select,
+		&decoders,
+		&numbers,
+		&schema))
+		return -1;
+
+	if (decoders != Py_None && !PyDict_Check(decoders))
+	{
+		PyErr_SetString(PyExc_TypeError, "luxem decoders must be a dict of type names to callables.");
+		return -1;
+	}
+
+	if (!reader_set_intern(&self->reader, intern_size, intern_primitives)) return -1;
+
+	Py_INCREF(typed);
+	Py_XDECREF(self->typed);
+	self->typed = typed;
+
+	Py_CLEAR(self->decoders);
+	if (decoders != Py_None)
+	{
+		/* Copied so decoders can't change it out from under the builder */
+		self->decoders = PyDict_Copy(decoders);
+		if (!self->decoders) return -1;
+	}
+	self->numbers = numbers ? luxem_true : luxem_false;
+
+	builder_clear(self);
+	if (!builder_set_select(self, select)) return -1;
+	if (!builder_set_schema(self, schema)) return -1;
+	if (!builder_start(self)) return -1;
+
+	return 0;
+}
+
+static PyObject *Builder_reset(Builder *self)
+{
+	if (!reader_reset(&self->reader)) return NULL;
+	builder_clear(self);
+	if (!builder_start(self)) return NULL;
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static void Builder_dealloc(Builder *self)
+{
+	builder_clear(self);
+	builder_clear_select(self);
+	builder_clear_schema(self);
+	free(self->frames);
+	Py_XDECREF(self->typed);
+	Py_XDECREF(self->decoders);
+	Reader_dealloc((Reader *)self);
+}
+
+static PyObject *Builder_get_root(Builder *self, void *closure)
+{
+	PyObject *out = self->depth > 0 ? self->frames[0].container : Py_None;
+	Py_INCREF(out);
+	return out;
+}
+
+static PyMethodDef Builder_methods[] =
+{
+	{"reset", (PyCFunction)Builder_reset, METH_NOARGS, "Discards any partially read data and starts a new root list."},
+	{NULL}
+};
+
+static PyGetSetDef Builder_getset[] =
+{
+	{"root", (getter)Builder_get_root, NULL, "The list of root values read so far.", NULL},
+	{NULL}
+};
+
+static PyTypeObject BuilderType = {PyObject_HEAD_INIT(NULL) 0};
+
+static luxem_bool_t BuilderType_init(void)
+{
+	BuilderType.tp_name = "luxem.RawBuilder";
+	BuilderType.tp_basicsize = sizeof(Builder);
+	BuilderType.tp_dealloc = (destructor)Builder_dealloc;
+	BuilderType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+	BuilderType.tp_doc = "Decodes luxem data directly into lists, dicts and typed values";
+	BuilderType.tp_methods = Builder_methods;
+	BuilderType.tp_getset = Builder_getset;
+	BuilderType.tp_base = &ReaderType;
+	BuilderType.tp_init = (initproc)Builder_init;
+	BuilderType.tp_new = Builder_new;
+	return PyType_Ready(&BuilderType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* EventReader */
+/***************/
+
+static PyObject *event_codes[EVENT_COUNT];
+static PyObject *event_void_events[EVENT_KEY];
+
+static luxem_bool_t events_init(void)
+{
+	int code;
+	for (code = 0; code < EVENT_COUNT; ++code)
+	{
+		event_codes[code] = WRAP_INT_FROM_LONG(code);
+		if (!event_codes[code]) return luxem_false;
+	}
+	for (code = 0; code < EVENT_KEY; ++code)
+	{
+		event_void_events[code] = PyTuple_Pack(2, event_codes[code], Py_None);
+		if (!event_void_events[code]) return luxem_false;
+	}
+	return luxem_true;
+}
+
+typedef struct {
+	Reader reader;
+	PyObject *events;
+} EventReader;
+
+/* Steals event */
+static luxem_bool_t event_append(struct luxem_rawread_context_t *context, EventReader *self, PyObject *event)
+{
+	int result;
+	if (!event) return rawread_python_error(context);
+	result = PyList_Append(self->events, event);
+	Py_DECREF(event);
+	return result == 0 || rawread_python_error(context);
+}
+
+#define EVENT_VOID_CALLBACK(name, code) \
+static luxem_bool_t event_##name(struct luxem_rawread_context_t *context, EventReader *self) \
+{ \
+	Py_INCREF(event_void_events[code]); \
+	return event_append(context, self, event_void_events[code]); \
+}
+
+EVENT_VOID_CALLBACK(object_begin, EVENT_OBJECT_BEGIN)
+EVENT_VOID_CALLBACK(object_end, EVENT_OBJECT_END)
+EVENT_VOID_CALLBACK(array_begin, EVENT_ARRAY_BEGIN)
+EVENT_VOID_CALLBACK(array_end, EVENT_ARRAY_END)
+
+#define EVENT_STRING_CALLBACK(name, code, wrap) \
+static luxem_bool_t event_##name(struct luxem_rawread_context_t *context, EventReader *self, struct luxem_string_t const *string) \
+{ \
+	PyObject *value = wrap(&self->reader, string); \
+	PyObject *event; \
+	if (!value) return rawread_python_error(context); \
+	event = PyTuple_New(2); \
+	if (!event) \
+	{ \
+		Py_DECREF(value); \
+		return rawread_python_error(context); \
+	} \
+	Py_INCREF(event_codes[code]); \
+	PyTuple_SET_ITEM(event, 0, event_codes[code]); \
+	PyTuple_SET_ITEM(event, 1, value); \
+	return event_append(context, self, event); \
+}
+
+EVENT_STRING_CALLBACK(key, EVENT_KEY, reader_string)
+EVENT_STRING_CALLBACK(type, EVENT_TYPE, reader_string)
+EVENT_STRING_CALLBACK(primitive, EVENT_PRIMITIVE, reader_primitive_string)
+
+static PyObject *EventReader_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
+{
+	EventReader *self = (EventReader *)Reader_new(type, positional_args, named_args);
+
+	if (self != NULL)
+	{
+		struct luxem_rawread_callbacks_t *callbacks = luxem_rawread_callbacks(self->reader.context);
+		callbacks->object_begin = (luxem_rawread_void_callback_t)event_object_begin;
+		callbacks->object_end = (luxem_rawread_void_callback_t)event_object_end;
+		callbacks->array_begin = (luxem_rawread_void_callback_t)event_array_begin;
+		callbacks->array_end = (luxem_rawread_void_callback_t)event_array_end;
+		callbacks->key = (luxem_rawread_string_callback_t)event_key;
+		callbacks->type = (luxem_rawread_string_callback_t)event_type;
+		callbacks->primitive = (luxem_rawread_string_callback_t)event_primitive;
+
+		self->events = PyList_New(0);
+		if (!self->events)
+		{
+			Py_DECREF(self);
+			return NULL;
+		}
+	}
+
+	return (PyObject *)self;
+}
+
+static int EventReader_init(EventReader *self, PyObject *positional_args, PyObject *named_args)
+{
+	Py_ssize_t intern_size = DEFAULT_INTERN_SIZE, intern_primitives = 0;
+
+	static char *named_args_list[] =
+	{
+		"intern_size",
+		"intern_primitives",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"|nn",
+		named_args_list,
+		&intern_size,
+		&intern_primitives))
+		return -1;
+
+	if (!reader_set_intern(&self->reader, intern_size, intern_primitives)) return -1;
+
+	return 0;
+}
+
+static void EventReader_dealloc(EventReader *self)
+{
+	Py_XDECREF(self->events);
+	Reader_dealloc((Reader *)self);
+}
+
+static PyObject *EventReader_events(EventReader *self)
+{
+	PyObject *out = self->events;
+	self->events = PyList_New(0);
+	if (!self->events)
+	{
+		self->events = out;
+		return NULL;
+	}
+	return out;
+}
+
+static PyObject *EventReader_reset(EventReader *self)
+{
+	if (!reader_reset(&self->reader)) return NULL;
+	if (PyList_SetSlice(self->events, 0, PyList_GET_SIZE(self->events), NULL) < 0) return NULL;
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static PyMethodDef EventReader_methods[] =
+{
+	{
+		"events",
+		(PyCFunction)EventReader_events,
+		METH_NOARGS,
+		"Returns a list of (code, value) tuples for all events read since the last call."
+	},
+	{
+		"reset",
+		(PyCFunction)EventReader_reset,
+		METH_NOARGS,
+		"Discards any partially read data and unclaimed events."
+	},
+	{NULL}
+};
+
+static PyTypeObject EventReaderType = {PyObject_HEAD_INIT(NULL) 0};
+
+static luxem_bool_t EventReaderType_init(void)
+{
+	EventReaderType.tp_name = "luxem.RawEventReader";
+	EventReaderType.tp_basicsize = sizeof(EventReader);
+	EventReaderType.tp_dealloc = (destructor)EventReader_dealloc;
+	EventReaderType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+	EventReaderType.tp_doc = "Decodes luxem data into batches of events";
+	EventReaderType.tp_methods = EventReader_methods;
+	EventReaderType.tp_base = &ReaderType;
+	EventReaderType.tp_init = (initproc)EventReader_init;
+	EventReaderType.tp_new = EventReader_new;
+	return events_init() && PyType_Ready(&EventReaderType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* Tape */
+/********/
+
+/* For KEY, TYPE and PRIMITIVE events value and length locate the string in the source if in_source is set, or else in the arena.
+ * For begin events value is the index of the matching end event (0 while open) and length is the number of child values.
+ * For end events value is the index of the matching begin event. */
+struct tape_event_t
+{
+	size_t value;
+	size_t length;
+	unsigned char code;
+	unsigned char in_source;
+};
+
+typedef struct {
+	Reader reader;
+	struct tape_event_t *events;
+	size_t event_count;
+	size_t event_capacity;
+	/* A read-only buffer fed to the tape, kept so strings that needed no
+	 * unescaping can be located in it rather than copied */
+	Py_buffer source;
+	char *arena;
+	size_t arena_length;
+	size_t arena_capacity;
+	size_t *open;
+	size_t open_count;
+	size_t open_capacity;
+} Tape;
+
+static luxem_bool_t tape_reserve(void **pointer, size_t *capacity, size_t needed, size_t element_size)
+{
+	size_t new_capacity;
+	void *resized;
+	if (needed <= *capacity) return luxem_true;
+	new_capacity = *capacity ? *capacity : 64;
+	while (new_capacity < needed) new_capacity *= 2;
+	resized = realloc(*pointer, new_capacity * element_size);
+	if (!resized) return luxem_false;
+	*pointer = resized;
+	*capacity = new_capacity;
+	return luxem_true;
+}
+
+static luxem_bool_t tape_add(Tape *self, unsigned char code, size_t value, size_t length)
+{
+	struct tape_event_t *event;
+	if (!tape_reserve((void **)&self->events, &self->event_capacity, self->event_count + 1, sizeof(struct tape_event_t)))
+		return luxem_false;
+	event = &self->events[self->event_count++];
+	event->code = code;
+	event->in_source = luxem_false;
+	event->value = value;
+	event->length = length;
+	return luxem_true;
+}
+
+static void tape_value_done(Tape *self)
+{
+	if (self->open_count > 0) self->events[self->open[self->open_count - 1]].length += 1;
+}
+
+static luxem_bool_t tape_begin(Tape *self, unsigned char code)
+{
+	if (!tape_reserve((void **)&self->open, &self->open_capacity, self->open_count + 1, sizeof(size_t)))
+		return luxem_false;
+	self->open[self->open_count++] = self->event_count;
+	return tape_add(self, code, 0, 0);
+}
+
+static luxem_bool_t tape_end(Tape *self, unsigned char code)
+{
+	size_t begin;
+	assert(self->open_count > 0);
+	begin = self->open[--self->open_count];
+	self->events[begin].value = self->event_count;
+	if (!tape_add(self, code, begin, 0)) return luxem_false;
+	tape_value_done(self);
+	return luxem_true;
+}
+
+static luxem_bool_t tape_string(Tape *self, unsigned char code, struct luxem_string_t const *string)
+{
+	char const *source = self->source.buf;
+	if (
+		self->source.obj &&
+		string->pointer >= source &&
+		string->pointer + string->length <= source + self->source.len)
+	{
+		if (!tape_add(self, code, string->pointer - source, string->length)) return luxem_false;
+		self->events[self->event_count - 1].in_source = luxem_true;
+		if (code == EVENT_PRIMITIVE) tape_value_done(self);
+		return luxem_true;
+	}
+	if (!tape_reserve((void **)&self->arena, &self->arena_capacity, self->arena_length + string->length, 1))
+		return luxem_false;
+	memcpy(self->arena + self->arena_length, string->pointer, string->length);
+	if (!tape_add(self, code, self->arena_length, string->length)) return luxem_false;
+	self->arena_length += string->length;
+	if (code == EVENT_PRIMITIVE) tape_value_done(self);
+	return luxem_true;
+}
+
+/* Runs without the GIL, so the exception is raised once feeding returns */
+static luxem_bool_t tape_memory_error(struct luxem_rawread_context_t *context)
+{
+	((Reader *)luxem_rawread_callbacks(context)->user_data)->no_memory = luxem_true;
+	return rawread_python_error(context);
+}
+
+static luxem_bool_t tape_object_begin(struct luxem_rawread_context_t *context, Tape *self)
+	{ return tape_begin(self, EVENT_OBJECT_BEGIN) || tape_memory_error(context); }
+static luxem_bool_t tape_object_end(struct luxem_rawread_context_t *context, Tape *self)
+	{ return tape_end(self, EVENT_OBJECT_END) || tape_memory_error(context); }
+static luxem_bool_t tape_array_begin(struct luxem_rawread_context_t *context, Tape *self)
+	{ return tape_begin(self, EVENT_ARRAY_BEGIN) || tape_memory_error(context); }
+static luxem_bool_t tape_array_end(struct luxem_rawread_context_t *context, Tape *self)
+	{ return tape_end(self, EVENT_ARRAY_END) || tape_memory_error(context); }
+static luxem_bool_t tape_key(struct luxem_rawread_context_t *context, Tape *self, struct luxem_string_t const *string)
+	{ return tape_string(self, EVENT_KEY, string) || tape_memory_error(context); }
+static luxem_bool_t tape_type(struct luxem_rawread_context_t *context, Tape *self, struct luxem_string_t const *string)
+	{ return tape_string(self, EVENT_TYPE, string) || tape_memory_error(context); }
+static luxem_bool_t tape_primitive(struct luxem_rawread_context_t *context, Tape *self, struct luxem_string_t const *string)
+	{ return tape_string(self, EVENT_PRIMITIVE, string) || tape_memory_error(context); }
+
+static PyObject *tape_event_string(Tape *self, size_t index, PyObject *(*wrap)(Reader *, struct luxem_string_t const *))
+{
+	struct luxem_string_t string;
+	string.pointer = (self->events[index].in_source ? (char const *)self->source.buf : self->arena) + self->events[index].value;
+	string.length = self->events[index].length;
+	return wrap(&self->reader, &string);
+}
+
+/* Returns the index after the value starting at index, or 0 if the value is not complete */
+static size_t tape_skip(Tape *self, size_t index)
+{
+	if (index < self->event_count && self->events[index].code == EVENT_TYPE) ++index;
+	if (index >= self->event_count) return 0;
+	switch (self->events[index].code)
+	{
+		case EVENT_OBJECT_BEGIN:
+		case EVENT_ARRAY_BEGIN:
+			return self->events[index].value ? self->events[index].value + 1 : 0;
+		case EVENT_PRIMITIVE:
+			return index + 1;
+		default:
+			return 0;
+	}
+}
+
+static luxem_bool_t tape_check_value(Tape *self, Py_ssize_t index)
+{
+	if (!reader_check_idle(&self->reader)) return luxem_false;
+	if (index < 0 || !tape_skip(self, index))
+	{
+		PyErr_SetString(PyExc_IndexError, "luxem.RawTape index does not start a complete value.");
+		return luxem_false;
+	}
+	return luxem_true;
+}
+
+static PyObject *tape_decode(Tape *self, size_t *index)
+{
+	PyObject *type = NULL, *out = NULL;
+	struct tape_event_t *event = &self->events[*index];
+
+	if (event->code == EVENT_TYPE)
+	{
+		type = tape_event_string(self, *index, reader_string);
+		if (!type) return NULL;
+		event = &self->events[++*index];
+	}
+
+	if (Py_EnterRecursiveCall(" while decoding a luxem value"))
+	{
+		Py_XDECREF(type);
+		return NULL;
+	}
+
+	if (event->code == EVENT_PRIMITIVE)
+	{
+		out = tape_event_string(self, *index, reader_primitive_string);
+		*index += 1;
+	}
+	else if (event->code == EVENT_ARRAY_BEGIN)
+	{
+		size_t end = event->value, child;
+		out = PyList_New(event->length);
+		*index += 1;
+		for (child = 0; out && *index < end; ++child)
+		{
+			PyObject *value = tape_decode(self, index);
+			if (!value) Py_CLEAR(out);
+			else PyList_SET_ITEM(out, child, value);
+		}
+		*index = end + 1;
+	}
+	else
+	{
+		size_t end = event->value;
+		assert(event->code == EVENT_OBJECT_BEGIN);
+		out = PyDict_New();
+		*index += 1;
+		while (out && *index < end)
+		{
+			PyObject *key = tape_event_string(self, *index, reader_string);
+			PyObject *value;
+			*index += 1;
+			value = key ? tape_decode(self, index) : NULL;
+			if (!value || PyDict_SetItem(out, key, value) < 0) Py_CLEAR(out);
+			Py_XDECREF(key);
+			Py_XDECREF(value);
+		}
+		*index = end + 1;
+	}
+
+	Py_LeaveRecursiveCall();
+
+	if (out && type)
+	{
+		PyObject *typed = typed_create(type, out);
+		Py_DECREF(out);
+		out = typed;
+	}
+	Py_XDECREF(type);
+	return out;
+}
+
+static void tape_clear(Tape *self)
+{
+	self->event_count = 0;
+	self->arena_length = 0;
+	self->open_count = 0;
+	if (self->source.obj) PyBuffer_Release(&self->source);
+}
+
+static PyObject *Tape_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
+{
+	Tape *self = (Tape *)Reader_new(type, positional_args, named_args);
+
+	if (self != NULL)
+	{
+		struct luxem_rawread_callbacks_t *callbacks = luxem_rawread_callbacks(self->reader.context);
+		callbacks->object_begin = (luxem_rawread_void_callback_t)tape_object_begin;
+		callbacks->object_end = (luxem_rawread_void_callback_t)tape_object_end;
+		callbacks->array_begin = (luxem_rawread_void_callback_t)tape_array_begin;
+		callbacks->array_end = (luxem_rawread_void_callback_t)tape_array_end;
+		callbacks->key = (luxem_rawread_string_callback_t)tape_key;
+		callbacks->type = (luxem_rawread_string_callback_t)tape_type;
+		callbacks->primitive = (luxem_rawread_string_callback_t)tape_primitive;
+
+		self->events = NULL;
+		self->event_count = 0;
+		self->event_capacity = 0;
+		self->source.obj = NULL;
+		self->arena = NULL;
+		self->arena_length = 0;
+		self->arena_capacity = 0;
+		self->open = NULL;
+		self->open_count = 0;
+		self->open_capacity = 0;
+		self->reader.release_gil = luxem_true;
+	}
+
+	return (PyObject *)self;
+}
+
+static int Tape_init(Tape *self, PyObject *positional_args, PyObject *named_args)
+{
+	Py_ssize_t intern_size = DEFAULT_INTERN_SIZE, intern_primitives = 0;
+
+	static char *named_args_list[] =
+	{
+		"intern_size",
+		"intern_primitives",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"|nn",
+		named_args_list,
+		&intern_size,
+		&intern_primitives))
+		return -1;
+
+	if (!reader_check_idle(&self->reader)) return -1;
+	if (!reader_set_intern(&self->reader, intern_size, intern_primitives)) return -1;
+	tape_clear(self);
+
+	return 0;
+}
+
+static void Tape_dealloc(Tape *self)
+{
+	if (self->source.obj) PyBuffer_Release(&self->source);
+	free(self->events);
+	free(self->arena);
+	free(self->open);
+	Reader_dealloc((Reader *)self);
+}
+
+static PyObject *Tape_roots(Tape *self)
+{
+	PyObject *out;
+	size_t index = 0;
+
+	if (!reader_check_idle(&self->reader)) return NULL;
+	out = PyList_New(0);
+
+	while (out && index < self->event_count)
+	{
+		size_t next = tape_skip(self, index);
+		PyObject *root;
+		if (!next) break;
+		root = WRAP_INT_FROM_SIZET(index);
+		if (!root || PyList_Append(out, root) < 0) Py_CLEAR(out);
+		Py_XDECREF(root);
+		index = next;
+	}
+
+	return out;
+}
+
+static PyObject *Tape_value(Tape *self, PyObject *positional_args)
+{
+	Py_ssize_t index;
+	PyObject *type = NULL, *payload;
+	unsigned char code;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"n",
+		&index))
+		return NULL;
+
+	if (!tape_check_value(self, index)) return NULL;
+
+	if (self->events[index].code == EVENT_TYPE)
+	{
+		type = tape_event_string(self, index, reader_string);
+		if (!type) return NULL;
+		index += 1;
+	}
+	else
+	{
+		type = Py_None;
+		Py_INCREF(type);
+	}
+
+	code = self->events[index].code;
+	if (code == EVENT_PRIMITIVE)
+		payload = tape_event_string(self, index, reader_primitive_string);
+	else
+		payload = WRAP_INT_FROM_SIZET(index);
+	if (!payload)
+	{
+		Py_DECREF(type);
+		return NULL;
+	}
+
+	return Py_BuildValue("(NON)", type, event_codes[code], payload);
+}
+
+static PyObject *Tape_children(Tape *self, PyObject *positional_args)
+{
+	Py_ssize_t begin;
+	size_t index, end, child = 0;
+	luxem_bool_t object;
+	PyObject *out;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"n",
+		&begin))
+		return NULL;
+
+	if (!reader_check_idle(&self->reader)) return NULL;
+	if (
+		begin < 0 ||
+		(size_t)begin >= self->event_count ||
+		(self->events[begin].code != EVENT_OBJECT_BEGIN && self->events[begin].code != EVENT_ARRAY_BEGIN) ||
+		!self->events[begin].value)
+	{
+		PyErr_SetString(PyExc_IndexError, "luxem.RawTape index does not start a complete object or array.");
+		return NULL;
+	}
+
+	object = self->events[begin].code == EVENT_OBJECT_BEGIN;
+	end = self->events[begin].value;
+	out = PyList_New(self->events[begin].length);
+	for (index = begin + 1; out && index < end; ++child)
+	{
+		PyObject *key = NULL, *value, *entry;
+		if (object)
+		{
+			key = tape_event_string(self, index, reader_string);
+			if (!key)
+			{
+				Py_CLEAR(out);
+				break;
+			}
+			index += 1;
+		}
+		value = WRAP_INT_FROM_SIZET(index);
+		entry = object ? Py_BuildValue("(NN)", key, value) : value;
+		if (!entry)
+		{
+			Py_CLEAR(out);
+			break;
+		}
+		PyList_SET_ITEM(out, child, entry);
+		index = tape_skip(self, index);
+	}
+
+	return out;
+}
+
+static PyObject *Tape_decode(Tape *self, PyObject *positional_args)
+{
+	Py_ssize_t index;
+	size_t position;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"n",
+		&index))
+		return NULL;
+
+	if (!tape_check_value(self, index)) return NULL;
+
+	position = index;
+	return tape_decode(self, &position);
+}
+
+/* Keeps the first read-only buffer fed so its strings needn't be copied.
+ * Writable buffers could change after the feed so their strings are copied. */
+static PyObject *Tape_feed(Tape *self, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *data;
+	luxem_bool_t finish = luxem_true;
+
+	static char *named_args_list[] =
+	{
+		"data",
+		"finish",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|b",
+		named_args_list,
+		&data,
+		&finish))
+		return NULL;
+
+	if (!reader_check_idle(&self->reader)) return NULL;
+	if (!self->source.obj && PyObject_CheckBuffer(data))
+	{
+		if (PyObject_GetBuffer(data, &self->source, PyBUF_SIMPLE) < 0) return NULL;
+		if (!self->source.readonly) PyBuffer_Release(&self->source);
+	}
+	return Reader_feed(&self->reader, positional_args, named_args);
+}
+
+static PyObject *Tape_reset(Tape *self)
+{
+	if (!reader_reset(&self->reader)) return NULL;
+	tape_clear(self);
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static PyMethodDef Tape_methods[] =
+{
+	{"feed", (PyCFunction)Tape_feed, METH_VARARGS | METH_KEYWORDS, "Parses data into the tape.  A read-only buffer is kept until the tape is reset so strings can be read from it without copying."},
+	{"reset", (PyCFunction)Tape_reset, METH_NOARGS, "Discards all events so the tape can be reused for a new document."},
+	{"roots", (PyCFunction)Tape_roots, METH_NOARGS, "Returns the indexes of all complete root values."},
+	{"value", (PyCFunction)Tape_value, METH_VARARGS, "Returns (type, code, payload) for the value at an index.  The payload is the string for primitives and the begin index for objects and arrays."},
+	{"children", (PyCFunction)Tape_children, METH_VARARGS, "Returns the child value indexes of an array, or (key, index) tuples of an object, given its begin index."},
+	{"decode", (PyCFunction)Tape_decode, METH_VARARGS, "Decodes the value at an index into lists, dicts and typed values."},
+	{NULL}
+};
+
+static PyTypeObject TapeType = {PyObject_HEAD_INIT(NULL) 0};
+
+static luxem_bool_t TapeType_init(void)
+{
+	TapeType.tp_name = "luxem.RawTape";
+	TapeType.tp_basicsize = sizeof(Tape);
+	TapeType.tp_dealloc = (destructor)Tape_dealloc;
+	TapeType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+	TapeType.tp_doc = "Decodes luxem data into a compact native event tape";
+	TapeType.tp_methods = Tape_methods;
+	TapeType.tp_base = &ReaderType;
+	TapeType.tp_init = (initproc)Tape_init;
+	TapeType.tp_new = Tape_new;
+	return PyType_Ready(&TapeType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* luxem writer */
+/****************/
+
+typedef struct {
+	PyObject_HEAD
+	struct luxem_rawwrite_context_t *context;
+	PyObject *target;
+	FILE *file;
+	PyObject *typed;
+	PyObject *resolve;
+	PyObject *encoders;
+	size_t depth;
+	size_t buffer_size;
+	char *output;
+	size_t output_length;
+	size_t output_capacity;
+	struct stats_t *stats;
+	char spacer;
+	size_t indent_multiple;
+	luxem_bool_t writing;
+} Writer;
+
+#define WRITER_INITIAL_OUTPUT 4096
+/* An emptied output buffer larger than this many times its initial size is freed */
+#define WRITER_RETAIN_FACTOR 4
+
+static luxem_bool_t rawwrite_python_error(struct luxem_rawwrite_context_t *context)
+{
+	luxem_rawwrite_get_error(context)->pointer = &exception_marker;
+	luxem_rawwrite_get_error(context)->length = 0;
+	return luxem_false;
+}
+
+static luxem_bool_t writer_call_target(Writer *self, char const *pointer, size_t length)
+{
+#if PY_MAJOR_VERSION >= 3
+	PyObject *arguments = Py_BuildValue("(y#)", pointer, (Py_ssize_t)length);
+#else
+	PyObject *arguments = Py_BuildValue("(s#)", pointer, (Py_ssize_t)length);
+#endif
+	if (!arguments) return luxem_false;
+	{
+		double start = stats_callback_start(self->stats);
+		PyObject *result = PyEval_CallObject(self->target, arguments);
+		stats_callback_end(self->stats, start);
+		Py_DECREF(arguments);
+		if (!result) return luxem_false;
+		Py_DECREF(result);
+	}
+	return luxem_true;
+}
+
+/* Sends any buffered output to the target callback */
+static luxem_bool_t writer_flush(Writer *self)
+{
+	size_t length = self->output_length;
+	if (length == 0) return luxem_true;
+	self->output_length = 0;
+	return writer_call_target(self, self->output, length);
+}
+
+static luxem_bool_t translate_rawwrite_write(struct luxem_rawwrite_context_t *context, Writer *user_data, struct luxem_string_t const *string)
+{
+	if (user_data->stats)
+	{
+		user_data->stats->document.bytes += string->length;
+		if (user_data->target && user_data->buffer_size > 0) user_data->stats->document.carried += string->length;
+	}
+
+	if (user_data->target && user_data->buffer_size == 0)
+		return writer_call_target(user_data, string->pointer, string->length) || rawwrite_python_error(context);
+
+	/* Without a target, output is kept here until dumped or drained */
+	if (user_data->output_length + string->length > user_data->output_capacity)
+	{
+		size_t capacity = user_data->output_capacity ? user_data->output_capacity :
+			user_data->buffer_size ? user_data->buffer_size : WRITER_INITIAL_OUTPUT;
+		char *output;
+		while (capacity < user_data->output_length + string->length) capacity *= 2;
+		output = realloc(user_data->output, capacity);
+		if (!output)
+		{
+			PyErr_NoMemory();
+			return rawwrite_python_error(context);
+		}
+		user_data->output = output;
+		user_data->output_capacity = capacity;
+	}
+	memcpy(user_data->output + user_data->output_length, string->pointer, string->length);
+	user_data->output_length += string->length;
+
+	if (!user_data->target || user_data->output_length < user_data->buffer_size) return luxem_true;
+	return writer_flush(user_data) || rawwrite_python_error(context);
+}
+
+/* Called whenever a root element may have been completed */
+static luxem_bool_t writer_root_done(Writer *self)
+{
+	if (self->depth > 0) return luxem_true;
+	if (self->stats && !stats_document_done(self->stats)) return luxem_false;
+	if (!self->target || self->buffer_size == 0) return luxem_true;
+	return writer_flush(self);
+}
+
+/* Counts a written token if stats are enabled */
+static luxem_bool_t writer_count(Writer *self, int code)
+{
+	if (self->stats) stats_event(self->stats, code);
+	return luxem_true;
+}
+
+static PyObject *Writer_new(PyTypeObject *type, PyObject *positional_args, PyObject *named_args)
+{
+	Writer *self = (Writer *)type->tp_alloc(type, 0);
+
+	if (self != NULL)
+	{
+		self->context = luxem_rawwrite_construct();
+		if (!self->context)
+		{
+			Py_DECREF(self);
+			return NULL;
+		}
+
+		self->target = NULL;
+		self->file = NULL;
+		self->typed = NULL;
+		self->resolve = NULL;
+		self->encoders = NULL;
+		self->depth = 0;
+		self->buffer_size = 0;
+		self->output = NULL;
+		self->output_length = 0;
+		self->output_capacity = 0;
+		self->stats = NULL;
+		self->spacer = 0;
+		self->indent_multiple = 1;
+	}
+
+	return (PyObject *)self;
+}
+
+/* Points a new context at the writer's output and sets its formatting */
+static void writer_configure(Writer *self)
+{
+	if (self->file)
+		luxem_rawwrite_set_file_out(self->context, self->file);
+	else
+		luxem_rawwrite_set_write_callback(self->context, (luxem_rawwrite_write_callback_t)translate_rawwrite_write, self);
+	if (self->spacer)
+		luxem_rawwrite_set_pretty(self->context, self->spacer, self->indent_multiple);
+}
+
+static luxem_bool_t writer_check_idle(Writer *self)
+{
+	if (!self->writing) return luxem_true;
+	PyErr_SetString(PyExc_RuntimeError, "luxem writer is being written to, by a callback or another thread.");
+	return luxem_false;
+}
+
+static int Writer_init(Writer *self, PyObject *positional_args, PyObject *named_args)
+{
+	luxem_bool_t pretty = luxem_false, use_spaces = luxem_false;
+	int indent_multiple = 1;
+	PyObject *typed = NULL, *resolve = NULL;
+	Py_ssize_t buffer_size = 0;
+
+	static char *named_args_list[] =
+	{
+		"target",
+		"pretty",
+		"use_spaces",
+		"indent_multiple",
+		"typed",
+		"buffer_size",
+		"resolve",
+		NULL
+	};
+
+	if (!writer_check_idle(self)) return -1;
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"|ObbiOnO",
+		named_args_list,
+		&self->target,
+		&pretty,
+		&use_spaces,
+		&indent_multiple,
+		&typed,
+		&buffer_size,
+		&resolve))
+		return -1;
+
+	if (self->target == Py_None) self->target = NULL;
+
+	self->buffer_size = buffer_size > 0 ? buffer_size : 0;
+
+	if (typed == Py_None) typed = NULL;
+	if (typed && !PyType_Check(typed))
+	{
+		PyErr_SetString(PyExc_TypeError, "luxem.RawWriter typed must be a type.");
+		return -1;
+	}
+	Py_XINCREF(typed);
+	Py_XDECREF(self->typed);
+	self->typed = typed;
+
+	if (resolve == Py_None) resolve = NULL;
+	Py_CLEAR(self->resolve);
+	Py_CLEAR(self->encoders);
+	if (resolve)
+	{
+		self->encoders = PyDict_New();
+		if (!self->encoders) return -1;
+		Py_INCREF(resolve);
+		self->resolve = resolve;
+	}
+
+	if (self->target)
+	{
+		Py_INCREF(self->target);
+		if (WRAP_FILE_CHECK(self->target))
+		{
+			self->file = WRAP_FILE_TO(self->target, "w");
+			if (self->file == NULL) return -1;
+			WRAP_FILE_INC(self->file);
+		}
+	}
+
+	self->spacer = pretty ? (use_spaces ? ' ' : '\t') : 0;
+	self->indent_multiple = indent_multiple;
+	writer_configure(self);
+
+	return 0;
+}
+
+static void Writer_dealloc(Writer *self)
+{
+	if (self->target && self->output_length > 0)
+	{
+		PyObject *error_type, *error_value, *error_traceback;
+		PyErr_Fetch(&error_type, &error_value, &error_traceback);
+		if (!writer_flush(self)) PyErr_WriteUnraisable(self->target);
+		PyErr_Restore(error_type, error_value, error_traceback);
+	}
+	free(self->output);
+	luxem_rawwrite_destroy(self->context);
+	if (self->file != NULL)
+	{
+		fflush(self->file);
+		WRAP_FILE_DEC(self->file);
+	}
+	Py_XDECREF(self->target);
+	Py_XDECREF(self->typed);
+	Py_XDECREF(self->resolve);
+	Py_XDECREF(self->encoders);
+	stats_destroy(self->stats);
+	Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+/* Raises the rawwrite error as a Python exception unless one is already set */
+static luxem_bool_t rawwrite_error(struct luxem_rawwrite_context_t *context)
+{
+	if (luxem_rawwrite_get_error(context)->pointer != &exception_marker)
+	{
+		struct luxem_string_t const *error = luxem_rawwrite_get_error(context);
+		PyObject *message;
+		assert(error->length > 0);
+		message = WRAP_STRING_FROM(error->pointer, error->length);
+		if (message)
+		{
+			PyErr_SetObject(PyExc_ValueError, message);
+			Py_DECREF(message);
+		}
+	}
+	else
+	{
+		/* Pass through python exception */
+		assert(luxem_rawwrite_get_error(context)->length == 0);
+	}
+	return luxem_false;
+}
+
+static luxem_bool_t writer_error(Writer *self)
+{
+	return rawwrite_error(self->context);
+}
+
+/* Writing can call back into Python through the target, encoders and stats
+ * hooks, which mustn't reset or write to the writer while rawwrite is using it */
+static luxem_bool_t writer_begin(Writer *self)
+{
+	if (!writer_check_idle(self)) return luxem_false;
+	self->writing = luxem_true;
+	return luxem_true;
+}
+
+static luxem_bool_t writer_end(Writer *self, luxem_bool_t success)
+{
+	self->writing = luxem_false;
+	return success;
+}
+
+static PyObject *translate_void_method(Writer *self, luxem_bool_t (*method)(struct luxem_rawwrite_context_t *), int code, int depth_change)
+{
+	luxem_bool_t success;
+
+	if (!writer_begin(self)) return NULL;
+	success = method(self->context) ? writer_count(self, code) : writer_error(self);
+	if (success)
+	{
+		self->depth += depth_change;
+		if (depth_change < 0) success = writer_root_done(self);
+	}
+	if (!writer_end(self, success)) return NULL;
+
+	Py_INCREF((PyObject *)self);
+	return (PyObject *)self;
+}
+
+static PyObject *Writer_object_begin(Writer *self) { return translate_void_method(self, luxem_rawwrite_object_begin, EVENT_OBJECT_BEGIN, 1); }
+static PyObject *Writer_object_end(Writer *self) { return translate_void_method(self, luxem_rawwrite_object_end, EVENT_OBJECT_END, -1); }
+static PyObject *Writer_array_begin(Writer *self) { return translate_void_method(self, luxem_rawwrite_array_begin, EVENT_ARRAY_BEGIN, 1); }
+static PyObject *Writer_array_end(Writer *self) { return translate_void_method(self, luxem_rawwrite_array_end, EVENT_ARRAY_END, -1); }
+
+static int writer_string_code(luxem_bool_t (*method)(struct luxem_rawwrite_context_t *, struct luxem_string_t const *))
+{
+	if (method == luxem_rawwrite_key) return EVENT_KEY;
+	if (method == luxem_rawwrite_type) return EVENT_TYPE;
+	return EVENT_PRIMITIVE;
+}
+
+static PyObject *translate_string_method(Writer *self, PyObject *positional_args, luxem_bool_t (*method)(struct luxem_rawwrite_context_t *, struct luxem_string_t const *), char const *badargs)
+{
+	PyObject *argument;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"O",
+		&argument))
+		return NULL;
+
+	if (WRAP_STRING_CHECK(argument))
+	{
+		struct luxem_string_t string;
+		luxem_bool_t success;
+		WRAP_STRING_TO(argument, (char **)&string.pointer, &string.length);
+
+		if (!writer_begin(self)) return NULL;
+		success = method(self->context, &string) ?
+			writer_count(self, writer_string_code(method)) :
+			writer_error(self);
+		if (success && method == luxem_rawwrite_primitive) success = writer_root_done(self);
+		if (!writer_end(self, success)) return NULL;
+	}
+	else
+	{
+		PyErr_SetString(PyExc_TypeError, badargs);
+		return NULL;
+	}
+
+	Py_INCREF((PyObject *)self);
+	return (PyObject *)self;
+}
+
+static PyObject *Writer_key(Writer *self, PyObject *positional_args)
+	{ return translate_string_method(self, positional_args, luxem_rawwrite_key, "luxem.RawWriter.key requires a single string argument."); }
+static PyObject *Writer_type(Writer *self, PyObject *positional_args)
+	{ return translate_string_method(self, positional_args, luxem_rawwrite_type, "luxem.RawWriter.type requires a single string argument."); }
+static PyObject *Writer_primitive(Writer *self, PyObject *positional_args)
+	{ return translate_string_method(self, positional_args, luxem_rawwrite_primitive, "luxem.RawWriter.primitive requires a single string argument."); }
+
+typedef luxem_bool_t (*rawwrite_string_method_t)(struct luxem_rawwrite_context_t *, struct luxem_string_t const *);
+
+static luxem_bool_t writer_string(Writer *self, PyObject *value, rawwrite_string_method_t method)
+{
+	struct luxem_string_t string;
+
+	if (!WRAP_STRING_CHECK(value))
+	{
+		PyErr_Format(PyExc_TypeError, "luxem keys and types must be strings, not %.200s.", Py_TYPE(value)->tp_name);
+		return luxem_false;
+	}
+
+	WRAP_STRING_TO(value, (char **)&string.pointer, &string.length);
+	if (!string.pointer) return luxem_false;
+	if (!method(self->context, &string)) return writer_error(self);
+	return writer_count(self, writer_string_code(method));
+}
+
+static luxem_bool_t writer_element(Writer *self, PyObject *item);
+
+static luxem_bool_t writer_sequence(Writer *self, PyObject *item)
+{
+	Py_ssize_t index;
+
+	if (!luxem_rawwrite_array_begin(self->context)) return writer_error(self);
+	writer_count(self, EVENT_ARRAY_BEGIN);
+	for (index = 0; index < PySequence_Fast_GET_SIZE(item); ++index)
+	{
+		PyObject *child = PySequence_Fast_GET_ITEM(item, index);
+		luxem_bool_t success;
+		Py_INCREF(child);
+		success = writer_element(self, child);
+		Py_DECREF(child);
+		if (!success) return luxem_false;
+	}
+	if (!luxem_rawwrite_array_end(self->context)) return writer_error(self);
+	return writer_count(self, EVENT_ARRAY_END);
+}
+
+static luxem_bool_t writer_dict(Writer *self, PyObject *item)
+{
+	Py_ssize_t position = 0;
+	PyObject *key, *value;
+
+	if (!luxem_rawwrite_object_begin(self->context)) return writer_error(self);
+	writer_count(self, EVENT_OBJECT_BEGIN);
+	while (PyDict_Next(item, &position, &key, &value))
+	{
+		luxem_bool_t success;
+		Py_INCREF(key);
+		Py_INCREF(value);
+		success = writer_string(self, key, luxem_rawwrite_key) && writer_element(self, value);
+		Py_DECREF(key);
+		Py_DECREF(value);
+		if (!success) return luxem_false;
+	}
+	if (!luxem_rawwrite_object_end(self->context)) return writer_error(self);
+	return writer_count(self, EVENT_OBJECT_END);
+}
+
+static luxem_bool_t writer_typed(Writer *self, PyObject *item)
+{
+	luxem_bool_t success = luxem_false;
+	PyObject *name, *value;
+
+	if (Py_TYPE(item) == &TypedType)
+	{
+		name = ((Typed *)item)->name;
+		value = ((Typed *)item)->value;
+		Py_INCREF(name);
+		Py_INCREF(value);
+	}
+	else
+	{
+		name = PyObject_GetAttrString(item, "name");
+		value = name ? PyObject_GetAttrString(item, "value") : NULL;
+	}
+	if (value)
+		success = writer_string(self, name, luxem_rawwrite_type) && writer_element(self, value);
+	Py_XDECREF(name);
+	Py_XDECREF(value);
+	return success;
+}
+
+static luxem_bool_t writer_iterable(Writer *self, PyObject *item)
+{
+	PyObject *iterator, *child;
+
+	if (!luxem_rawwrite_array_begin(self->context)) return writer_error(self);
+	writer_count(self, EVENT_ARRAY_BEGIN);
+	iterator = PyObject_GetIter(item);
+	if (!iterator) return luxem_false;
+	while ((child = PyIter_Next(iterator)))
+	{
+		luxem_bool_t success = writer_element(self, child);
+		Py_DECREF(child);
+		if (!success)
+		{
+			Py_DECREF(iterator);
+			return luxem_false;
+		}
+	}
+	Py_DECREF(iterator);
+	if (PyErr_Occurred()) return luxem_false;
+	if (!luxem_rawwrite_array_end(self->context)) return writer_error(self);
+	return writer_count(self, EVENT_ARRAY_END);
+}
+
+/* Returns a borrowed reference to the encoder for the item's type, or Py_None
+ * if it has none.  Encoders are resolved once per type and cached. */
+static PyObject *writer_encoder(Writer *self, PyObject *item)
+{
+	PyObject *type = (PyObject *)Py_TYPE(item);
+	PyObject *encoder = PyDict_GetItem(self->encoders, type);
+	if (encoder) return encoder;
+
+	{
+		double start = stats_callback_start(self->stats);
+		encoder = PyObject_CallFunctionObjArgs(self->resolve, type, NULL);
+		stats_callback_end(self->stats, start);
+	}
+	if (!encoder) return NULL;
+	if (PyDict_SetItem(self->encoders, type, encoder) < 0)
+	{
+		Py_DECREF(encoder);
+		return NULL;
+	}
+	Py_DECREF(encoder);
+	return encoder;
+}
+
+static luxem_bool_t writer_encoded(Writer *self, PyObject *item, PyObject *encoder)
+{
+	PyObject *replacement;
+	luxem_bool_t success;
+	double start;
+
+	if (!encoder) return luxem_false;
+	Py_INCREF(encoder);
+	start = stats_callback_start(self->stats);
+	replacement = PyObject_CallFunctionObjArgs(encoder, item, NULL);
+	stats_callback_end(self->stats, start);
+	Py_DECREF(encoder);
+	if (!replacement) return luxem_false;
+	success = writer_element(self, replacement);
+	Py_DECREF(replacement);
+	return success;
+}
+
+static luxem_bool_t writer_element(Writer *self, PyObject *item)
+{
+	luxem_bool_t success;
+	PyObject *encoder;
+
+	if (WRAP_STRING_CHECK(item))
+		return writer_string(self, item, luxem_rawwrite_primitive);
+
+	if (Py_EnterRecursiveCall(" while serializing a luxem value")) return luxem_false;
+	if (PyDict_Check(item))
+		success = writer_dict(self, item);
+	else if (PyList_Check(item) || PyTuple_Check(item))
+		success = writer_sequence(self, item);
+	else if (self->typed && PyObject_TypeCheck(item, (PyTypeObject *)self->typed))
+		success = writer_typed(self, item);
+	else if (self->resolve && (encoder = writer_encoder(self, item)) != Py_None)
+		success = writer_encoded(self, item, encoder);
+	else if (PyAnySet_Check(item) || PyGen_Check(item))
+		success = writer_iterable(self, item);
+	else
+	{
+		PyObject *string = PyObject_Str(item);
+		success = string && writer_string(self, string, luxem_rawwrite_primitive);
+		Py_XDECREF(string);
+	}
+	Py_LeaveRecursiveCall();
+	return success;
+}
+
+static PyObject *Writer_element(Writer *self, PyObject *positional_args)
+{
+	PyObject *data;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"O",
+		&data))
+		return NULL;
+
+	if (!writer_begin(self)) return NULL;
+	{
+		double start = stats_total_start(self->stats);
+		luxem_bool_t success = writer_element(self, data);
+		stats_total_end(self->stats, start);
+		if (!writer_end(self, success && writer_root_done(self))) return NULL;
+	}
+
+	Py_INCREF((PyObject *)self);
+	return (PyObject *)self;
+}
+
+static PyObject *Writer_binary(Writer *self, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *data, *type = NULL;
+	Py_buffer view;
+	struct luxem_string_t input;
+	struct luxem_string_t encoded;
+	luxem_bool_t success = luxem_true;
+	char *output;
+
+	static char *named_args_list[] =
+	{
+		"data",
+		"type",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|O",
+		named_args_list,
+		&data,
+		&type))
+		return NULL;
+
+	if (!ascii16_input(data, &view, &input)) return NULL;
+
+	/* Encoded straight into a native buffer for rawwrite, without
+	 * creating a Python string */
+	output = malloc(input.length * 2 + 1);
+	if (!output)
+	{
+		if (view.obj) PyBuffer_Release(&view);
+		return PyErr_NoMemory();
+	}
+	Py_BEGIN_ALLOW_THREADS
+	ascii16_encode(&input, output);
+	Py_END_ALLOW_THREADS
+	if (view.obj) PyBuffer_Release(&view);
+
+	if (!writer_begin(self))
+	{
+		free(output);
+		return NULL;
+	}
+	if (!type)
+	{
+		struct luxem_string_t ascii16_type;
+		ascii16_type.pointer = "ascii16";
+		ascii16_type.length = 7;
+		success = luxem_rawwrite_type(self->context, &ascii16_type) ?
+			writer_count(self, EVENT_TYPE) :
+			writer_error(self);
+	}
+	else if (type != Py_None)
+		success = writer_string(self, type, luxem_rawwrite_type);
+	if (success)
+	{
+		encoded.pointer = output;
+		encoded.length = input.length * 2;
+		success = luxem_rawwrite_primitive(self->context, &encoded) ?
+			writer_count(self, EVENT_PRIMITIVE) :
+			writer_error(self);
+	}
+	free(output);
+	if (!writer_end(self, success && writer_root_done(self))) return NULL;
+
+	Py_INCREF((PyObject *)self);
+	return (PyObject *)self;
+}
+
+static PyObject *Writer_enable_stats(Writer *self, PyObject *positional_args, PyObject *named_args)
+{
+	struct stats_t *stats;
+	if (!writer_check_idle(self)) return NULL;
+	stats = stats_create(positional_args, named_args);
+	if (!stats) return NULL;
+	stats_destroy(self->stats);
+	self->stats = stats;
+
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static PyObject *Writer_disable_stats(Writer *self)
+{
+	struct stats_t *stats = self->stats;
+	if (!writer_check_idle(self)) return NULL;
+	self->stats = NULL;
+	stats_destroy(stats);
+
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static PyObject *Writer_stats(Writer *self)
+	{ return stats_get(self->stats); }
+
+static PyObject *Writer_flush(Writer *self)
+{
+	if (self->file)
+		fflush(self->file);
+	else if (self->target)
+	{
+		if (!writer_begin(self)) return NULL;
+		if (!writer_end(self, writer_flush(self))) return NULL;
+	}
+
+	Py_INCREF((PyObject *)self);
+	return (PyObject *)self;
+}
+
+/* Frees the output buffer if it's empty and has grown well past its initial
+ * size, so one large document doesn't hold on to memory for the writer's life */
+static void writer_trim_output(Writer *self)
+{
+	size_t initial = self->buffer_size ? self->buffer_size : WRITER_INITIAL_OUTPUT;
+	if (self->output_length > 0 || self->output_capacity <= initial * WRITER_RETAIN_FACTOR) return;
+	free(self->output);
+	self->output = NULL;
+	self->output_capacity = 0;
+}
+
+/* Discards any unfinished output, keeping the target, formatting, encoder
+ * cache and stats totals.  Like reader reset this replaces the context. */
+static PyObject *Writer_reset(Writer *self)
+{
+	struct luxem_rawwrite_context_t *context;
+	if (!writer_check_idle(self)) return NULL;
+	context = luxem_rawwrite_construct();
+	if (!context) return PyErr_NoMemory();
+	luxem_rawwrite_destroy(self->context);
+	self->context = context;
+	writer_configure(self);
+	self->depth = 0;
+	self->output_length = 0;
+	writer_trim_output(self);
+	if (self->stats)
+	{
+		memset(&self->stats->document, 0, sizeof(self->stats->document));
+		self->stats->depth = 0;
+	}
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+static luxem_bool_t writer_check_buffered(Writer *self, char const *method)
+{
+	if (!self->target) return luxem_true;
+	PyErr_Format(PyExc_TypeError, "luxem.RawWriter.%s can only be used if not using a custom serialize callback for serializing to file.", method);
+	return luxem_false;
+}
+
+static PyObject *Writer_dump(Writer *self)
+{
+	if (!writer_check_buffered(self, "dump")) return NULL;
+	return WRAP_BYTES_FROM(self->output, self->output_length);
+}
+
+static PyObject *Writer_dump_into(Writer *self, PyObject *positional_args)
+{
+	PyObject *target;
+	Py_buffer view;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"O",
+		&target))
+		return NULL;
+
+	if (!writer_check_buffered(self, "dump_into")) return NULL;
+	if (PyByteArray_Check(target) && PyByteArray_Resize(target, self->output_length) < 0) return NULL;
+	if (PyObject_GetBuffer(target, &view, PyBUF_WRITABLE) < 0) return NULL;
+	if ((size_t)view.len < self->output_length)
+	{
+		PyErr_SetString(PyExc_ValueError, "luxem.RawWriter.dump_into buffer is too small for the output.");
+		PyBuffer_Release(&view);
+		return NULL;
+	}
+	if (self->output_length > 0) memcpy(view.buf, self->output, self->output_length);
+	PyBuffer_Release(&view);
+	return WRAP_INT_FROM_SIZET(self->output_length);
+}
+
+static PyObject *Writer_drain(Writer *self)
+{
+	PyObject *out;
+	if (!writer_check_buffered(self, "drain")) return NULL;
+	out = WRAP_BYTES_FROM(self->output, self->output_length);
+	if (!out) return NULL;
+	self->output_length = 0;
+	writer_trim_output(self);
+	return out;
+}
+
+static PyMethodDef Writer_methods[] =
+{
+	{"object_begin", (PyCFunction)Writer_object_begin, METH_NOARGS, "Start a new object."},
+	{"object_end", (PyCFunction)Writer_object_end, METH_NOARGS, "End current object."},
+	{"array_begin", (PyCFunction)Writer_array_begin, METH_NOARGS, "Start a new array."},
+	{"array_end", (PyCFunction)Writer_array_end, METH_NOARGS, "End current array."},
+	{"key", (PyCFunction)Writer_key, METH_VARARGS, "Write a key."},
+	{"type", (PyCFunction)Writer_type, METH_VARARGS, "Write a type."},
+	{"primitive", (PyCFunction)Writer_primitive, METH_VARARGS, "Write a primitive."},
+	{"element", (PyCFunction)Writer_element, METH_VARARGS, "Write a value, recursively serializing dicts, lists, tuples, sets, generators, typed values and values with encoders."},
+	{"dump", (PyCFunction)Writer_dump, METH_NOARGS, "If serializing to a buffer, returns all rendered data so far."},
+	{"dump_into", (PyCFunction)Writer_dump_into, METH_VARARGS, "If serializing to a buffer, copies all rendered data so far into a writable buffer and returns the length."},
+	{"drain", (PyCFunction)Writer_drain, METH_NOARGS, "If serializing to a buffer, returns the data rendered since the last drain and removes it from the buffer."},
+	{"flush", (PyCFunction)Writer_flush, METH_NOARGS, "Send any buffered output to the target."},
+	{"reset", (PyCFunction)Writer_reset, METH_NOARGS, "Discard any unfinished output so the writer can be reused."},
+	{"binary", (PyCFunction)Writer_binary, METH_VARARGS | METH_KEYWORDS, "Write bytes as an ascii16 primitive, typed (ascii16) by default."},
+	{"enable_stats", (PyCFunction)Writer_enable_stats, METH_VARARGS | METH_KEYWORDS, "Start collecting stats, resetting any collected so far."},
+	{"disable_stats", (PyCFunction)Writer_disable_stats, METH_NOARGS, "Stop collecting stats."},
+	{"stats", (PyCFunction)Writer_stats, METH_NOARGS, "Returns a dict of the stats collected so far, or None if stats aren't enabled."},
+	{NULL}
+};
+
+static PyTypeObject WriterType = {PyObject_HEAD_INIT(NULL) 0};
+
+static luxem_bool_t WriterType_init(void)
+{
+	WriterType.tp_name = "luxem.RawWriter";
+	WriterType.tp_basicsize = sizeof(Writer);
+	WriterType.tp_dealloc = (destructor)Writer_dealloc;
+	WriterType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+	WriterType.tp_doc = "Encodes luxem data";
+	WriterType.tp_methods = Writer_methods;
+	WriterType.tp_init = (initproc)Writer_init;
+	WriterType.tp_new = Writer_new;
+	return PyType_Ready(&WriterType) >= 0;
+}
+
+/* ************************************************************************** */
+
+/* luxem module + module entry point */
+/*************************************/
+
+static PyObject *translate_to_ascii16(PyObject *self, PyObject *positional_args)
+{
+	PyObject *argument, *out;
+	Py_buffer view;
+	struct luxem_string_t data;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"O",
+		&argument))
+		return NULL;
+
+	if (!ascii16_input(argument, &view, &data)) return NULL;
+
+	out = WRAP_ASCII_NEW(data.length * 2);
+	if (out)
+	{
+		Py_BEGIN_ALLOW_THREADS
+		ascii16_encode(&data, WRAP_ASCII_DATA(out));
+		Py_END_ALLOW_THREADS
+	}
+
+	if (view.obj) PyBuffer_Release(&view);
+	return out;
+}
+
+static PyObject *translate_from_ascii16(PyObject *self, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *argument, *target = Py_None, *out = NULL;
+	Py_buffer view, target_view;
+	struct luxem_string_t data;
+	struct luxem_string_t error;
+	luxem_bool_t success;
+
+	static char *named_args_list[] =
+	{
+		"data",
+		"out",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|O",
+		named_args_list,
+		&argument,
+		&target))
+		return NULL;
+
+	if (!ascii16_input(argument, &view, &data)) return NULL;
+
+	if (target == Py_None)
+	{
+		out = ascii16_decode(&data, luxem_true);
+		goto done;
+	}
+
+	if (PyByteArray_Check(target) && PyByteArray_Resize(target, data.length / 2) < 0) goto done;
+	if (PyObject_GetBuffer(target, &target_view, PyBUF_WRITABLE) < 0) goto done;
+	if ((size_t)target_view.len < data.length / 2)
+	{
+		PyErr_SetString(PyExc_ValueError, "luxem.from_ascii16 out is too small for the decoded data.");
+		PyBuffer_Release(&target_view);
+		goto done;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	success = ascii16_decode_into(&data, target_view.buf, &error);
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&target_view);
+	if (success) out = WRAP_INT_FROM_SIZET(data.length / 2);
+	else ascii16_error(&error);
+
+done:
+	if (view.obj) PyBuffer_Release(&view);
+	return out;
+}
+
+/* Root boundary scanning only tracks nesting, escapes, quoted strings, types
+ * and comments - it doesn't validate anything, that's left to the readers
+ * that parse each range.  Scans must start at a root boundary. */
+struct root_scan_t
+{
+	size_t depth;
+	char closer;
+};
+
+/* Returns true if the character at *position is a top level comma, skipping past any escaped character */
+static luxem_bool_t root_scan_step(struct root_scan_t *scan, char const *data, size_t *position)
+{
+	char const next = data[*position];
+	if (next == '\\') { ++*position; return luxem_false; }
+	if (scan->closer)
+	{
+		if (next == scan->closer) scan->closer = 0;
+		return luxem_false;
+	}
+	switch (next)
+	{
+		case '"': scan->closer = '"'; break;
+		case '*': scan->closer = '*'; break;
+		case '(': scan->closer = ')'; break;
+		case '{': case '[': ++scan->depth; break;
+		case '}': case ']': if (scan->depth) --scan->depth; break;
+		case ',': return scan->depth == 0;
+		default: break;
+	}
+	return luxem_false;
+}
+
+/* Finds up to parts - 1 offsets just past top level commas, spread evenly
+ * through the data. */
+static size_t scan_root_boundaries(char const *data, size_t length, size_t parts, size_t *offsets)
+{
+	size_t position;
+	size_t count = 0;
+	size_t target = length / parts;
+	struct root_scan_t scan = {0, 0};
+	for (position = 0; position < length && count + 1 < parts; ++position)
+	{
+		if (!root_scan_step(&scan, data, &position) || position + 1 < target) continue;
+		offsets[count++] = position + 1;
+		target = length / parts * (count + 1);
+	}
+	return count;
+}
+
+/* Finds up to limit offsets just past each top level comma, starting at start */
+static size_t scan_root_ends(char const *data, size_t start, size_t length, size_t limit, size_t *offsets)
+{
+	size_t position;
+	size_t count = 0;
+	struct root_scan_t scan = {0, 0};
+	for (position = start; position < length && count < limit; ++position)
+	{
+		if (root_scan_step(&scan, data, &position)) offsets[count++] = position + 1;
+	}
+	return count;
+}
+
+static PyObject *translate_split_roots(PyObject *self, PyObject *positional_args)
+{
+	PyObject *data;
+	Py_ssize_t parts;
+	Py_buffer view;
+	size_t *offsets;
+	size_t count;
+	size_t index;
+	PyObject *out;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"On",
+		&data,
+		&parts))
+		return NULL;
+
+	if (parts < 1)
+	{
+		PyErr_SetString(PyExc_ValueError, "parts must be at least 1.");
+		return NULL;
+	}
+
+	if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) return NULL;
+
+	offsets = malloc(sizeof(size_t) * parts);
+	if (!offsets)
+	{
+		PyBuffer_Release(&view);
+		return PyErr_NoMemory();
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	count = scan_root_boundaries(view.buf, view.len, parts, offsets);
+	Py_END_ALLOW_THREADS
+
+	out = PyList_New(count + 2);
+	for (index = 0; out && index < count + 2; ++index)
+	{
+		PyObject *offset = WRAP_INT_FROM_SIZET(
+			index == 0 ? 0 : index <= count ? offsets[index - 1] : (size_t)view.len);
+		if (!offset) Py_CLEAR(out);
+		else PyList_SET_ITEM(out, index, offset);
+	}
+	free(offsets);
+	PyBuffer_Release(&view);
+	return out;
+}
+
+/* Reformat */
+/************/
+
+#define REFORMAT_CHUNK 65536
+
+/* State shared by the rawread and rawwrite callbacks of a reformat, which runs
+ * without the GIL.  It is only taken to pass output to a Python target. */
+struct reformat_t
+{
+	struct luxem_rawwrite_context_t *writer;
+	PyThreadState *thread_state;
+	PyObject *target;
+	char *output;
+	size_t output_length;
+	luxem_bool_t write_failed;
+};
+
+static luxem_bool_t reformat_send(struct reformat_t *self)
+{
+	PyObject *result;
+	if (self->output_length == 0) return luxem_true;
+	PyEval_RestoreThread(self->thread_state);
+#if PY_MAJOR_VERSION >= 3
+	result = PyObject_CallFunction(self->target, "y#", self->output, (Py_ssize_t)self->output_length);
+#else
+	result = PyObject_CallFunction(self->target, "s#", self->output, (Py_ssize_t)self->output_length);
+#endif
+	Py_XDECREF(result);
+	self->thread_state = PyEval_SaveThread();
+	self->output_length = 0;
+	return result != NULL;
+}
+
+static luxem_bool_t reformat_write(struct luxem_rawwrite_context_t *context, struct reformat_t *self, struct luxem_string_t const *string)
+{
+	size_t offset = 0;
+	while (offset < string->length)
+	{
+		size_t length = string->length - offset;
+		if (length > REFORMAT_CHUNK - self->output_length) length = REFORMAT_CHUNK - self->output_length;
+		memcpy(self->output + self->output_length, string->pointer + offset, length);
+		self->output_length += length;
+		offset += length;
+		if (self->output_length == REFORMAT_CHUNK && !reformat_send(self)) return rawwrite_python_error(context);
+	}
+	return luxem_true;
+}
+
+static luxem_bool_t reformat_result(struct luxem_rawread_context_t *context, struct reformat_t *self, luxem_bool_t success)
+{
+	if (success) return luxem_true;
+	self->write_failed = luxem_true;
+	return rawread_python_error(context);
+}
+
+static luxem_bool_t reformat_object_begin(struct luxem_rawread_context_t *context, struct reformat_t *self)
+	{ return reformat_result(context, self, luxem_rawwrite_object_begin(self->writer)); }
+static luxem_bool_t reformat_object_end(struct luxem_rawread_context_t *context, struct reformat_t *self)
+	{ return reformat_result(context, self, luxem_rawwrite_object_end(self->writer)); }
+static luxem_bool_t reformat_array_begin(struct luxem_rawread_context_t *context, struct reformat_t *self)
+	{ return reformat_result(context, self, luxem_rawwrite_array_begin(self->writer)); }
+static luxem_bool_t reformat_array_end(struct luxem_rawread_context_t *context, struct reformat_t *self)
+	{ return reformat_result(context, self, luxem_rawwrite_array_end(self->writer)); }
+static luxem_bool_t reformat_key(struct luxem_rawread_context_t *context, struct reformat_t *self, struct luxem_string_t const *string)
+	{ return reformat_result(context, self, luxem_rawwrite_key(self->writer, string)); }
+static luxem_bool_t reformat_type(struct luxem_rawread_context_t *context, struct reformat_t *self, struct luxem_string_t const *string)
+	{ return reformat_result(context, self, luxem_rawwrite_type(self->writer, string)); }
+static luxem_bool_t reformat_primitive(struct luxem_rawread_context_t *context, struct reformat_t *self, struct luxem_string_t const *string)
+	{ return reformat_result(context, self, luxem_rawwrite_primitive(self->writer, string)); }
+
+/* The GIL is already released for the whole feed */
+static void reformat_keep_gil(struct luxem_rawread_context_t *context, void *user_data) {}
+
+static PyObject *translate_reformat(PyObject *module, PyObject *positional_args, PyObject *named_args)
+{
+	PyObject *source, *target = Py_None, *out = NULL;
+	luxem_bool_t pretty = luxem_false, use_spaces = luxem_false;
+	int indent_multiple = 1;
+	struct reformat_t self;
+	struct luxem_rawread_context_t *reader = NULL;
+	struct luxem_rawread_callbacks_t *callbacks;
+	Py_buffer view;
+	FILE *source_file = NULL, *target_file = NULL;
+	luxem_bool_t success;
+
+	static char *named_args_list[] =
+	{
+		"source",
+		"target",
+		"pretty",
+		"use_spaces",
+		"indent_multiple",
+		NULL
+	};
+
+	if (!PyArg_ParseTupleAndKeywords(
+		positional_args,
+		named_args,
+		"O|Obbi",
+		named_args_list,
+		&source,
+		&target,
+		&pretty,
+		&use_spaces,
+		&indent_multiple))
+		return NULL;
+
+	view.obj = NULL;
+	self.writer = NULL;
+	self.thread_state = NULL;
+	self.target = NULL;
+	self.output = NULL;
+	self.output_length = 0;
+	self.write_failed = luxem_false;
+
+	if (PyObject_CheckBuffer(source))
+	{
+		if (PyObject_GetBuffer(source, &view, PyBUF_SIMPLE) < 0) return NULL;
+	}
+	else if (WRAP_FILE_CHECK(source))
+	{
+		source_file = WRAP_FILE_OPEN(source, "r");
+		if (!source_file) return NULL;
+		WRAP_FILE_INC(source);
+	}
+	else
+	{
+		PyErr_SetString(PyExc_TypeError, "luxem.reformat source must be bytes-like or a binary file.");
+		return NULL;
+	}
+
+	reader = luxem_rawread_construct();
+	self.writer = luxem_rawwrite_construct();
+	if (!reader || !self.writer)
+	{
+		PyErr_NoMemory();
+		goto cleanup;
+	}
+
+	if (target == Py_None)
+		luxem_rawwrite_set_buffer_out(self.writer);
+	else if (PyCallable_Check(target))
+	{
+		self.target = target;
+		self.output = malloc(REFORMAT_CHUNK);
+		if (!self.output)
+		{
+			PyErr_NoMemory();
+			goto cleanup;
+		}
+		luxem_rawwrite_set_write_callback(self.writer, (luxem_rawwrite_write_callback_t)reformat_write, &self);
+	}
+	else if (!PyLong_Check(target) && WRAP_FILE_CHECK(target))
+	{
+		target_file = WRAP_FILE_OPEN(target, "w");
+		if (!target_file) goto cleanup;
+		WRAP_FILE_INC(target);
+		luxem_rawwrite_set_file_out(self.writer, target_file);
+	}
+	else
+	{
+		PyErr_SetString(PyExc_TypeError, "luxem.reformat target must be None, a binary file or a callable.");
+		goto cleanup;
+	}
+	if (pretty)
+		luxem_rawwrite_set_pretty(self.writer, use_spaces ? ' ' : '\t', indent_multiple);
+
+	callbacks = luxem_rawread_callbacks(reader);
+	callbacks->user_data = &self;
+	callbacks->object_begin = (luxem_rawread_void_callback_t)reformat_object_begin;
+	callbacks->object_end = (luxem_rawread_void_callback_t)reformat_object_end;
+	callbacks->array_begin = (luxem_rawread_void_callback_t)reformat_array_begin;
+	callbacks->array_end = (luxem_rawread_void_callback_t)reformat_array_end;
+	callbacks->key = (luxem_rawread_string_callback_t)reformat_key;
+	callbacks->type = (luxem_rawread_string_callback_t)reformat_type;
+	callbacks->primitive = (luxem_rawread_string_callback_t)reformat_primitive;
+
+	self.thread_state = PyEval_SaveThread();
+	if (source_file)
+		success = luxem_rawread_feed_file(reader, source_file, reformat_keep_gil, reformat_keep_gil);
+	else
+	{
+		struct luxem_string_t string;
+		size_t eaten = 0;
+		string.pointer = view.buf;
+		string.length = view.len;
+		success = luxem_rawread_feed(reader, &string, &eaten, luxem_true);
+	}
+	if (success && self.target && !reformat_send(&self))
+	{
+		success = luxem_false;
+		self.write_failed = luxem_true;
+	}
+	if (target_file) fflush(target_file);
+	PyEval_RestoreThread(self.thread_state);
+
+	if (!success)
+	{
+		/* Only writes fail with an exception, so any other error is a parse error.
+		 * A failed final send has already set the target's exception. */
+		if (!self.write_failed) format_rawread_error(reader);
+		else if (!PyErr_Occurred()) rawwrite_error(self.writer);
+		goto cleanup;
+	}
+
+	if (target == Py_None)
+	{
+		struct luxem_string_t *rendered = luxem_rawwrite_buffer_render(self.writer);
+		if (!rendered)
+		{
+			rawwrite_error(self.writer);
+			goto cleanup;
+		}
+		out = WRAP_BYTES_FROM(rendered->pointer, rendered->length);
+		free(rendered);
+	}
+	else
+	{
+		Py_INCREF(Py_None);
+		out = Py_None;
+	}
+
+cleanup:
+	if (reader) luxem_rawread_destroy(reader);
+	if (self.writer) luxem_rawwrite_destroy(self.writer);
+	free(self.output);
+	if (source_file)
+	{
+		WRAP_FILE_CLOSE(source_file);
+		WRAP_FILE_DEC(source);
+	}
+	if (target_file)
+	{
+		WRAP_FILE_CLOSE(target_file);
+		WRAP_FILE_DEC(target);
+	}
+	if (view.obj) PyBuffer_Release(&view);
+	return out;
+}
+
+static PyObject *translate_root_ends(PyObject *self, PyObject *positional_args)
+{
+	PyObject *data;
+	Py_ssize_t start = 0, limit = 65536;
+	Py_buffer view;
+	size_t *offsets;
+	size_t count;
+	size_t index;
+	PyObject *out;
+
+	if (!PyArg_ParseTuple(
+		positional_args,
+		"O|nn",
+		&data,
+		&start,
+		&limit))
+		return NULL;
+
+	if (start < 0 || limit < 1)
+	{
+		PyErr_SetString(PyExc_ValueError, "start must not be negative and limit must be at least 1.");
+		return NULL;
+	}
+
+	if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) return NULL;
+	if (start > view.len) start = view.len;
+
+	offsets = malloc(sizeof(size_t) * limit);
+	if (!offsets)
+	{
+		PyBuffer_Release(&view);
+		return PyErr_NoMemory();
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	count = scan_root_ends(view.buf, start, view.len, limit, offsets);
+	Py_END_ALLOW_THREADS
+
+	out = PyList_New(count);
+	for (index = 0; out && index < count; ++index)
+	{
+		PyObject *offset = WRAP_INT_FROM_SIZET(offsets[index]);
+		if (!offset) Py_CLEAR(out);
+		else PyList_SET_ITEM(out, index, offset);
+	}
+	free(offsets);
+	PyBuffer_Release(&view);
+	return out;
+}
+
+static PyMethodDef luxem_methods[] =
+{
+	{"to_ascii16", (PyCFunction)translate_to_ascii16, METH_VARARGS, "Encode bytes as an ascii16 string."},
+	{"from_ascii16", (PyCFunction)translate_from_ascii16, METH_VARARGS | METH_KEYWORDS, "Decode ascii16 to bytes, or into a writable buffer."},
+	{"split_roots", (PyCFunction)translate_split_roots, METH_VARARGS, "Split data into ranges of whole root elements."},
+	{"root_ends", (PyCFunction)translate_root_ends, METH_VARARGS, "Return up to limit offsets just past each root element's comma, scanning from start."},
+	{"reformat", (PyCFunction)translate_reformat, METH_VARARGS | METH_KEYWORDS, "Rewrite a document, optionally pretty printed, without creating Python objects."},
+	{NULL}
+};
+
+#if PY_MAJOR_VERSION >= 3
 
 static struct PyModuleDef moduledef =
 {
@@ -655,11 +4416,19 @@ init_luxem(void)
 #endif
 {
 #if PY_MAJOR_VERSION >= 3
+	if (!TypedType_init()) return NULL;
 	if (!ReaderType_init()) return NULL;
+	if (!BuilderType_init()) return NULL;
+	if (!EventReaderType_init()) return NULL;
+	if (!TapeType_init()) return NULL;
 	if (!WriterType_init()) return NULL;
 	PyObject *module = PyModule_Create(&moduledef);
 #else
+	if (!TypedType_init()) return;
 	if (!ReaderType_init()) return;
+	if (!BuilderType_init()) return;
+	if (!EventReaderType_init()) return;
+	if (!TapeType_init()) return;
 	if (!WriterType_init()) return;
 	PyObject *module = Py_InitModule3("_luxem", luxem_methods, "luxem C API internal-use module.");
 #endif
@@ -667,8 +4436,21 @@ init_luxem(void)
 	if (module == NULL)
 		INITERROR;
 
+	Py_INCREF(&TypedType);
+	PyModule_AddObject(module, "Typed", (PyObject *)&TypedType);
 	Py_INCREF(&ReaderType);
 	PyModule_AddObject(module, "Reader", (PyObject *)&ReaderType);
+	Py_INCREF(&BuilderType);
+	PyModule_AddObject(module, "Builder", (PyObject *)&BuilderType);
+	Py_INCREF(&EventReaderType);
+	PyModule_AddObject(module, "EventReader", (PyObject *)&EventReaderType);
+	Py_INCREF(&TapeType);
+	PyModule_AddObject(module, "Tape", (PyObject *)&TapeType);
+	{
+		int code;
+		for (code = 0; code < EVENT_COUNT; ++code)
+			PyModule_AddIntConstant(module, event_names[code], code);
+	}
 	PyModule_AddObject(module, "Writer", (PyObject *)&WriterType);
 
 #if PY_MAJOR_VERSION >= 3
@@ -0,0 +1,277 @@
+"""Benchmarks for the luxem read and write paths.
+
+Runs each case against generated corpora and writes the results as JSON, which
+can be compared with results from another commit:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import _luxem
+import luxem
+
+
+def _word(rng, length):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length))
+
+
+def _deep(rng, scale):
+    def nest(depth):
+        if depth == 0:
+            return _word(rng, 4)
+        if depth % 2:
+            return [nest(depth - 1), _word(rng, 3)]
+        return {'child': nest(depth - 1), 'name': _word(rng, 3)}
+    return [nest(200) for _ in range(10 * scale)]
+
+
+def _wide(rng, scale):
+    return [
+        dict((_word(rng, 12), _word(rng, 6)) for _ in range(10000))
+        for _ in range(scale)
+    ]
+
+
+def _many_roots(rng, scale):
+    return [
+        {'id': str(index), 'name': _word(rng, 8), 'tags': [_word(rng, 4), _word(rng, 4)]}
+        for index in range(20000 * scale)
+    ]
+
+
+def _typed(rng, scale):
+    return [
+        luxem.Typed('record', {
+            'id': luxem.Typed('int', str(index)),
+            'weight': luxem.Typed('float', '%.3f' % rng.random()),
+            'when': luxem.Typed('date', '2020-01-%02d' % rng.randint(1, 28)),
+            'values': [luxem.Typed('int', str(rng.randint(0, 1000))) for _ in range(4)],
+        })
+        for index in range(5000 * scale)
+    ]
+
+
+def _long_strings(rng, scale):
+    return [
+        ' '.join(_word(rng, rng.randint(1, 12)) for _ in range(2000))
+        for _ in range(50 * scale)
+    ]
+
+
+def _ascii16(rng, scale):
+    return [
+        luxem.Typed('ascii16', luxem.to_ascii16(
+            bytes(bytearray(rng.getrandbits(8) for _ in range(1 << 20)))))
+        for _ in range(2 * scale)
+    ]
+
+
+corpora = [
+    ('deep', _deep),
+    ('wide', _wide),
+    ('many_roots', _many_roots),
+    ('typed', _typed),
+    ('long_strings', _long_strings),
+    ('ascii16', _ascii16),
+]
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return dict((key, _to_json(child)) for key, child in value.items())
+    if isinstance(value, list):
+        return [_to_json(child) for child in value]
+    if isinstance(value, luxem.Typed):
+        return {'type': value.name, 'value': _to_json(value.value)}
+    return value
+
+
+def _dumps_all(roots):
+    w = luxem.Writer()
+    for root in roots:
+        w.element(root)
+    return w.dump()
+
+
+def _ignore(*args):
+    pass
+
+
+def _raw_read(data):
+    _luxem.Reader(
+        object_begin=_ignore,
+        object_end=_ignore,
+        array_begin=_ignore,
+        array_end=_ignore,
+        key=_ignore,
+        type=_ignore,
+        primitive=_ignore,
+    ).feed(data)
+
+
+def _event_read(data):
+    r = luxem.EventReader()
+    r.feed(data)
+    return r.events()
+
+
+def _tokens(value, out):
+    if isinstance(value, dict):
+        out.append(('object_begin',))
+        for key, child in value.items():
+            out.append(('key', key))
+            _tokens(child, out)
+        out.append(('object_end',))
+    elif isinstance(value, list):
+        out.append(('array_begin',))
+        for child in value:
+            _tokens(child, out)
+        out.append(('array_end',))
+    elif isinstance(value, luxem.Typed):
+        out.append(('type', value.name))
+        _tokens(value.value, out)
+    else:
+        out.append(('primitive', value))
+    return out
+
+
+def _raw_write(tokens):
+    w = _luxem.Writer()
+    for token in tokens:
+        getattr(w, token[0])(*token[1:])
+    return w.dump()
+
+
+def cases(name, roots, directory):
+    data = _dumps_all(roots)
+    path = os.path.join(directory, name + '.luxem')
+    with open(path, 'wb') as dest:
+        dest.write(data)
+    json_roots = _to_json(roots)
+    json_data = json.dumps(json_roots)
+    tokens = []
+    for root in roots:
+        _tokens(root, tokens)
+    return len(data), [
+        ('loads', lambda: luxem.loads(data)),
+        ('loads_python', lambda: luxem.loads(data, native=False)),
+        ('load_path', lambda: luxem.load_path(path)),
+        ('dumps', lambda: _dumps_all(roots)),
+        ('reader_events', lambda: _raw_read(data)),
+        ('event_reader', lambda: _event_read(data)),
+        ('writer_tokens', lambda: _raw_write(tokens)),
+        ('json_loads', lambda: json.loads(json_data)),
+        ('json_dumps', lambda: json.dumps(json_roots)),
+    ]
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT,
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    selected = set(args.corpus or [name for name, _ in corpora])
+    selected_cases = set(args.case or [])
+    results = []
+    directory = tempfile.mkdtemp()
+    try:
+        for name, generate in corpora:
+            if name not in selected:
+                continue
+            roots = generate(random.Random(args.seed), args.scale)
+            size, corpus_cases = cases(name, roots, directory)
+            for case, function in corpus_cases:
+                if selected_cases and case not in selected_cases:
+                    continue
+                seconds = min(timeit.Timer(function).repeat(args.repeat, args.number)) / args.number
+                results.append({
+                    'corpus': name,
+                    'case': case,
+                    'bytes': size,
+                    'seconds': seconds,
+                    'mb_per_second': size / seconds / 1e6,
+                })
+                sys.stderr.write('%-14s %-14s %10.6fs %9.2f MB/s\n' % (
+                    name, case, seconds, size / seconds / 1e6))
+    finally:
+        shutil.rmtree(directory)
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'number': args.number,
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Prints the change in each case to stderr, keeping stdout for the
+    results JSON, and returns the cases slower than the threshold."""
+    before = dict(
+        ((result['corpus'], result['case']), result['seconds'])
+        for result in baseline['results']
+    )
+    regressions = []
+    for result in current['results']:
+        key = (result['corpus'], result['case'])
+        if key not in before:
+            continue
+        ratio = result['seconds'] / before[key]
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' REGRESSION'
+            regressions.append(key)
+        sys.stderr.write('%-14s %-14s %7.3fx%s\n' % (key[0], key[1], ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark luxem reading and writing.')
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    parser.add_argument('--compare', help='Compare with results JSON from a previous run.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Fraction slower than the comparison that counts as a regression.')
+    parser.add_argument('--corpus', action='append', choices=[name for name, _ in corpora], help='Only run this corpus.  May be repeated.')
+    parser.add_argument('--case', action='append', help='Only run this case.  May be repeated.')
+    parser.add_argument('--scale', type=int, default=1, help='Multiplier for the corpus sizes.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=1)
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as dest:
+            json.dump(results, dest, indent=4, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=4, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,13 @@
-from _luxem import Reader, to_ascii16, from_ascii16
+from _luxem import Reader, EventReader, to_ascii16, from_ascii16, reformat
+from _luxem import (
+    OBJECT_BEGIN, OBJECT_END, ARRAY_BEGIN, ARRAY_END, KEY, TYPE, PRIMITIVE,
+)
 from luxem.struct import Typed
-from luxem.read import load
+from luxem.schema import Schema
+from luxem.read import load, load_path, iterload, events
+from luxem.lazy import load_lazy
+from luxem.parallel import parallel_load
 loads = load
 from luxem.write import dump, dumps, Writer
+from luxem.records import RecordFile
+from luxem import transcode
@@ -0,0 +1,54 @@
+import asyncio
+
+import _luxem
+from luxem.struct import Typed
+from luxem.write import Writer
+
+
+async def aiterload(stream_reader, chunk_size=65536, **kwargs):
+    r = _luxem.Builder(typed=Typed, **kwargs)
+    root = r.root
+    while True:
+        chunk = await stream_reader.read(chunk_size)
+        r.push(chunk, finish=not chunk)
+        values = root[:]
+        del root[:]
+        for value in values:
+            yield value
+        if not chunk:
+            return
+        # Let other tasks run between chunks even if the stream has data
+        # buffered already
+        await asyncio.sleep(0)
+
+
+async def load(stream_reader, chunk_size=65536, **kwargs):
+    return [
+        value
+        async for value in aiterload(stream_reader, chunk_size, **kwargs)
+    ]
+
+
+async def dump(stream_writer, value, **kwargs):
+    kwargs.setdefault('buffer_size', 65536)
+    chunks = []
+    writer = Writer(target=chunks.append, **kwargs)
+
+    # Serialize a step at a time, as in Writer.element(native=False), so the
+    # stream can drain each buffer_size chunk before more is produced
+    stack = []
+    writer._process(stack, value)
+    while True:
+        if chunks:
+            for chunk in chunks:
+                stream_writer.write(chunk)
+            del chunks[:]
+            await stream_writer.drain()
+        if not stack:
+            break
+        if not stack[-1].step(writer, stack):
+            stack.pop()
+    writer.flush()
+    for chunk in chunks:
+        stream_writer.write(chunk)
+    await stream_writer.drain()
@@ -0,0 +1,76 @@
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    from collections import Mapping, Sequence
+
+import _luxem
+from luxem.struct import Typed
+
+
+def _wrap(tape, index):
+    type, code, payload = tape.value(index)
+    if code == _luxem.OBJECT_BEGIN:
+        payload = LazyObject(tape, payload)
+    elif code == _luxem.ARRAY_BEGIN:
+        payload = LazyArray(tape, payload)
+    if type is not None:
+        return Typed(type, payload)
+    return payload
+
+
+class LazyArray(Sequence):
+    def __init__(self, tape, begin, children=None):
+        self._tape = tape
+        self._begin = begin
+        self._children = children
+
+    def _get_children(self):
+        if self._children is None:
+            self._children = self._tape.children(self._begin)
+        return self._children
+
+    def __len__(self):
+        return len(self._get_children())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                _wrap(self._tape, child)
+                for child in self._get_children()[index]
+            ]
+        return _wrap(self._tape, self._get_children()[index])
+
+    def materialize(self):
+        if self._begin is None:
+            return [self._tape.decode(child) for child in self._children]
+        return self._tape.decode(self._begin)
+
+
+class LazyObject(Mapping):
+    def __init__(self, tape, begin):
+        self._tape = tape
+        self._begin = begin
+        self._children = None
+
+    def _get_children(self):
+        if self._children is None:
+            self._children = dict(self._tape.children(self._begin))
+        return self._children
+
+    def __len__(self):
+        return len(self._get_children())
+
+    def __iter__(self):
+        return iter(self._get_children())
+
+    def __getitem__(self, key):
+        return _wrap(self._tape, self._get_children()[key])
+
+    def materialize(self):
+        return self._tape.decode(self._begin)
+
+
+def load_lazy(source, **kwargs):
+    tape = _luxem.Tape(**kwargs)
+    tape.feed(source)
+    return LazyArray(tape, None, tape.roots())
@@ -0,0 +1,45 @@
+import mmap
+import multiprocessing
+import os
+
+import _luxem
+from luxem.read import load
+
+
+def _load_range(arguments):
+    path, start, end, kwargs = arguments
+    with open(path, 'rb') as source:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return load(mapped[start:end], **kwargs)
+        finally:
+            mapped.close()
+
+
+def parallel_load(path, workers=None, parts_per_worker=4, **kwargs):
+    workers = workers or multiprocessing.cpu_count()
+    with open(path, 'rb') as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return load(b'', **kwargs)
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offsets = _luxem.split_roots(mapped, workers * parts_per_worker)
+        finally:
+            mapped.close()
+    ranges = [
+        (path, start, end, kwargs)
+        for start, end in zip(offsets, offsets[1:])
+    ]
+    if workers == 1 or len(ranges) == 1:
+        chunks = [_load_range(arguments) for arguments in ranges]
+    else:
+        pool = multiprocessing.Pool(min(workers, len(ranges)))
+        try:
+            chunks = pool.map(_load_range, ranges)
+        finally:
+            pool.close()
+            pool.join()
+    out = []
+    for chunk in chunks:
+        out.extend(chunk)
+    return out
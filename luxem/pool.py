@@ -0,0 +1,20 @@
+import threading
+
+
+class Pool(threading.local):
+    """Keeps one idle instance per thread, reset between uses."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.idle = None
+
+    def take(self):
+        instance = self.idle
+        if instance is None:
+            return self.factory()
+        self.idle = None
+        return instance
+
+    def give(self, instance):
+        instance.reset()
+        self.idle = instance
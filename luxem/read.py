@@ -1,12 +1,33 @@
+import mmap
+import os
+import re
+
 import _luxem
+from luxem.pool import Pool
 from luxem.struct import Typed
 
 
+_integer = re.compile(r'[+-]?[0-9]+\Z')
+_float = re.compile(r'[0-9.eE+-]+\Z')
+
+
+def _number(data):
+    if _integer.match(data):
+        return int(data)
+    if _float.match(data):
+        try:
+            return float(data)
+        except ValueError:
+            pass
+    return data
+
+
 class Reader(_luxem.Reader):
-    def __init__(self):
-        self._stack = [(None, None, [])]
-        self._current_key = 0
-        self._current_type = None
+    def __init__(self, decoders=None, numbers=False, schema=None, **kwargs):
+        self._clear()
+        self._decoders = decoders or {}
+        self._numbers = numbers
+        self._schema = schema
 
         super(Reader, self).__init__(
             object_begin=self._object_begin,
@@ -16,8 +37,18 @@ class Reader(_luxem.Reader):
             key=self._key,
             type=self._type,
             primitive=self._primitive,
+            **kwargs
         )
 
+    def _clear(self):
+        self._stack = [(None, None, [])]
+        self._current_key = 0
+        self._current_type = None
+
+    def reset(self):
+        super(Reader, self).reset()
+        self._clear()
+
     def _push(self, new_key, value):
         key = self._current_key
         self._current_key = new_key
@@ -27,16 +58,20 @@ class Reader(_luxem.Reader):
 
     def _finish(self, value):
         top = self._stack[-1][2]
-        if isinstance(top, list):
-            if self._current_type is not None:
+        if self._current_type is not None:
+            decoder = self._decoders.get(self._current_type)
+            if (self._schema is not None and isinstance(value, dict) and
+                    self._current_type in self._schema):
+                value = self._schema.build(self._current_type, value)
+            elif decoder is not None:
+                value = decoder(value)
+            else:
                 value = Typed(self._current_type, value)
-                self._current_type = None
+            self._current_type = None
+        if isinstance(top, list):
             top.append(value)
             self._current_key += 1
         else:
-            if self._current_type is not None:
-                value = Typed(self._current_type, value)
-                self._current_type = None
             top[self._current_key] = value
             self._current_key = None
 
@@ -57,10 +92,92 @@ class Reader(_luxem.Reader):
         self._current_type = data
 
     def _primitive(self, data):
+        if self._numbers and self._current_type is None:
+            data = _number(data)
         self._finish(data)
 
 
-def load(source):
-    r = Reader()
+def _compiled(schema):
+    if schema is None:
+        return None
+    return schema.compiled
+
+
+_builders = Pool(lambda: _luxem.Builder(typed=Typed))
+
+
+def load(source, native=True, profile=None, schema=None, release_gil=False, **kwargs):
+    if native and not kwargs and profile is None and schema is None and not release_gil:
+        r = _builders.take()
+        try:
+            r.feed(source)
+            return r.root
+        finally:
+            _builders.give(r)
+    if release_gil:
+        if schema is not None:
+            raise TypeError('luxem schema is not supported with release_gil.')
+        r = _luxem.Tape(**kwargs)
+    elif native:
+        r = _luxem.Builder(typed=Typed, schema=_compiled(schema), **kwargs)
+    else:
+        r = Reader(schema=schema, **kwargs)
+    if profile is not None:
+        r.enable_stats(timing=True, hook=profile)
+    if release_gil:
+        try:
+            r.feed(source)
+            return [r.decode(index) for index in r.roots()]
+        finally:
+            # The tape holds on to read-only sources such as mapped files
+            r.reset()
     r.feed(source)
+    if native:
+        return r.root
     return r._stack[0][2]
+
+
+def load_path(path, native=True, **kwargs):
+    with open(path, 'rb') as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return load(b'', native=native, **kwargs)
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return load(mapped, native=native, **kwargs)
+        finally:
+            mapped.close()
+
+
+def _feed(reader, source, chunk_size):
+    try:
+        view = memoryview(source)
+    except TypeError:
+        chunks = iter(lambda: source.read(chunk_size), b'')
+    else:
+        chunks = (
+            view[start:start + chunk_size]
+            for start in range(0, len(view), chunk_size)
+        )
+    for chunk in chunks:
+        reader.push(chunk)
+        yield
+    reader.push(b'', finish=True)
+    yield
+
+
+def iterload(source, chunk_size=65536, schema=None, **kwargs):
+    r = _luxem.Builder(typed=Typed, schema=_compiled(schema), **kwargs)
+    root = r.root
+    for _ in _feed(r, source, chunk_size):
+        values = root[:]
+        del root[:]
+        for value in values:
+            yield value
+
+
+def events(source, chunk_size=65536, **kwargs):
+    r = _luxem.EventReader(**kwargs)
+    for _ in _feed(r, source, chunk_size):
+        batch = r.events()
+        if batch:
+            yield batch
@@ -0,0 +1,214 @@
+import array
+import bisect
+import mmap
+import os
+
+import _luxem
+from luxem.read import load
+from luxem.write import Writer
+
+# The index format is 64 bit offsets, so use whichever typecode has that size
+_typecode = None
+for _code in ('Q', 'L'):
+    try:
+        if array.array(_code).itemsize == 8:
+            _typecode = _code
+            break
+    except ValueError:
+        pass
+
+try:
+    _frombytes = array.array.frombytes
+except AttributeError:
+    _frombytes = array.array.fromstring
+
+_whitespace = b' \t\r\n'
+
+
+class RecordFile(object):
+    """Root elements appended to a luxem file, with a sidecar index of record
+    offsets for random access.
+
+    The index holds one offset per record boundary: record n is the data from
+    offset n to offset n + 1.  It is stored as native unsigned 64 bit integers
+    and brought up to date from the data whenever it is missing or behind.
+    Offsets another instance has added to the index are picked up before the
+    data is scanned, but only one instance may append at a time."""
+
+    def __init__(self, path, index_path=None, encoders=None, default=None, **kwargs):
+        if _typecode is None:
+            raise NotImplementedError(
+                'luxem.RecordFile needs 64 bit unsigned arrays, which this Python lacks.')
+        self.path = path
+        self.index_path = index_path or path + '.index'
+        self._load_kwargs = kwargs
+        self._writer = Writer(encoders=encoders, default=default)
+        self._data = open(path, 'ab')
+        self._map = None
+        self._offsets = array.array(_typecode)
+        self._index = None
+        try:
+            self._open_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _size(self):
+        return os.fstat(self._data.fileno()).st_size
+
+    def _view(self, end):
+        """Returns an mmap covering at least the first end bytes of the data."""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as source:
+                self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _open_index(self):
+        size = self._size()
+        offsets = array.array(_typecode)
+        data = b''
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as source:
+                data = source.read()
+        whole = len(data) - len(data) % offsets.itemsize
+        _frombytes(offsets, data[:whole])
+        if not offsets or offsets[0] != 0 or offsets[-1] > size:
+            # Missing, or for different data
+            offsets = array.array(_typecode, [0])
+            whole = -1
+        self._offsets = offsets
+        if whole == len(data):
+            self._index = open(self.index_path, 'ab')
+        else:
+            self._write_index()
+        self._scan(size)
+
+    def _write_index(self):
+        if self._index is not None:
+            self._index.close()
+        with open(self.index_path, 'wb') as dest:
+            self._offsets.tofile(dest)
+        self._index = open(self.index_path, 'ab')
+
+    def _catch_up(self, size):
+        """Adds offsets written to the index since it was read, for example by
+        another instance appending to the same file."""
+        with open(self.index_path, 'rb') as source:
+            source.seek(len(self._offsets) * self._offsets.itemsize)
+            data = source.read()
+        added = array.array(_typecode)
+        _frombytes(added, data[:len(data) - len(data) % added.itemsize])
+        last = self._offsets[-1]
+        for offset in added:
+            if offset <= last or offset > size:
+                break
+            self._offsets.append(offset)
+            last = offset
+
+    def _scan(self, size):
+        """Indexes records in the data after the last indexed boundary."""
+        self._catch_up(size)
+        start = self._offsets[-1]
+        if start >= size:
+            return
+        view = self._view(size)
+        added = array.array(_typecode)
+        while True:
+            ends = _luxem.root_ends(view, start)
+            added.extend(ends)
+            if len(ends) < 65536:
+                break
+            start = ends[-1]
+        self._offsets.extend(added)
+        added.tofile(self._index)
+        self._index.flush()
+
+    def rebuild_index(self):
+        """Discards the index and rebuilds it from the data."""
+        self._offsets = array.array(_typecode, [0])
+        self._write_index()
+        self._scan(self._size())
+
+    def _end(self):
+        """Returns the size of the data, indexing any records added since the
+        last scan, and checks that nothing but whitespace follows the last
+        indexed record."""
+        size = self._size()
+        if size > self._offsets[-1]:
+            self._scan(size)
+            if self._view(size)[self._offsets[-1]:size].strip(_whitespace):
+                raise ValueError(
+                    'luxem record file {} ends with an unterminated root element.'.format(self.path))
+        return size
+
+    def append(self, value):
+        """Appends a record and returns its index."""
+        start = self._end()
+        try:
+            self._writer.element(value)
+        except Exception:
+            self._writer.reset()
+            raise
+        data = self._writer.drain() + b'\n'
+        self._data.write(data)
+        self._data.flush()
+        self._offsets.append(start + len(data))
+        self._offsets[-1:].tofile(self._index)
+        self._index.flush()
+        return len(self._offsets) - 2
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(start, stop, step)]
+            return self.read(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('luxem record index out of range')
+        return self.read(index, index + 1)[0]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def read(self, start=0, stop=None):
+        """Returns the records from start up to stop, parsed in one pass."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return []
+        begin, end = self._offsets[start], self._offsets[stop]
+        return load(self._view(end)[begin:end], **self._load_kwargs)
+
+    def find(self, offset):
+        """Returns the index of the first record starting at or after a byte offset."""
+        return bisect.bisect_left(self._offsets, offset, 0, len(self))
+
+    def offset(self, index):
+        """Returns the byte offset of a record in the data."""
+        return self._offsets[index]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,66 @@
+try:
+    import dataclasses
+except ImportError:
+    dataclasses = None
+
+
+def _slots(cls):
+    out = []
+    for base in reversed(cls.__mro__):
+        slots = base.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot not in ('__dict__', '__weakref__') and slot not in out:
+                out.append(slot)
+    return out
+
+
+def _compile(name, cls):
+    if issubclass(cls, tuple) and hasattr(cls, '_fields'):
+        fields = tuple(cls._fields)
+        defaults = dict(getattr(cls, '_field_defaults', {}))
+        return name, cls, fields, defaults, None
+    if '__slots__' not in cls.__dict__:
+        raise TypeError(
+            'luxem schema record {} must be a namedtuple or define __slots__.'.format(cls.__name__))
+    fields = tuple(_slots(cls))
+    defaults = {}
+    if dataclasses is not None and dataclasses.is_dataclass(cls):
+        for field in dataclasses.fields(cls):
+            if field.default is not dataclasses.MISSING:
+                defaults[field.name] = field.default
+    descriptors = tuple(getattr(cls, field) for field in fields)
+    return name, cls, fields, defaults, descriptors
+
+
+class Schema(object):
+    def __init__(self, records):
+        self.records = dict(records)
+        self.compiled = tuple(
+            _compile(name, cls) for name, cls in sorted(self.records.items())
+        )
+        self._compiled = dict((entry[0], entry) for entry in self.compiled)
+
+    def __contains__(self, name):
+        return name in self._compiled
+
+    def build(self, name, mapping):
+        name, cls, fields, defaults, descriptors = self._compiled[name]
+        unknown = set(mapping) - set(fields)
+        if unknown:
+            raise ValueError('luxem record {} has no field {}.'.format(name, sorted(unknown)[0]))
+        values = []
+        for field in fields:
+            if field in mapping:
+                values.append(mapping[field])
+            elif field in defaults:
+                values.append(defaults[field])
+            else:
+                raise ValueError('luxem record {} is missing field {}.'.format(name, field))
+        if descriptors is None:
+            return tuple.__new__(cls, values)
+        out = cls.__new__(cls)
+        for descriptor, value in zip(descriptors, values):
+            descriptor.__set__(out, value)
+        return out
@@ -0,0 +1,83 @@
+import unittest
+
+try:
+    import asyncio
+    from luxem import aio
+except (ImportError, SyntaxError):
+    aio = None
+
+import luxem
+from luxem import Typed
+
+
+class _StreamWriter(object):
+    def __init__(self):
+        self.written = []
+        self.drained = 0
+        self.undrained = 0
+
+    def write(self, data):
+        self.written.append(data)
+        self.undrained += len(data)
+
+    def drain(self):
+        self.drained = len(self.written)
+        self.undrained = 0
+        return asyncio.sleep(0)
+
+
+@unittest.skipIf(aio is None, 'asyncio is not available')
+class TestAio(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def stream(self, *chunks):
+        stream = asyncio.StreamReader(loop=self.loop)
+        for chunk in chunks:
+            stream.feed_data(chunk)
+        stream.feed_eof()
+        return stream
+
+    def test_load(self):
+        self.assertEqual(
+            self.loop.run_until_complete(aio.load(
+                self.stream(b'{k: [a', b', (t) b]}, c'),
+                chunk_size=4)),
+            [{'k': ['a', Typed('t', 'b')]}, 'c'])
+
+    def test_load_empty(self):
+        self.assertEqual(
+            self.loop.run_until_complete(aio.load(self.stream())),
+            [])
+
+    def test_aiterload(self):
+        values = aio.aiterload(self.stream(b'a, [b], c'), chunk_size=2)
+        self.assertEqual(
+            self.loop.run_until_complete(values.__anext__()), 'a')
+        self.assertEqual(
+            self.loop.run_until_complete(values.__anext__()), ['b'])
+        self.assertEqual(
+            self.loop.run_until_complete(values.__anext__()), 'c')
+
+    def test_dump(self):
+        writer = _StreamWriter()
+        self.loop.run_until_complete(aio.dump(writer, {'k': ['a', 'b']}))
+        self.assertEqual(b''.join(writer.written), b'{k:[a,b,],},')
+        self.assertEqual(writer.drained, len(writer.written))
+
+    def test_dump_backpressure(self):
+        class Limited(_StreamWriter):
+            def write(self, data):
+                if self.undrained > 64:
+                    raise AssertionError('wrote without draining')
+                _StreamWriter.write(self, data)
+
+        writer = Limited()
+        value = {'k': [['item', str(index)] for index in range(200)]}
+        self.loop.run_until_complete(aio.dump(writer, value, buffer_size=32))
+        self.assertGreater(len(writer.written), 10)
+        self.assertEqual(b''.join(writer.written), luxem.dumps(value))
+        self.assertEqual(writer.drained, len(writer.written))
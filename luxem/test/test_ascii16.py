@@ -0,0 +1,73 @@
+import unittest
+
+from luxem import to_ascii16, from_ascii16, loads, Writer
+
+
+data = bytes(bytearray(range(256))) * 1000
+
+
+class TestAscii16(unittest.TestCase):
+    def test_round_trip(self):
+        encoded = to_ascii16(data)
+        self.assertEqual(len(encoded), len(data) * 2)
+        self.assertEqual(from_ascii16(encoded), data)
+
+    def test_empty(self):
+        self.assertEqual(to_ascii16(b''), '')
+        self.assertEqual(from_ascii16(''), b'')
+
+    def test_buffers(self):
+        encoded = to_ascii16(data)
+        self.assertEqual(to_ascii16(bytearray(data)), encoded)
+        self.assertEqual(to_ascii16(memoryview(data)), encoded)
+        self.assertEqual(
+            from_ascii16(memoryview(encoded.encode('ascii'))), data)
+
+    def test_into_bytearray(self):
+        out = bytearray(b'old')
+        self.assertEqual(from_ascii16(to_ascii16(data), out=out), len(data))
+        self.assertEqual(out, data)
+
+    def test_into_buffer(self):
+        out = bytearray(len(data) + 2)
+        view = memoryview(out)
+        self.assertEqual(from_ascii16(to_ascii16(data), out=view), len(data))
+        self.assertEqual(out[:len(data)], data)
+
+    def test_into_small_buffer(self):
+        out = memoryview(bytearray(2))
+        with self.assertRaises(ValueError):
+            from_ascii16(to_ascii16(b'abc'), out=out)
+
+    def test_known(self):
+        self.assertEqual(to_ascii16(b'\x00\x1f\xa0'), 'aabpka')
+        self.assertEqual(from_ascii16('aabpka'), b'\x00\x1f\xa0')
+
+    def test_bad_data(self):
+        self.assertRaises(ValueError, from_ascii16, 'abc')
+        self.assertRaises(ValueError, from_ascii16, 'aq')
+
+    def test_bad_argument(self):
+        with self.assertRaises(TypeError):
+            to_ascii16(7)
+
+
+class TestWriterBinary(unittest.TestCase):
+    def test_binary(self):
+        w = Writer()
+        w.binary(b'hi')
+        self.assertEqual(
+            w.dump(),
+            b'(ascii16)' + to_ascii16(b'hi').encode('ascii') + b',')
+
+    def test_untyped(self):
+        w = Writer()
+        w.array_begin().binary(bytearray(b'hi'), type=None).array_end()
+        self.assertEqual(
+            w.dump(), b'[' + to_ascii16(b'hi').encode('ascii') + b',],')
+
+    def test_round_trip(self):
+        w = Writer()
+        w.binary(data, type='blob')
+        self.assertEqual(
+            loads(w.dump(), decoders={'blob': from_ascii16}), [data])
@@ -0,0 +1,91 @@
+import unittest
+
+import _luxem
+from luxem import load_lazy, Typed
+from luxem.lazy import LazyArray, LazyObject
+
+
+document = b'''
+{
+    name: first,
+    servers: [
+        {name: a, port: (int) 1},
+        {name: b, port: (int) 2, tags: [x, y]},
+    ],
+    empty: {},
+    typed: (config) {debug: "yes please"},
+},
+second,
+(t) [],
+'''
+
+
+class TestLazy(unittest.TestCase):
+    def setUp(self):
+        self.roots = load_lazy(document)
+
+    def test_roots(self):
+        self.assertIsInstance(self.roots, LazyArray)
+        self.assertEqual(len(self.roots), 3)
+        self.assertEqual(self.roots[1], 'second')
+        self.assertEqual(self.roots[2].name, 't')
+        self.assertEqual(len(self.roots[2].value), 0)
+
+    def test_object(self):
+        root = self.roots[0]
+        self.assertIsInstance(root, LazyObject)
+        self.assertEqual(
+            sorted(root), ['empty', 'name', 'servers', 'typed'])
+        self.assertEqual(root['name'], 'first')
+        self.assertEqual(len(root['empty']), 0)
+        self.assertRaises(KeyError, lambda: root['missing'])
+
+    def test_nested(self):
+        servers = self.roots[0]['servers']
+        self.assertEqual(len(servers), 2)
+        self.assertEqual(servers[1]['name'], 'b')
+        self.assertEqual(servers[1]['port'], Typed('int', '2'))
+        self.assertEqual(list(servers[1]['tags']), ['x', 'y'])
+        self.assertEqual(servers[-1]['tags'][:1], ['x'])
+
+    def test_typed_object(self):
+        typed = self.roots[0]['typed']
+        self.assertEqual(typed.name, 'config')
+        self.assertEqual(typed.value['debug'], 'yes please')
+
+    def test_materialize(self):
+        self.assertEqual(
+            self.roots[0]['servers'].materialize(),
+            [
+                {'name': 'a', 'port': Typed('int', '1')},
+                {'name': 'b', 'port': Typed('int', '2'), 'tags': ['x', 'y']},
+            ])
+        self.assertEqual(
+            self.roots.materialize()[1:],
+            ['second', Typed('t', [])])
+
+    def test_empty(self):
+        self.assertEqual(len(load_lazy(b'')), 0)
+
+    def test_writable_source(self):
+        source = bytearray(b'[abc, "d\\"e"]')
+        roots = load_lazy(source)
+        source[1:4] = b'xyz'
+        self.assertEqual(roots.materialize(), [['abc', 'd"e']])
+
+
+class TestTapeSource(unittest.TestCase):
+    def test_kept_until_reset(self):
+        source = memoryview(b'{k: v}, w')
+        tape = _luxem.Tape()
+        tape.feed(source)
+        self.assertRaises(BufferError, source.release)
+        self.assertEqual([tape.decode(index) for index in tape.roots()], [{'k': 'v'}, 'w'])
+        tape.reset()
+        source.release()
+
+    def test_pushed(self):
+        tape = _luxem.Tape()
+        tape.push(b'[ab')
+        tape.push(b'c, d]', finish=True)
+        self.assertEqual(tape.decode(0), ['abc', 'd'])
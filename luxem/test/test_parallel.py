@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import _luxem
+from luxem import load_path, parallel_load, Typed
+
+
+class TestSplitRoots(unittest.TestCase):
+    def ranges(self, data, parts):
+        offsets = _luxem.split_roots(data, parts)
+        return [data[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def test_one_part(self):
+        self.assertEqual(self.ranges(b'a, b, c', 1), [b'a, b, c'])
+
+    def test_split(self):
+        self.assertEqual(self.ranges(b'a, b, c', 3), [b'a,', b' b,', b' c'])
+
+    def test_empty(self):
+        self.assertEqual(self.ranges(b'', 4), [b''])
+
+    def test_nested(self):
+        self.assertEqual(
+            self.ranges(b'[a, b, c], {d: e, f: g}', 8),
+            [b'[a, b, c],', b' {d: e, f: g}'],
+        )
+
+    def test_quoted(self):
+        data = b'"a, b", *c, d*, (e, f) g\\, h, i'
+        self.assertEqual(
+            self.ranges(data, 32),
+            [b'"a, b",', b' *c, d*,', b' (e, f) g\\, h,', b' i'],
+        )
+
+    def test_bad_parts(self):
+        with self.assertRaises(ValueError):
+            _luxem.split_roots(b'a', 0)
+
+
+class TestParallelLoad(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'data.luxem')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data):
+        with open(self.path, 'wb') as dest:
+            dest.write(data)
+
+    def test_many_roots(self):
+        self.write(b''.join(
+            b'{index: (int) ' + str(index).encode() + b', tags: [a, b]},\n'
+            for index in range(1000)
+        ))
+        out = parallel_load(self.path, workers=2)
+        self.assertEqual(out, load_path(self.path))
+        self.assertEqual(len(out), 1000)
+        self.assertEqual(out[999]['index'], Typed('int', '999'))
+
+    def test_single_worker(self):
+        self.write(b'a, b, c')
+        self.assertEqual(parallel_load(self.path, workers=1), ['a', 'b', 'c'])
+
+    def test_empty(self):
+        self.write(b'')
+        self.assertEqual(parallel_load(self.path, workers=2), [])
@@ -158,6 +158,42 @@ class TestRawRead(unittest.TestCase):
         self.assertEqual(read_length, 3)
         self.compare([('primitive', 'a')])
 
+    def test_bytearray(self):
+        read_length = self.reader.feed(bytearray(long_input))
+        self.assertEqual(read_length, len(long_input))
+        self.compare(long_input_sequence)
+
+    def test_memoryview(self):
+        self.reader.feed(memoryview(b'[7, 8]')[1:3])
+        self.compare([('primitive', '7')])
+
+    def test_push(self):
+        self.reader.push(b'[yod')
+        self.reader.push(b'el, "min')
+        self.reader.push(b'ister"')
+        self.reader.push(b']', finish=True)
+        self.compare([
+            ('array begin', None),
+            ('primitive', 'yodel'),
+            ('primitive', 'minister'),
+            ('array end', None)])
+
+    def test_push_long_token(self):
+        self.reader.push(b'[yod')
+        self.reader.push(b'e' * 1000)
+        self.reader.push(b'l, ' + b'a, ' * 1000 + b'"min')
+        self.reader.push(b'ister"]', finish=True)
+        self.compare(
+            [('array begin', None), ('primitive', 'yod' + 'e' * 1000 + 'l')] +
+            [('primitive', 'a')] * 1000 +
+            [('primitive', 'minister'), ('array end', None)])
+
+    def test_push_nofinish(self):
+        self.reader.push(b'7')
+        self.compare([])
+        self.reader.push(b'', finish=True)
+        self.compare([('primitive', '7')])
+
     def test_type_only(self):
         self.reader.feed(b'(x),')
         self.compare([('type', 'x'), ('primitive', '')])
@@ -266,3 +302,55 @@ class TestRawRead2(unittest.TestCase):
             primitive=None
         )
         self.assertRaises(TestError, reader.feed, b'{}')
+
+
+event_codes = {
+    'object begin': luxem.OBJECT_BEGIN,
+    'object end': luxem.OBJECT_END,
+    'array begin': luxem.ARRAY_BEGIN,
+    'array end': luxem.ARRAY_END,
+    'key': luxem.KEY,
+    'type': luxem.TYPE,
+    'primitive': luxem.PRIMITIVE,
+}
+
+
+class TestRawReadEvents(unittest.TestCase):
+    def compare(self, got, expected_sequence):
+        self.assertEqual(
+            got,
+            [(event_codes[name], data) for name, data in expected_sequence])
+
+    def test_basic(self):
+        reader = luxem.EventReader()
+        self.assertEqual(reader.feed(long_input), len(long_input))
+        self.compare(reader.events(), long_input_sequence)
+        self.assertEqual(reader.events(), [])
+
+    def test_batches(self):
+        reader = luxem.EventReader()
+        eaten = reader.feed(b'[a, b', finish=False)
+        self.compare(reader.events(), [
+            ('array begin', None),
+            ('primitive', 'a')])
+        reader.feed(b'[a, b'[eaten:] + b']')
+        self.compare(reader.events(), [
+            ('primitive', 'b'),
+            ('array end', None)])
+
+    def test_events_bytes(self):
+        self.compare(
+            [event for batch in luxem.events(long_input) for event in batch],
+            long_input_sequence)
+
+    def test_events_file(self):
+        with open('test_temp_file', 'wb+') as data:
+            data.write(long_input)
+            data.seek(0)
+            self.compare(
+                [
+                    event
+                    for batch in luxem.events(data, chunk_size=7)
+                    for event in batch
+                ],
+                long_input_sequence)
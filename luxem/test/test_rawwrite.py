@@ -135,6 +135,52 @@ class TestRawWrite(unittest.TestCase):
         self.compare(long_text)
 
 
+class TestRawWriteCoalesced(unittest.TestCase):
+    def setUp(self):
+        self.sequence = []
+        self.writer = luxem.Writer(
+            target=lambda text: self.sequence.append(text),
+            buffer_size=1024,
+        )
+
+    def test_root_primitive(self):
+        self.writer.type('type')
+        self.assertEqual(self.sequence, [])
+        self.writer.primitive('primitive')
+        self.assertEqual(self.sequence, [b'(type)primitive,'])
+
+    def test_root_end(self):
+        self.writer.array_begin().primitive('a').object_begin()
+        self.assertEqual(self.sequence, [])
+        self.writer.object_end()
+        self.assertEqual(self.sequence, [])
+        self.writer.array_end()
+        self.assertEqual(self.sequence, [b'[a,{},],'])
+
+    def test_flush(self):
+        self.writer.array_begin().primitive('a').flush()
+        self.assertEqual(self.sequence, [b'[a,'])
+        self.writer.array_end()
+        self.assertEqual(self.sequence, [b'[a,', b'],'])
+
+    def test_small_buffer(self):
+        self.writer = luxem.Writer(
+            target=lambda text: self.sequence.append(text),
+            pretty=True,
+            use_spaces=True,
+            indent_multiple=4,
+            buffer_size=8,
+        )
+        write_long_sequence(self.writer)
+        self.assertEqual(b''.join(self.sequence), long_text)
+        self.assertTrue(all(len(chunk) >= 8 for chunk in self.sequence[:-1]))
+
+    def test_destroy(self):
+        self.writer.array_begin().primitive('a')
+        self.writer = None
+        self.assertEqual(self.sequence, [b'[a,'])
+
+
 class TestRawWriteBuffer(unittest.TestCase):
     def setUp(self):
         self.writer = luxem.Writer(
@@ -155,6 +201,46 @@ class TestRawWriteBuffer(unittest.TestCase):
         write_long_sequence(self.writer)
         self.compare(long_text)
 
+    def test_empty(self):
+        self.compare(b'')
+
+    def test_dump_into_bytearray(self):
+        write_long_sequence(self.writer)
+        out = bytearray(b'old data')
+        self.assertEqual(self.writer.dump_into(out), len(long_text))
+        self.assertEqual(bytes(out), long_text)
+
+    def test_dump_into_memoryview(self):
+        self.writer.primitive('primitive')
+        out = bytearray(32)
+        self.assertEqual(self.writer.dump_into(memoryview(out)), 11)
+        self.assertEqual(bytes(out[:11]), b'primitive,\n')
+        self.assertRaises(ValueError, self.writer.dump_into, memoryview(bytearray(4)))
+
+    def test_drain(self):
+        self.writer.array_begin().primitive('a')
+        self.assertEqual(self.writer.drain(), b'[\n    a,\n')
+        self.assertEqual(self.writer.drain(), b'')
+        self.writer.array_end()
+        self.assertEqual(self.writer.drain(), b'],\n')
+        self.compare(b'')
+
+    def test_drain_large(self):
+        self.writer.primitive('a' * 100000)
+        self.assertEqual(len(self.writer.drain()), 100002)
+        self.writer.primitive('b')
+        self.assertEqual(self.writer.drain(), b'b,\n')
+
+    def test_none_target(self):
+        writer = luxem.Writer(None)
+        writer.primitive('a')
+        self.assertEqual(writer.dump(), b'a,')
+
+    def test_target(self):
+        writer = luxem.Writer(target=lambda text: None)
+        self.assertRaises(TypeError, writer.drain)
+        self.assertRaises(TypeError, writer.dump_into, bytearray())
+
 
 class TestRawWriteFile(unittest.TestCase):
     def setUp(self):
@@ -1,45 +1,254 @@
+import threading
 import unittest
 
-from luxem import loads
+from luxem import loads, load_path, iterload, to_ascii16, from_ascii16
 from luxem import Typed
 
 
 class TestRead(unittest.TestCase):
+    native = True
+
+    def loads(self, data):
+        return loads(data, native=self.native)
+
     def test_empty(self):
-        self.assertEqual(loads(b''), [])
+        self.assertEqual(self.loads(b''), [])
 
     def test_primitive(self):
-        self.assertEqual(loads(b'a'), ['a'])
+        self.assertEqual(self.loads(b'a'), ['a'])
 
     def test_primitive1(self):
-        self.assertEqual(loads(b'a,'), ['a'])
+        self.assertEqual(self.loads(b'a,'), ['a'])
 
     def test_root_array(self):
-        self.assertEqual(loads(b'a, a'), ['a', 'a'])
+        self.assertEqual(self.loads(b'a, a'), ['a', 'a'])
 
     def test_typed(self):
-        self.assertEqual(loads(b'(b)a'), [Typed('b', 'a')])
+        self.assertEqual(self.loads(b'(b)a'), [Typed('b', 'a')])
 
     def test_array(self):
-        self.assertEqual(loads(b'[]'), [[]])
+        self.assertEqual(self.loads(b'[]'), [[]])
 
     def test_array1(self):
-        self.assertEqual(loads(b'[],'), [[]])
+        self.assertEqual(self.loads(b'[],'), [[]])
 
     def test_typed_array(self):
-        self.assertEqual(loads(b'(b)[]'), [Typed('b', [])])
+        self.assertEqual(self.loads(b'(b)[]'), [Typed('b', [])])
 
     def test_array_element(self):
-        self.assertEqual(loads(b'[a]'), [['a']])
+        self.assertEqual(self.loads(b'[a]'), [['a']])
 
     def test_object(self):
-        self.assertEqual(loads(b'{}'), [{}])
+        self.assertEqual(self.loads(b'{}'), [{}])
 
     def test_object1(self):
-        self.assertEqual(loads(b'{},'), [{}])
+        self.assertEqual(self.loads(b'{},'), [{}])
 
     def test_typed_object(self):
-        self.assertEqual(loads(b'(b){}'), [Typed('b', {})])
+        self.assertEqual(self.loads(b'(b){}'), [Typed('b', {})])
 
     def test_object_element(self):
-        self.assertEqual(loads(b'{k: a}'), [{'k': 'a'}])
+        self.assertEqual(self.loads(b'{k: a}'), [{'k': 'a'}])
+
+    def test_nested(self):
+        self.assertEqual(
+            self.loads(b'{k: [a, (t) {j: b}], l: (u) [], m: c}'),
+            [{
+                'k': ['a', Typed('t', {'j': 'b'})],
+                'l': Typed('u', []),
+                'm': 'c',
+            }])
+
+    def test_buffer(self):
+        self.assertEqual(
+            self.loads(memoryview(bytearray(b'[a, {k: b}]'))),
+            [['a', {'k': 'b'}]])
+
+    def test_path(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(b'{k: a}, (t) b')
+        self.assertEqual(
+            load_path('test_temp_file', native=self.native),
+            [{'k': 'a'}, Typed('t', 'b')])
+
+    def test_path_empty(self):
+        open('test_temp_file', 'wb').close()
+        self.assertEqual(load_path('test_temp_file', native=self.native), [])
+
+    def test_intern_keys(self):
+        first, second = self.loads(b'{key: (t) a}, {key: (t) b}')
+        self.assertIs(list(first)[0], list(second)[0])
+        self.assertIs(first['key'].name, second['key'].name)
+
+    def test_intern_primitives(self):
+        first, second = loads(
+            b'primitive, primitive',
+            native=self.native,
+            intern_primitives=16)
+        self.assertIs(first, second)
+
+    def test_intern_disabled(self):
+        first, second = loads(
+            b'{long_key_name: a}, {long_key_name: b}',
+            native=self.native,
+            intern_size=0)
+        self.assertIsNot(list(first)[0], list(second)[0])
+
+    def test_decoders(self):
+        self.assertEqual(
+            loads(
+                b'(int) 7, (int) -12345678901234567890, (float) 1.5e3, '
+                b'(int) " 8 ", (point) {x: a}, (other) b',
+                native=self.native,
+                decoders={'int': int, 'float': float, 'point': dict.items}),
+            [
+                7, -12345678901234567890, 1500.0, 8,
+                {'x': 'a'}.items(), Typed('other', 'b'),
+            ])
+
+    def test_decoders_ascii16(self):
+        self.assertEqual(
+            loads(
+                b'(ascii16) ' + to_ascii16('hello').encode(),
+                native=self.native,
+                decoders={'ascii16': from_ascii16}),
+            [from_ascii16(to_ascii16('hello'))])
+
+    def test_decoders_error(self):
+        with self.assertRaises(ValueError):
+            loads(b'(int) seven', native=self.native, decoders={'int': int})
+
+    def test_numbers(self):
+        self.assertEqual(
+            loads(
+                b'7, -3, 2.5, 1e3, e, 1.2.3, seven, (t) 8',
+                native=self.native,
+                numbers=True),
+            [7, -3, 2.5, 1000.0, 'e', '1.2.3', 'seven', Typed('t', '8')])
+
+
+class TestReadPython(TestRead):
+    native = False
+
+
+class TestReleaseGil(unittest.TestCase):
+    document = b'{k: [a, (t) b]}, (u) {}, c'
+
+    def test_matches_builder(self):
+        self.assertEqual(
+            loads(self.document, release_gil=True),
+            loads(self.document))
+
+    def test_empty(self):
+        self.assertEqual(loads(b'', release_gil=True), [])
+
+    def test_error(self):
+        self.assertRaises(ValueError, loads, b'{k: [a}', release_gil=True)
+
+    def test_schema(self):
+        self.assertRaises(TypeError, loads, b'a', release_gil=True, schema=object())
+
+    def test_escaped(self):
+        self.assertEqual(
+            loads(b'{"a\\"b": "c\\\\d", e: f}', release_gil=True),
+            [{'a"b': 'c\\d', 'e': 'f'}])
+
+    def test_path(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(self.document)
+        self.assertEqual(
+            load_path('test_temp_file', release_gil=True),
+            loads(self.document))
+
+    def test_path_error(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(b'{k: [a}')
+        self.assertRaises(ValueError, load_path, 'test_temp_file', release_gil=True)
+
+    def test_threads(self):
+        data = (self.document + b', ') * 1000
+        results = [None] * 4
+
+        def parse(index):
+            results[index] = loads(data, release_gil=True)
+
+        threads = [threading.Thread(target=parse, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = loads(data)
+        for result in results:
+            self.assertEqual(result, expected)
+
+
+class TestIterLoad(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(list(iterload(b'')), [])
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(iterload(b'a, (b) c, [d, {e: f}], "g h"', chunk_size=3)),
+            ['a', Typed('b', 'c'), ['d', {'e': 'f'}], 'g h'])
+
+    def test_lazy(self):
+        values = iterload(b'a, [b, c], d', chunk_size=4)
+        self.assertEqual(next(values), 'a')
+        self.assertEqual(next(values), ['b', 'c'])
+        self.assertEqual(list(values), ['d'])
+
+    def test_file(self):
+        with open('test_temp_file', 'wb+') as data:
+            for index in range(100):
+                data.write('{{index: {}}},'.format(index).encode('utf-8'))
+            data.seek(0)
+            self.assertEqual(
+                list(iterload(data, chunk_size=16)),
+                [{'index': str(index)} for index in range(100)])
+
+
+class TestSelect(unittest.TestCase):
+    document = b'''
+        {
+            name: config,
+            servers: [
+                {name: a, port: 1, tags: [x]},
+                (server) {name: b, port: 2},
+            ],
+            other: {name: c},
+        },
+        "root primitive",
+    '''
+
+    def test_wildcard(self):
+        self.assertEqual(
+            loads(self.document, select=['servers.*.name']),
+            [{'servers': [{'name': 'a'}, Typed('server', {'name': 'b'})]}])
+
+    def test_subtree(self):
+        self.assertEqual(
+            loads(self.document, select=['servers.0']),
+            [{'servers': [{'name': 'a', 'port': '1', 'tags': ['x']}]}])
+
+    def test_multiple(self):
+        self.assertEqual(
+            loads(self.document, select=['name', 'other.name']),
+            [{'name': 'config', 'other': {'name': 'c'}}])
+
+    def test_segments(self):
+        self.assertEqual(
+            loads(b'{"a.b": {c: d}, a: {b: e}}', select=[('a.b', 'c')]),
+            [{'a.b': {'c': 'd'}}])
+
+    def test_root(self):
+        self.assertEqual(
+            loads(self.document, select=[()]),
+            loads(self.document))
+
+    def test_none(self):
+        self.assertEqual(loads(self.document, select=[]), [])
+
+    def test_iterload(self):
+        self.assertEqual(
+            list(iterload(self.document, chunk_size=5, select=['name'])),
+            [{'name': 'config'}])
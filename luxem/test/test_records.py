@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import _luxem
+from luxem import RecordFile, Typed
+
+
+class TestRootEnds(unittest.TestCase):
+    def test_ends(self):
+        self.assertEqual(
+            _luxem.root_ends(b'"a, b", *c, d*, [e, f], (g, h) i\\, j, k'),
+            [7, 15, 23, 37])
+
+    def test_start_limit(self):
+        self.assertEqual(_luxem.root_ends(b'a, b, c, d', 2, 2), [5, 8])
+
+    def test_empty(self):
+        self.assertEqual(_luxem.root_ends(b''), [])
+
+
+class TestRecordFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'records.luxem')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_append(self):
+        with RecordFile(self.path) as records:
+            self.assertEqual(len(records), 0)
+            self.assertEqual(records.append({'a': '1'}), 0)
+            self.assertEqual(records.append(Typed('t', ['b'])), 1)
+            records.extend(['c', 'd'])
+            self.assertEqual(len(records), 4)
+            self.assertEqual(records[0], {'a': '1'})
+            self.assertEqual(records[1], Typed('t', ['b']))
+            self.assertEqual(records[-1], 'd')
+            self.assertEqual(records[1:3], [Typed('t', ['b']), 'c'])
+            self.assertEqual(records[::2], [{'a': '1'}, 'c'])
+            self.assertEqual(records.read(2), ['c', 'd'])
+            self.assertEqual(list(records), [{'a': '1'}, Typed('t', ['b']), 'c', 'd'])
+            self.assertRaises(IndexError, lambda: records[4])
+
+    def test_reopen(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', 'b'])
+        with RecordFile(self.path) as records:
+            self.assertEqual(records[:], ['a', 'b'])
+            records.append('c')
+            self.assertEqual(records[2], 'c')
+
+    def test_missing_index(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', ['b, c'], {'d': 'e'}])
+        os.remove(self.path + '.index')
+        with RecordFile(self.path) as records:
+            self.assertEqual(len(records), 3)
+            self.assertEqual(records[1], ['b, c'])
+
+    def test_index_behind(self):
+        with RecordFile(self.path) as records:
+            records.append('a')
+        with open(self.path, 'ab') as dest:
+            dest.write(b'(t) b,\n{c: d},\nunfinished')
+        with RecordFile(self.path) as records:
+            self.assertEqual(records[:], ['a', Typed('t', 'b'), {'c': 'd'}])
+
+    def test_append_after_unterminated(self):
+        with open(self.path, 'wb') as dest:
+            dest.write(b'a,\nb,\nunfinished')
+        with RecordFile(self.path) as records:
+            self.assertRaises(ValueError, records.append, 'c')
+            self.assertEqual(records[:], ['a', 'b'])
+
+    def test_append_after_external(self):
+        with RecordFile(self.path) as records:
+            records.append('a')
+            with open(self.path, 'ab') as dest:
+                dest.write(b'b,  \n')
+            self.assertEqual(records.append('c'), 2)
+            self.assertEqual(records[:], ['a', 'b', 'c'])
+
+    def test_append_after_rebuild(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', 'b'])
+        os.remove(self.path + '.index')
+        with RecordFile(self.path) as records:
+            records.append('c')
+            self.assertEqual(records[:], ['a', 'b', 'c'])
+
+    def test_two_instances(self):
+        with RecordFile(self.path) as first:
+            with RecordFile(self.path) as second:
+                first.extend(['a', 'b'])
+                self.assertEqual(second.append('c'), 2)
+                first.append('d')
+                self.assertEqual(second.append('e'), 4)
+                self.assertEqual(second[:], ['a', 'b', 'c', 'd', 'e'])
+        with RecordFile(self.path) as records:
+            self.assertEqual(records[:], ['a', 'b', 'c', 'd', 'e'])
+        with open(self.path + '.index', 'rb') as source:
+            self.assertEqual(len(source.read()), 6 * 8)
+
+    def test_partial_index(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', 'b'])
+        with open(self.path + '.index', 'ab') as dest:
+            dest.write(b'\x01')
+        with RecordFile(self.path) as records:
+            self.assertEqual(records[:], ['a', 'b'])
+
+    def test_rebuild(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', 'b'])
+            records.rebuild_index()
+            self.assertEqual(records[:], ['a', 'b'])
+
+    def test_find(self):
+        with RecordFile(self.path) as records:
+            records.extend(['a', 'b', 'c'])
+            self.assertEqual(records.find(0), 0)
+            self.assertEqual(records.find(1), 1)
+            self.assertEqual(records.find(records.offset(2)), 2)
+            self.assertEqual(records.find(1000), 3)
+
+    def test_failed_append(self):
+        class Bad(object):
+            pass
+
+        def fail(value):
+            raise RuntimeError('bad')
+
+        with RecordFile(self.path, encoders={Bad: fail}) as records:
+            self.assertRaises(RuntimeError, records.append, ['a', Bad()])
+            records.append('b')
+            self.assertEqual(records[:], ['b'])
+
+    def test_load_kwargs(self):
+        with RecordFile(self.path, decoders={'int': int}) as records:
+            records.append(Typed('int', '7'))
+            self.assertEqual(records[0], 7)
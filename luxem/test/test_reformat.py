@@ -0,0 +1,69 @@
+import os
+import unittest
+
+import luxem
+from luxem.test.test_rawwrite import long_text
+
+
+class TestReformat(unittest.TestCase):
+    def test_minify(self):
+        self.assertEqual(
+            luxem.reformat(b'{ a: [ b , (t) "c d" ] , a: e }, f'),
+            b'{a:[b,(t)"c d",],a:e,},f,')
+
+    def test_pretty(self):
+        self.assertEqual(
+            luxem.reformat(
+                luxem.reformat(long_text),
+                pretty=True,
+                use_spaces=True,
+                indent_multiple=4),
+            long_text)
+
+    def test_empty(self):
+        self.assertEqual(luxem.reformat(b''), b'')
+
+    def test_callable(self):
+        chunks = []
+        data = b'[' + b'value, ' * 20000 + b']'
+        self.assertIsNone(luxem.reformat(data, chunks.append))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), luxem.reformat(data))
+
+    def test_callable_error(self):
+        def fail(chunk):
+            raise RuntimeError('target failed')
+        self.assertRaises(RuntimeError, luxem.reformat, b'a', fail)
+        self.assertRaises(RuntimeError, luxem.reformat, b'value, ' * 20000, fail)
+
+    def test_files(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(b'{k: a}, (t) b')
+        with open('test_temp_file', 'rb') as source:
+            with open('test_temp_output', 'wb') as target:
+                luxem.reformat(source, target)
+        with open('test_temp_output', 'rb') as result:
+            self.assertEqual(result.read(), b'{k:a,},(t)b,')
+
+    @unittest.skipIf(not os.path.isdir('/proc/self/fd'), 'needs /proc/self/fd')
+    def test_files_closed(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(b'a')
+        before = len(os.listdir('/proc/self/fd'))
+        for _ in range(10):
+            with open('test_temp_file', 'rb') as source:
+                with open('test_temp_output', 'wb') as target:
+                    luxem.reformat(source, target)
+        self.assertEqual(len(os.listdir('/proc/self/fd')), before)
+
+    def test_file_parse_error(self):
+        with open('test_temp_file', 'wb') as data:
+            data.write(b'{a: [b}')
+        with open('test_temp_file', 'rb') as source:
+            self.assertRaises(ValueError, luxem.reformat, source)
+
+    def test_parse_error(self):
+        self.assertRaises(ValueError, luxem.reformat, b'{a: [b}')
+
+    def test_bad_target(self):
+        self.assertRaises(TypeError, luxem.reformat, b'a', 7)
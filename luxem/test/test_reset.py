@@ -0,0 +1,190 @@
+import threading
+import unittest
+
+import _luxem
+import luxem
+from luxem import loads, dumps, Typed
+from luxem.read import Reader
+
+
+def _ignore(*args):
+    pass
+
+
+class TestReaderReset(unittest.TestCase):
+    def test_raw(self):
+        sequence = []
+        reader = luxem.Reader(
+            object_begin=lambda: sequence.append('{'),
+            object_end=lambda: sequence.append('}'),
+            array_begin=lambda: sequence.append('['),
+            array_end=lambda: sequence.append(']'),
+            key=sequence.append,
+            type=sequence.append,
+            primitive=sequence.append,
+        )
+        reader.push(b'[unfini')
+        self.assertIsNone(reader.reset())
+        reader.push(b'{k: v}', finish=True)
+        self.assertEqual(sequence, ['[', '{', 'k', 'v', '}'])
+
+    def test_after_error(self):
+        reader = _luxem.Builder(typed=Typed)
+        self.assertRaises(ValueError, reader.feed, b'{k: [a}')
+        reader.reset()
+        reader.feed(b'[a]')
+        self.assertEqual(reader.root, [['a']])
+
+    def test_builder_root(self):
+        reader = _luxem.Builder(typed=Typed)
+        reader.feed(b'a, b')
+        first = reader.root
+        reader.reset()
+        reader.feed(b'c')
+        self.assertEqual(first, ['a', 'b'])
+        self.assertEqual(reader.root, ['c'])
+
+    def test_builder_select(self):
+        reader = _luxem.Builder(typed=Typed, select=['k'])
+        reader.push(b'{k: a, j: [b')
+        reader.reset()
+        reader.feed(b'{k: c, j: d}')
+        self.assertEqual(reader.root, [{'k': 'c'}])
+
+    def test_event_reader(self):
+        reader = luxem.EventReader()
+        reader.push(b'[a, ')
+        reader.reset()
+        reader.feed(b'b')
+        self.assertEqual(reader.events(), [(luxem.PRIMITIVE, 'b')])
+
+    def test_tape(self):
+        tape = _luxem.Tape()
+        tape.feed(b'{k: a}')
+        tape.reset()
+        tape.feed(b'b')
+        self.assertEqual([tape.decode(index) for index in tape.roots()], ['b'])
+
+    def test_from_callback(self):
+        errors = []
+
+        def reset(value):
+            try:
+                reader.reset()
+            except RuntimeError:
+                errors.append(value)
+        reader = luxem.Reader(
+            object_begin=_ignore,
+            object_end=_ignore,
+            array_begin=_ignore,
+            array_end=_ignore,
+            key=_ignore,
+            type=_ignore,
+            primitive=reset,
+        )
+        reader.feed(b'[a, b]')
+        reader.reset()
+        reader.push(b'[c, d')
+        reader.push(b']', finish=True)
+        self.assertEqual(errors, ['a', 'b', 'c', 'd'])
+
+    def test_builder_from_decoder(self):
+        def reset(value):
+            reader.reset()
+        reader = _luxem.Builder(typed=Typed, decoders={'t': reset})
+        self.assertRaises(RuntimeError, reader.feed, b'[(t) a]')
+        reader.reset()
+        reader.feed(b'b')
+        self.assertEqual(reader.root, ['b'])
+
+    def test_python(self):
+        reader = Reader()
+        reader.push(b'[a, {k: ')
+        reader.reset()
+        reader.feed(b'(t) b')
+        self.assertEqual(reader._stack, [(None, None, [Typed('t', 'b')])])
+
+
+class TestWriterReset(unittest.TestCase):
+    def test_buffer(self):
+        writer = luxem.Writer(pretty=True, use_spaces=True, indent_multiple=2)
+        writer.array_begin().primitive('a')
+        self.assertIsNone(writer.reset())
+        writer.array_begin().primitive('b').array_end()
+        self.assertEqual(writer.dump(), b'[\n  b,\n],\n')
+
+    def test_callback(self):
+        chunks = []
+        writer = luxem.Writer(target=chunks.append, buffer_size=1024)
+        writer.element(['a'])
+        writer.array_begin().primitive('b')
+        writer.reset()
+        writer.element('c')
+        self.assertEqual(b''.join(chunks), b'[a,],c,')
+
+    def test_from_target(self):
+        chunks = []
+        errors = []
+
+        def target(chunk):
+            chunks.append(chunk)
+            try:
+                writer.reset()
+            except RuntimeError as error:
+                errors.append(error)
+        writer = luxem.Writer(target=target)
+        writer.element(['a', 'b'])
+        writer.array_begin().primitive('c').array_end()
+        self.assertEqual(len(errors), len(chunks))
+        self.assertEqual(b''.join(chunks), b'[a,b,],[c,],')
+
+    def test_write_from_encoder(self):
+        class Point(object):
+            pass
+
+        def encode(value):
+            writer.primitive('x')
+            return 'y'
+        writer = luxem.Writer(encoders={Point: encode})
+        self.assertRaises(RuntimeError, writer.element, [Point()])
+        writer.reset()
+        writer.element('z')
+        self.assertEqual(writer.dump(), b'z,')
+
+
+class TestPool(unittest.TestCase):
+    def test_loads(self):
+        first = loads(b'a, b')
+        second = loads(b'c')
+        self.assertEqual(first, ['a', 'b'])
+        self.assertEqual(second, ['c'])
+        self.assertIsNot(first, second)
+
+    def test_loads_error(self):
+        self.assertRaises(ValueError, loads, b'[a}')
+        self.assertEqual(loads(b'[a]'), [['a']])
+
+    def test_dumps(self):
+        self.assertEqual(dumps(['a']), b'[a,],')
+        self.assertEqual(dumps({'k': 'v'}), b'{k:v,},')
+
+    def test_dumps_error(self):
+        class Bad(object):
+            def __str__(self):
+                raise RuntimeError('bad')
+        self.assertRaises(RuntimeError, dumps, ['a', Bad()])
+        self.assertEqual(dumps(['b']), b'[b,],')
+
+    def test_threads(self):
+        results = {}
+
+        def work(index):
+            results[index] = [loads(dumps([str(index), str(n)]))[0] for n in range(200)]
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(4):
+            self.assertEqual(results[index], [[str(index), str(n)] for n in range(200)])
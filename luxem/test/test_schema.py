@@ -0,0 +1,96 @@
+import collections
+import unittest
+
+from luxem import loads, iterload, Schema, Typed
+
+
+Point = collections.namedtuple('Point', ['x', 'y'])
+
+
+class Slotted(object):
+    __slots__ = ('name', 'children')
+
+    def __init__(self, name, children):
+        raise AssertionError('Records are built without calling __init__')
+
+
+class Extended(Slotted):
+    __slots__ = ('extra',)
+
+
+schema = Schema({'point': Point, 'slotted': Slotted, 'extended': Extended})
+
+
+class TestSchema(unittest.TestCase):
+    native = True
+
+    def loads(self, data):
+        return loads(data, native=self.native, schema=schema)
+
+    def test_namedtuple(self):
+        self.assertEqual(self.loads(b'(point) {x: 1, y: 2}'), [Point('1', '2')])
+
+    def test_order(self):
+        self.assertEqual(self.loads(b'(point) {y: 2, x: 1}'), [Point('1', '2')])
+
+    def test_slots(self):
+        out, = self.loads(b'(slotted) {name: a, children: [(point) {x: 1, y: 2}]}')
+        self.assertIsInstance(out, Slotted)
+        self.assertEqual(out.name, 'a')
+        self.assertEqual(out.children, [Point('1', '2')])
+
+    def test_inherited_slots(self):
+        out, = self.loads(b'(extended) {name: a, children: [], extra: b}')
+        self.assertIsInstance(out, Extended)
+        self.assertEqual((out.name, out.children, out.extra), ('a', [], 'b'))
+
+    def test_nested(self):
+        self.assertEqual(
+            self.loads(b'{a: (point) {x: (int) 1, y: [(point) {x: 2, y: 3}]}}'),
+            [{'a': Point(Typed('int', '1'), [Point('2', '3')])}],
+        )
+
+    def test_unknown_type(self):
+        self.assertEqual(self.loads(b'(other) {x: 1}'), [Typed('other', {'x': '1'})])
+
+    def test_primitive(self):
+        self.assertEqual(self.loads(b'(point) 1'), [Typed('point', '1')])
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, self.loads, b'(point) {x: 1, y: 2, z: 3}')
+
+    def test_missing_field(self):
+        self.assertRaises(ValueError, self.loads, b'(point) {x: 1}')
+
+    def test_defaults(self):
+        try:
+            Default = collections.namedtuple('Default', ['x', 'y'], defaults=['0'])
+        except TypeError:
+            self.skipTest('namedtuple defaults need Python 3.7')
+        out = loads(b'(d) {x: 1}', native=self.native, schema=Schema({'d': Default}))
+        self.assertEqual(out, [Default('1', '0')])
+
+    def test_dataclass(self):
+        try:
+            import dataclasses
+            Record = dataclasses.make_dataclass(
+                'Record', [('x', str), ('y', str, dataclasses.field(default='0'))], slots=True)
+        except (ImportError, TypeError):
+            self.skipTest('slotted dataclasses need Python 3.10')
+        out = loads(b'(r) {x: 1}', native=self.native, schema=Schema({'r': Record}))
+        self.assertEqual(out, [Record('1', '0')])
+
+    def test_unslotted(self):
+        self.assertRaises(TypeError, Schema, {'a': object})
+
+
+class TestSchemaPython(TestSchema):
+    native = False
+
+
+class TestSchemaIterLoad(unittest.TestCase):
+    def test_iterload(self):
+        self.assertEqual(
+            list(iterload(b'(point) {x: 1, y: 2}, (point) {x: 3, y: 4}', chunk_size=5, schema=schema)),
+            [Point('1', '2'), Point('3', '4')],
+        )
@@ -0,0 +1,208 @@
+import unittest
+
+import _luxem
+import luxem
+
+
+document = b'{a: [b, (t) c]}, d'
+
+document_events = {
+    'object_begin': 1,
+    'object_end': 1,
+    'array_begin': 1,
+    'array_end': 1,
+    'key': 1,
+    'type': 1,
+    'primitive': 3,
+}
+
+# Events of the first of the two root values in document
+first_events = dict(document_events, primitive=2)
+
+
+def _ignore(*args):
+    pass
+
+
+class TestReaderStats(unittest.TestCase):
+    def reader(self):
+        return _luxem.Reader(
+            object_begin=_ignore,
+            object_end=_ignore,
+            array_begin=_ignore,
+            array_end=_ignore,
+            key=_ignore,
+            type=_ignore,
+            primitive=_ignore,
+        )
+
+    def test_disabled(self):
+        r = self.reader()
+        r.feed(document)
+        self.assertIsNone(r.stats())
+
+    def test_counts(self):
+        r = self.reader()
+        r.enable_stats()
+        r.feed(document)
+        stats = r.stats()
+        self.assertEqual(stats['bytes'], len(document))
+        self.assertEqual(stats['events'], document_events)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['callbacks'], 9)
+        self.assertEqual(stats['documents'], 2)
+        self.assertIsNone(stats['callback_seconds'])
+        self.assertIsNone(stats['native_seconds'])
+
+    def test_timing(self):
+        r = self.reader()
+        r.enable_stats(timing=True)
+        r.feed(document)
+        stats = r.stats()
+        self.assertGreaterEqual(stats['callback_seconds'], 0)
+        self.assertGreaterEqual(stats['native_seconds'], 0)
+
+    def test_push(self):
+        r = self.reader()
+        r.enable_stats()
+        r.push(b'[abc')
+        self.assertEqual(r.stats()['documents'], 0)
+        r.push(b'def]', finish=True)
+        stats = r.stats()
+        self.assertEqual(stats['bytes'], 8)
+        self.assertGreater(stats['carried'], 0)
+        self.assertEqual(stats['documents'], 1)
+
+    def test_push_carries_token(self):
+        r = self.reader()
+        r.enable_stats()
+        r.push(b'[abc')
+        r.push(b'def, ' + b'g, ' * 10000 + b']', finish=True)
+        self.assertLess(r.stats()['carried'], 1000)
+
+    def test_hook(self):
+        documents = []
+        r = self.reader()
+        r.enable_stats(hook=documents.append)
+        r.feed(document)
+        r.reset()
+        r.feed(b'e')
+        self.assertEqual(len(documents), 3)
+        self.assertEqual(documents[0]['events'], first_events)
+        self.assertEqual(documents[0]['max_depth'], 2)
+        self.assertEqual(documents[1]['events']['primitive'], 1)
+        self.assertEqual(documents[1]['max_depth'], 0)
+        self.assertEqual(documents[2]['events']['primitive'], 1)
+        self.assertEqual(r.stats()['events']['primitive'], 4)
+        self.assertEqual(r.stats()['documents'], 3)
+
+    def test_hook_push(self):
+        documents = []
+        r = self.reader()
+        r.enable_stats(hook=documents.append)
+        r.push(b'[a, b], (t) ')
+        self.assertEqual(len(documents), 1)
+        r.push(b'c, {k: v}', finish=True)
+        self.assertEqual(
+            [d['events']['primitive'] for d in documents], [2, 1, 1])
+
+    def test_hook_error(self):
+        def hook(stats):
+            raise RuntimeError('hook failed')
+        r = self.reader()
+        r.enable_stats(hook=hook)
+        self.assertRaises(RuntimeError, r.feed, b'a')
+
+    def test_disable(self):
+        r = self.reader()
+        r.enable_stats()
+        r.disable_stats()
+        self.assertIsNone(r.stats())
+        r.feed(document)
+
+    def test_builder(self):
+        documents = []
+        self.assertEqual(
+            luxem.loads(document, profile=documents.append),
+            luxem.loads(document))
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents[0]['events'], first_events)
+
+    def test_release_gil_hook(self):
+        documents = []
+        self.assertEqual(
+            luxem.loads(document, release_gil=True, profile=documents.append),
+            luxem.loads(document))
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents[0]['events'], first_events)
+
+    def test_toggle_while_feeding(self):
+        errors = []
+
+        def toggle(value):
+            for method in (r.disable_stats, r.enable_stats):
+                try:
+                    method()
+                except RuntimeError:
+                    errors.append(method.__name__)
+        r = _luxem.Reader(
+            object_begin=_ignore,
+            object_end=_ignore,
+            array_begin=_ignore,
+            array_end=_ignore,
+            key=_ignore,
+            type=_ignore,
+            primitive=toggle,
+        )
+        r.enable_stats()
+        r.feed(b'a')
+        self.assertEqual(errors, ['disable_stats', 'enable_stats'])
+        self.assertEqual(r.stats()['documents'], 1)
+
+
+class TestWriterStats(unittest.TestCase):
+    def test_tokens(self):
+        w = _luxem.Writer()
+        w.enable_stats()
+        w.object_begin().key('a').array_begin().primitive('b')
+        w.type('t').primitive('c').array_end().object_end()
+        w.primitive('d')
+        stats = w.stats()
+        self.assertEqual(stats['events'], document_events)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['documents'], 2)
+
+    def test_element(self):
+        w = luxem.Writer()
+        w.enable_stats()
+        w.element({'a': ['b', luxem.Typed('t', 'c')]}).element('d')
+        self.assertEqual(w.stats()['events'], document_events)
+
+    def test_target(self):
+        chunks = []
+        w = luxem.Writer(target=chunks.append)
+        w.enable_stats(timing=True)
+        w.element(['a', 'b'])
+        stats = w.stats()
+        self.assertEqual(stats['bytes'], sum(len(chunk) for chunk in chunks))
+        self.assertEqual(stats['callbacks'], len(chunks))
+
+    def test_profile(self):
+        documents = []
+        luxem.dumps(['a'], profile=documents.append)
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(documents[0]['events']['primitive'], 1)
+
+    def test_disable_from_hook(self):
+        errors = []
+
+        def hook(stats):
+            try:
+                w.disable_stats()
+            except RuntimeError:
+                errors.append(stats)
+        w = _luxem.Writer()
+        w.enable_stats(hook=hook)
+        w.primitive('a').element(['b'])
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(w.stats()['documents'], 2)
@@ -0,0 +1,49 @@
+import pickle
+import unittest
+
+from luxem import Typed
+
+
+class TestTyped(unittest.TestCase):
+    def test_attributes(self):
+        value = Typed('int', '7')
+        self.assertEqual(value.name, 'int')
+        self.assertEqual(value.value, '7')
+        value.value = '8'
+        self.assertEqual(value.value, '8')
+
+    def test_default_value(self):
+        self.assertIsNone(Typed('empty').value)
+
+    def test_equal(self):
+        self.assertEqual(Typed('int', '7'), Typed('int', '7'))
+        self.assertNotEqual(Typed('int', '7'), Typed('int', '8'))
+        self.assertNotEqual(Typed('int', '7'), Typed('float', '7'))
+        self.assertNotEqual(Typed('int', '7'), '7')
+
+    def test_hash(self):
+        self.assertEqual(hash(Typed('int', '7')), hash(Typed('int', '7')))
+        self.assertEqual(len({Typed('int', '7'), Typed('int', '7')}), 1)
+        self.assertRaises(TypeError, hash, Typed('list', []))
+
+    def test_repr(self):
+        self.assertEqual(repr(Typed('int', '7')), "luxem.Typed('int', '7')")
+
+    def test_pickle(self):
+        value = Typed('point', {'x': Typed('int', '1')})
+        self.assertEqual(pickle.loads(pickle.dumps(value)), value)
+
+    def test_no_dict(self):
+        self.assertRaises(AttributeError, setattr, Typed('a'), 'other', 1)
+
+    def test_uninitialized(self):
+        value = Typed.__new__(Typed)
+        self.assertEqual((value.name, value.value), (None, None))
+        hash(value)
+        repr(value)
+
+    def test_no_delete(self):
+        value = Typed('int', '7')
+        self.assertRaises(AttributeError, delattr, value, 'value')
+        self.assertRaises(AttributeError, delattr, value, 'name')
+        self.assertEqual(value, Typed('int', '7'))
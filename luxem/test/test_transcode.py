@@ -0,0 +1,88 @@
+import io
+import unittest
+
+from luxem import loads
+from luxem.transcode import from_json, to_json
+
+
+class TestFromJson(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(
+            loads(from_json(b'{"a": [1, "x y", true, null], "b": {}, "c": []}')),
+            [{'a': ['1', 'x y', 'true', 'null'], 'b': {}, 'c': []}])
+
+    def test_roots(self):
+        self.assertEqual(loads(from_json(u'1\n"a"\n[]')), ['1', 'a', []])
+
+    def test_typed(self):
+        self.assertEqual(
+            from_json(b'{"$type": "point", "$value": [1, 2]}'),
+            b'(point)[1,2,],')
+
+    def test_type_key(self):
+        self.assertEqual(
+            from_json(b'{"kind": "t", "data": "a"}', type_key='kind', value_key='data'),
+            b'(t)a,')
+        self.assertEqual(
+            from_json(b'{"$type": "t", "$value": "a"}', type_key=None),
+            b'{$type:t,$value:a,},')
+
+    def test_untyped(self):
+        self.assertEqual(
+            from_json(b'{"$type": "t", "x": 1} {"$type": "t"} {"$type": 1}'),
+            b'{$type:t,x:1,},{$type:t,},{$type:1,},')
+
+    def test_typed_extra_key(self):
+        self.assertRaises(
+            ValueError, from_json, b'{"$type": "t", "$value": 1, "x": 2}')
+
+    def test_chunks(self):
+        source = io.BytesIO(u'{"key": ["\\u00e9 \\"quoted\\"", 12345678, false]}'.encode('utf-8'))
+        self.assertEqual(
+            loads(from_json(source, chunk_size=3)),
+            [{'key': [u'é "quoted"', '12345678', 'false']}])
+
+    def test_target(self):
+        chunks = []
+        self.assertIsNone(from_json(b'["a"]', chunks.append))
+        self.assertEqual(b''.join(chunks), b'[a,],')
+
+    def test_invalid(self):
+        for data in [b'{"a" 1}', b'[1,', b'{"a": 1]', b'@']:
+            self.assertRaises(ValueError, from_json, data)
+
+
+class TestToJson(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(
+            to_json(b'{a: [b, c], d: {}, e: []}, f'),
+            u'{"a":["b","c"],"d":{},"e":[]}\n"f"\n')
+
+    def test_typed(self):
+        self.assertEqual(
+            to_json(b'[(t) a, (u) {k: (v) []}]'),
+            u'[{"$type":"t","$value":"a"},'
+            u'{"$type":"u","$value":{"k":{"$type":"v","$value":[]}}}]\n')
+
+    def test_drop_types(self):
+        self.assertEqual(to_json(b'(t) [a]', type_key=None), u'["a"]\n')
+
+    def test_target(self):
+        out = io.StringIO()
+        to_json(b'[a, b, c, d]', out, chunk_size=2)
+        self.assertEqual(out.getvalue(), u'["a","b","c","d"]\n')
+
+    def test_literals(self):
+        self.assertEqual(
+            to_json(b'[1, -2.5e3, true, null, x, 01, 1., "true "]'),
+            u'[1,-2.5e3,true,null,"x","01","1.","true "]\n')
+        self.assertEqual(
+            to_json(b'[1, true]', literals=False), u'["1","true"]\n')
+
+    def test_json_round_trip(self):
+        data = u'{"a":[1,-0.5,"x y",true,false,null,{"$type":"t","$value":2E+5}]}\n[]\n'
+        self.assertEqual(to_json(from_json(data)), data)
+
+    def test_round_trip(self):
+        data = b'{a:[(t)b,c,],d:(u){},}'
+        self.assertEqual(from_json(to_json(data)), data + b',')
@@ -1,60 +1,137 @@
 import unittest
 
-from luxem import dumps, Typed
+try:
+    import dataclasses
+except ImportError:
+    dataclasses = None
+
+from luxem import dumps, to_ascii16, Typed
 
 
 class TestWrite(unittest.TestCase):
+    native = True
+
+    def dumps(self, value, **kwargs):
+        return dumps(value, native=self.native, **kwargs)
+
     def test_int(self):
-        self.assertEqual(dumps(7), b'7,')
+        self.assertEqual(self.dumps(7), b'7,')
 
     def test_typed_int(self):
-        self.assertEqual(dumps(Typed('int', 7)), b'(int)7,')
+        self.assertEqual(self.dumps(Typed('int', 7)), b'(int)7,')
 
     def test_float(self):
-        self.assertEqual(dumps(7.9), b'7.9,')
+        self.assertEqual(self.dumps(7.9), b'7.9,')
 
     def test_string(self):
-        self.assertEqual(dumps('hey'), b'hey,')
+        self.assertEqual(self.dumps('hey'), b'hey,')
 
     def test_spaced_string(self):
-        self.assertEqual(dumps('hey glovebox'), b'"hey glovebox",')
+        self.assertEqual(self.dumps('hey glovebox'), b'"hey glovebox",')
 
     def test_escaped_string(self):
-        self.assertEqual(dumps('do\\g'), b'do\\g,')
+        self.assertEqual(self.dumps('do\\g'), b'do\\g,')
 
     def test_escaped_spaced_string(self):
-        self.assertEqual(dumps('hey \\glovebox'), b'"hey \\\\glovebox",')
+        self.assertEqual(self.dumps('hey \\glovebox'), b'"hey \\\\glovebox",')
 
     def test_object(self):
-        self.assertEqual(dumps({}), b'{},')
+        self.assertEqual(self.dumps({}), b'{},')
 
     def test_object_keys(self):
         self.assertIn(
-            dumps({'dig': 'wombat', 'fig': 'combat'}),
+            self.dumps({'dig': 'wombat', 'fig': 'combat'}),
             {
                 b'{dig:wombat,fig:combat,},',
                 b'{fig:combat,dig:wombat,},',
             })
 
     def test_object_key_object(self):
-        self.assertEqual(dumps({'elebent': {}}), b'{elebent:{},},')
+        self.assertEqual(self.dumps({'elebent': {}}), b'{elebent:{},},')
 
     def test_object_key_array(self):
-        self.assertEqual(dumps({'elebent': []}), b'{elebent:[],},')
+        self.assertEqual(self.dumps({'elebent': []}), b'{elebent:[],},')
 
     def test_array(self):
-        self.assertEqual(dumps([]), b'[],')
+        self.assertEqual(self.dumps([]), b'[],')
 
     def test_array_elements(self):
-        self.assertEqual(dumps(['flag', 'nutter']), b'[flag,nutter,],')
+        self.assertEqual(self.dumps(['flag', 'nutter']), b'[flag,nutter,],')
 
     def test_array_array(self):
-        self.assertEqual(dumps([[]]), b'[[],],')
+        self.assertEqual(self.dumps([[]]), b'[[],],')
 
     def test_array_object(self):
-        self.assertEqual(dumps([{}]), b'[{},],')
+        self.assertEqual(self.dumps([{}]), b'[{},],')
 
     def test_unknown_type(self):
         self.assertEqual(
-            dumps(Typed('element', 'palloodium')),
+            self.dumps(Typed('element', 'palloodium')),
             b'(element)palloodium,')
+
+    def test_tuple(self):
+        self.assertEqual(
+            self.dumps(('flag', ('nutter',))), b'[flag,[nutter,],],')
+
+    def test_nested_typed(self):
+        self.assertEqual(
+            self.dumps({'k': [Typed('t', {'j': 7})]}),
+            b'{k:[(t){j:7,},],},')
+
+    def test_bad_key(self):
+        self.assertRaises(TypeError, self.dumps, {7: 'a'})
+
+    def test_set(self):
+        self.assertEqual(self.dumps({'a'}), b'[a,],')
+
+    def test_generator(self):
+        self.assertEqual(
+            self.dumps(str(x) for x in range(3)), b'[0,1,2,],')
+
+    def test_encoders(self):
+        class Point(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class SubPoint(Point):
+            pass
+
+        self.assertEqual(
+            self.dumps(
+                [Point(1, 2), SubPoint(3, 4)],
+                encoders={Point: lambda p: Typed('point', [p.x, p.y])}),
+            b'[(point)[1,2,],(point)[3,4,],],')
+
+    def test_default(self):
+        class Thing(object):
+            pass
+
+        self.assertEqual(
+            self.dumps(
+                [Thing(), 7, 'a'], default=lambda value: Typed('thing', {})),
+            b'[(thing){},7,a,],')
+
+    def test_default_error(self):
+        class Thing(object):
+            pass
+
+        def default(value):
+            raise TypeError('unserializable')
+
+        self.assertRaises(TypeError, self.dumps, Thing(), default=default)
+
+    @unittest.skipIf(bytes is str, 'bytes are strings')
+    def test_bytes(self):
+        self.assertEqual(
+            self.dumps(b'hi'),
+            b'(ascii16)' + to_ascii16(b'hi').encode('ascii') + b',')
+
+    @unittest.skipIf(dataclasses is None, 'dataclasses not available')
+    def test_dataclass(self):
+        Point = dataclasses.make_dataclass('Point', ['x'])
+        self.assertEqual(self.dumps(Point(3)), b'{x:3,},')
+
+
+class TestWritePython(TestWrite):
+    native = False
@@ -0,0 +1,271 @@
+import codecs
+import json.decoder
+import json.encoder
+import re
+
+import _luxem
+from luxem.read import events
+from luxem.write import Writer
+
+try:
+    _text = unicode
+except NameError:
+    _text = str
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_scalar = re.compile(r'[-+0-9.eE]+|true|false|null')
+_json_literal = re.compile(r'(-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?|true|false|null)\Z')
+_quote = json.encoder.encode_basestring_ascii
+
+
+class _Source(object):
+    """Splits JSON from a string, bytes-like object or file into tokens,
+    keeping at most one incomplete token buffered."""
+
+    def __init__(self, source, chunk_size):
+        if hasattr(source, 'read'):
+            self._read = lambda: source.read(chunk_size)
+        else:
+            chunks = [source]
+            self._read = lambda: chunks.pop() if chunks else b''
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = u''
+        self._position = 0
+        self._done = False
+
+    def _fill(self):
+        chunk = self._read()
+        if not isinstance(chunk, _text):
+            self._done = not chunk
+            chunk = self._decoder.decode(bytes(chunk), final=self._done)
+        elif not chunk:
+            self._done = True
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+
+    def token(self):
+        """Returns (token, value) where token is one of '{}[]:,' with no value,
+        '"' with the decoded string, 's' with a number or literal, or None at
+        the end of the source."""
+        while True:
+            self._position = _whitespace.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                break
+            if self._done:
+                return None, None
+            self._fill()
+        while True:
+            start = self._position
+            first = self._buffer[start]
+            if first in '{}[]:,':
+                self._position += 1
+                return first, None
+            try:
+                if first == '"':
+                    value, end = json.decoder.scanstring(self._buffer, start + 1)
+                    token = '"'
+                else:
+                    match = _scalar.match(self._buffer, start)
+                    if not match:
+                        raise ValueError(
+                            'Unexpected character {!r} in JSON.'.format(first))
+                    value, end = match.group(), match.end()
+                    token = 's'
+                    if end == len(self._buffer) and not self._done:
+                        raise ValueError('Incomplete JSON token.')
+            except ValueError:
+                if self._done:
+                    raise
+                self._fill()
+                continue
+            self._position = end
+            return token, value
+
+
+def from_json(source, target=None, type_key='$type', value_key='$value', chunk_size=65536, **kwargs):
+    source = _Source(source, chunk_size)
+    if target is None:
+        writer = Writer(**kwargs)
+    else:
+        kwargs.setdefault('buffer_size', chunk_size)
+        writer = Writer(target=target if callable(target) else target.write, **kwargs)
+
+    # Each entry is the kind of an open container, '{' or '['.  Objects of
+    # the form {type_key: name, value_key: value} become typed values, for
+    # which 't' marks the closing brace still to be read.
+    stack = []
+
+    def expect(token):
+        got, _ = source.token()
+        if got != token:
+            raise ValueError('Expected {!r} in JSON but got {!r}.'.format(token, got))
+
+    def value(token, data):
+        if token == '"' or token == 's':
+            writer.primitive(data)
+        elif token == '[':
+            writer.array_begin()
+            stack.append('[')
+            item = source.token()
+            if item[0] == ']':
+                end()
+            else:
+                value(*item)
+        elif token == '{':
+            item = source.token()
+            if item[0] == '}':
+                writer.object_begin().object_end()
+                return
+            if item[0] != '"':
+                raise ValueError('Expected a key in JSON but got {!r}.'.format(item[0]))
+            if type_key is not None and item[1] == type_key:
+                expect(':')
+                name = source.token()
+                if name[0] == '"':
+                    after = source.token()
+                    if after[0] == ',':
+                        key = source.token()
+                        if key == ('"', value_key):
+                            expect(':')
+                            writer.type(name[1])
+                            stack.append('t')
+                            value(*source.token())
+                            return
+                        writer.object_begin().key(type_key).primitive(name[1])
+                        stack.append('{')
+                        member(key)
+                        return
+                    if after[0] == '}':
+                        writer.object_begin().key(type_key).primitive(name[1]).object_end()
+                        return
+                    raise ValueError('Expected , or }} in JSON but got {!r}.'.format(after[0]))
+                writer.object_begin().key(type_key)
+                stack.append('{')
+                value(*name)
+                return
+            writer.object_begin()
+            stack.append('{')
+            member(item)
+        else:
+            raise ValueError('Expected a value in JSON but got {!r}.'.format(token))
+
+    def member(key):
+        if key[0] != '"':
+            raise ValueError('Expected a key in JSON but got {!r}.'.format(key[0]))
+        writer.key(key[1])
+        expect(':')
+        value(*source.token())
+
+    def end():
+        kind = stack.pop()
+        if kind == '{':
+            writer.object_end()
+        elif kind == '[':
+            writer.array_end()
+
+    # Values are handled by recursion only until the first child of a
+    # container; the rest of each container is driven from this loop so
+    # the recursion depth doesn't grow with document length.
+    while True:
+        if not stack:
+            token, data = source.token()
+            if token is None:
+                break
+            value(token, data)
+            continue
+        token, _ = source.token()
+        kind = stack[-1]
+        if kind == 't':
+            if token != '}':
+                raise ValueError(
+                    'Typed JSON objects may only have {!r} and {!r} keys.'.format(type_key, value_key))
+            end()
+        elif token == ',':
+            if kind == '{':
+                member(source.token())
+            else:
+                value(*source.token())
+        elif token == ('}' if kind == '{' else ']'):
+            end()
+        else:
+            raise ValueError('Unexpected {!r} in JSON.'.format(token))
+
+    if target is None:
+        return writer.dump()
+    writer.flush()
+
+
+def to_json(source, target=None, type_key='$type', value_key='$value', chunk_size=65536, literals=True, **kwargs):
+    out = []
+    if target is None:
+        write = out.append
+    else:
+        write = target if callable(target) else target.write
+    pending = []
+    pending_size = [0]
+
+    def emit(text):
+        pending.append(text)
+        pending_size[0] += len(text)
+        if pending_size[0] >= chunk_size:
+            write(u''.join(pending))
+            del pending[:]
+            pending_size[0] = 0
+
+    # Each entry is the kind of an open level, 'r' for the root, '{', '[' or
+    # 't' for a typed value waiting for its value to close it, and whether
+    # the level has a value yet.  Roots are written one per line.
+    kinds = ['r']
+    started = [False]
+
+    def value_begin():
+        if kinds[-1] == '[':
+            if started[-1]:
+                emit(u',')
+            started[-1] = True
+
+    def value_end():
+        while kinds[-1] == 't':
+            kinds.pop()
+            started.pop()
+            emit(u'}')
+        if kinds[-1] == 'r':
+            emit(u'\n')
+
+    for batch in events(source, chunk_size, **kwargs):
+        for code, data in batch:
+            if code == _luxem.KEY:
+                if started[-1]:
+                    emit(u',')
+                started[-1] = True
+                emit(_quote(data) + u':')
+            elif code == _luxem.TYPE:
+                if type_key is None:
+                    continue
+                value_begin()
+                emit(u'{' + _quote(type_key) + u':' + _quote(data) + u',' + _quote(value_key) + u':')
+                kinds.append('t')
+                started.append(True)
+            elif code == _luxem.PRIMITIVE:
+                value_begin()
+                if literals and _json_literal.match(data):
+                    emit(data)
+                else:
+                    emit(_quote(data))
+                value_end()
+            elif code == _luxem.OBJECT_BEGIN or code == _luxem.ARRAY_BEGIN:
+                value_begin()
+                kind = u'{' if code == _luxem.OBJECT_BEGIN else u'['
+                emit(kind)
+                kinds.append(kind)
+                started.append(False)
+            else:
+                kinds.pop()
+                started.pop()
+                emit(u'}' if code == _luxem.OBJECT_END else u']')
+                value_end()
+
+    if pending:
+        write(u''.join(pending))
+    if target is None:
+        return u''.join(out)
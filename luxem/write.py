@@ -1,6 +1,53 @@
+import inspect
+import numbers
+import types
+
+try:
+    import dataclasses
+except ImportError:
+    dataclasses = None
+
 import _luxem
+from luxem.pool import Pool
 from luxem.struct import Typed
 
+try:
+    _plain = (basestring, numbers.Number)
+except NameError:
+    _plain = (str, numbers.Number)
+
+
+def _ascii16(value):
+    return Typed('ascii16', _luxem.to_ascii16(value))
+
+
+default_encoders = {}
+if bytes is not str:
+    default_encoders[bytes] = _ascii16
+    default_encoders[bytearray] = _ascii16
+    default_encoders[memoryview] = _ascii16
+
+
+def _dataclass(value):
+    return dict(
+        (field.name, getattr(value, field.name))
+        for field in dataclasses.fields(value)
+    )
+
+
+def _resolver(encoders, default):
+    def resolve(cls):
+        for base in inspect.getmro(cls):
+            encoder = encoders.get(base)
+            if encoder is not None:
+                return encoder
+        if dataclasses is not None and dataclasses.is_dataclass(cls):
+            return _dataclass
+        if issubclass(cls, _plain):
+            return None
+        return default
+    return resolve
+
 
 class _ArrayElement(object):
     def __init__(self, item):
@@ -39,20 +86,42 @@ else:
 
 
 class Writer(_luxem.Writer):
+    def __init__(self, target=None, encoders=None, default=None, **kwargs):
+        kwargs.setdefault('typed', Typed)
+        registry = dict(default_encoders)
+        if encoders:
+            registry.update(encoders)
+        self._resolve = _resolver(registry, default)
+        self._encoders = {}
+        super(Writer, self).__init__(target, resolve=self._resolve, **kwargs)
+
     def _process(self, stack, item):
         if isinstance(item, dict):
             self.object_begin()
             stack.append(_ObjectElement(item))
-        elif isinstance(item, list):
+        elif isinstance(item, (list, tuple)):
             self.array_begin()
             stack.append(_ArrayElement(item))
         elif isinstance(item, Typed):
             self.type(item.name)
             self._process(stack, item.value)
         else:
-            self.primitive(str(item))
+            cls = type(item)
+            try:
+                encoder = self._encoders[cls]
+            except KeyError:
+                encoder = self._encoders[cls] = self._resolve(cls)
+            if encoder is not None:
+                self._process(stack, encoder(item))
+            elif isinstance(item, (set, frozenset, types.GeneratorType)):
+                self.array_begin()
+                stack.append(_ArrayElement(item))
+            else:
+                self.primitive(str(item))
 
-    def element(self, data):
+    def element(self, data, native=True):
+        if native:
+            return super(Writer, self).element(data)
         stack = []
         self._process(stack, data)
         while stack:
@@ -62,11 +131,28 @@ class Writer(_luxem.Writer):
         return self
 
 
-def dump(dest, value, **kwargs):
-    Writer(target=dest, **kwargs).element(value)
+def _writer(profile, **kwargs):
+    w = Writer(**kwargs)
+    if profile is not None:
+        w.enable_stats(timing=True, hook=profile)
+    return w
 
 
-def dumps(value, **kwargs):
-    w = Writer(**kwargs)
-    w.element(value)
+def dump(dest, value, native=True, profile=None, **kwargs):
+    _writer(profile, target=dest, **kwargs).element(value, native=native)
+
+
+_writers = Pool(Writer)
+
+
+def dumps(value, native=True, profile=None, **kwargs):
+    if native and not kwargs and profile is None:
+        w = _writers.take()
+        try:
+            w.element(value)
+            return w.dump()
+        finally:
+            _writers.give(w)
+    w = _writer(profile, **kwargs)
+    w.element(value, native=native)
     return w.dump()